@@ -151,7 +151,8 @@ def sidebar_nav():
         menu = st.radio("Navigation Menu", ["Home",
                                             "Paper Collection Agent",
                                             "Information Extraction Agent",
-                                            "Deep Research Agent"],
+                                            "Deep Research Agent",
+                                            "Run Dashboard"],
                         label_visibility="collapsed")
         st.markdown("---")
         with st.expander("Settings"):
@@ -395,6 +396,33 @@ def show_paper_download():
     st.markdown("Due to the limitation of the streamlit cloud, we cannot provide the remote desktop service. Please use the local version of the agent.Please refer to the [README](https://github.com/YajingSun-Group/oled_agent) for more details.")
 
 # ---------------------------------------------------------------------------
+@st.cache_resource
+def get_parse_cache():
+    """One MinerU parse cache per server process, shared by all sessions"""
+    from mineru import ParseCache
+    return ParseCache()
+
+def show_parse_cache_stats():
+    import pandas as pd
+    parse_cache = get_parse_cache()
+    with st.expander("Parse Cache", expanded=False):
+        stats = parse_cache.stats()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Cached PDFs", stats["entries"])
+        c2.metric("Size", f"{stats['bytes'] / 1024 ** 2:.1f} / {stats['max_bytes'] / 1024 ** 3:.0f} GB")
+        c3.metric("Hit rate", f"{stats['hit_rate']:.0%}" if stats["hit_rate"] is not None else "–")
+        c4.metric("Evictions", stats["evictions"])
+        st.caption(f"{stats['hits']} hits, {stats['misses']} misses · {parse_cache.cache_dir}")
+        entries = parse_cache.entries()
+        if entries:
+            st.dataframe(pd.DataFrame(entries).assign(
+                size=lambda df: (df["size"] / 1024 ** 2).round(2),
+                last_access=lambda df: pd.to_datetime(df["last_access"], unit="s"),
+            ).drop(columns=["key", "created_at"]).rename(columns={"size": "size (MB)"}), use_container_width=True)
+        if st.button("Clear parse cache", key="clear_parse_cache"):
+            parse_cache.clear()
+            st.success("Parse cache cleared")
+
 def show_paper_parser():
     st.title("Information Extraction Agent")
     
@@ -452,118 +480,127 @@ def show_paper_parser():
             extract_tables = st.checkbox("Extract table data", value=True)
             extract_formulas = st.checkbox("Extract mathematical formulas", value=True)
             use_deepseek = st.checkbox("Use DeepSeek AI for structured data extraction", value=True)
+            filter_sections = st.checkbox("Skip references/acknowledgements before extraction", value=True)
+            split_extraction = st.checkbox("Extract materials and devices in parallel (faster)", value=False)
+            use_parse_cache = st.checkbox("Reuse cached results for PDFs parsed before", value=True)
+            parse_backend = st.selectbox(
+                "Parser backend", ["mineru", "auto", "local"],
+                format_func={"auto": "Auto (local text layer, MinerU for scanned/poor PDFs)",
+                             "mineru": "MinerU cloud", "local": "Local only (offline)"}.get,
+                help="The local backend reads the PDF text layer with PyMuPDF and needs no network"
+            )
+            
+        show_parse_cache_stats()
             
         # Parse button
         if st.button("Start Parsing", key="extract_button"):
-            if not st.session_state.mineru_token:
+            if not st.session_state.mineru_token and parse_backend != "local":
                 st.error("Please configure MinerU API Token in settings first")
             elif use_deepseek and not st.session_state.deepseek_api_key:
                 st.error("Please configure DeepSeek API Key in settings to use DeepSeek AI")
             else:
-                # Save uploaded file to temp directory
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    tmp_file.write(uploaded_file.getbuffer())
-                    pdf_path = tmp_file.name
+                # Call parsing function; the PDF is uploaded straight from the upload buffer
+                from parser_agent import parser_pdf, extract_info
+                results = parser_pdf(
+                    uploaded_file,
+                    token=st.session_state.mineru_token,
+                    output_dir=st.session_state.temp_dir,
+                    file_name=uploaded_file.name,
+                    cache=get_parse_cache() if use_parse_cache else None,
+                    backend=parse_backend
+                )
                 
-                try:
-                    # Call parsing function
-                    from parser_agent import parser_pdf, extract_info
-                    results = parser_pdf(
-                        pdf_path, 
-                        token=st.session_state.mineru_token,
-                        output_dir=st.session_state.temp_dir
-                    )
-                    
-                    if results:
-                        # Extract structured data using DeepSeek if enabled
-                        if use_deepseek and 'markdown_content' in results:
-                            st.info("Extracting structured data using DeepSeek AI...")
-                            
-                            # Prepare output path for DeepSeek results
-                            deepseek_output_path = os.path.join(
-                                results['output_dir'], 
-                                f"{results['data_id']}_deepseek.json"
-                            )
-                            
-                            # Call extract_info function
-                            deepseek_results = extract_info(
-                                markdown_content=results['markdown_content'],
-                                api_key=st.session_state.deepseek_api_key,
-                                output_path=deepseek_output_path
-                            )
-                            
-                            if deepseek_results:
-                                results['deepseek_results'] = deepseek_results
-                                results['deepseek_path'] = deepseek_output_path
-                        
-                        st.session_state.parsing_results = results
-                        
-                        # Display parsing results
-                        st.subheader("Parsing Results")
+                if results:
+                    # Extract structured data using DeepSeek if enabled
+                    if use_deepseek and 'markdown_content' in results:
+                        st.info("Extracting structured data using DeepSeek AI...")
                         
-                        # Create tabs to display different types of content
-                        tab_titles = ["Markdown Content", "Images"]
-                        if 'deepseek_results' in results:
-                            tab_titles.insert(0, "OLED Structured Data")
-                            
-                        tabs = st.tabs(tab_titles)
+                        # Prepare output path for DeepSeek results
+                        deepseek_output_path = os.path.join(
+                            results['output_dir'], 
+                            f"{results['data_id']}_deepseek.json"
+                        )
                         
-                        tab_index = 0
-                        if 'deepseek_results' in results:
-                            with tabs[0]:  # OLED Structured Data (formerly DeepSeek Analysis)
-                                st.subheader("OLED Structured Data")
-                                st.json(results['deepseek_results'])
-                                
-                                # Add download button for DeepSeek results
-                                with open(results['deepseek_path'], 'r', encoding='utf-8') as f:
-                                    deepseek_content = f.read()
-                                    st.download_button(
-                                        label="Download Structured Data",
-                                        data=deepseek_content,
-                                        file_name=f"{results['data_id']}_structured.json",
-                                        mime="application/json"
-                                    )
-                            tab_index += 1
-                            
-                        with tabs[tab_index]:  # Markdown Content
-                            if 'markdown_content' in results:
-                                st.markdown(results['markdown_content'])
-                            else:
-                                st.warning("No Markdown content found")
-                            tab_index += 1
+                        # Call extract_info function
+                        deepseek_results = extract_info(
+                            markdown_content=results['markdown_content'],
+                            api_key=st.session_state.deepseek_api_key,
+                            output_path=deepseek_output_path,
+                            filter_sections=filter_sections,
+                            split=split_extraction,
+                            json_content=results.get('json_content') if extract_tables else None
+                        )
                         
-                        with tabs[tab_index]:  # Images
-                            # Display extracted images
-                            if 'images' in results and results['images']:
-                                st.write(f"Found {len(results['images'])} images")
-                                
-                                # Create image gallery with 3 columns
-                                cols = st.columns(3)
-                                for i, img_info in enumerate(results['images']):
-                                    col_idx = i % 3
-                                    with cols[col_idx]:
-                                        try:
-                                            image_path = img_info['path']
-                                            image_name = img_info['name']
-                                            if os.path.exists(image_path):
-                                                st.image(image_path, caption=image_name, use_container_width=True)
-                                                with open(image_path, "rb") as img_file:
-                                                    img_bytes = img_file.read()
-                                                    st.download_button(
-                                                        label=f"Download",
-                                                        data=img_bytes,
-                                                        file_name=image_name,
-                                                        mime=f"image/{image_path.split('.')[-1]}"
-                                                    )
-                                        except Exception as e:
-                                            st.error(f"Error displaying image: {str(e)}")
-                            else:
-                                st.warning("No images found in the document")
+                        if deepseek_results:
+                            results['deepseek_results'] = deepseek_results
+                            results['deepseek_path'] = deepseek_output_path
                     
-                finally:
-                    # Clean up temporary PDF file
-                    if os.path.exists(pdf_path):
-                        os.unlink(pdf_path)
+                    st.session_state.parsing_results = results
+
+        # Results are kept in the session so they survive reruns (e.g. picking an image below)
+        results = st.session_state.get('parsing_results')
+        if results and results.get('file_name') == uploaded_file.name:
+            st.subheader("Parsing Results")
+            
+            # Create tabs to display different types of content
+            tab_titles = ["Markdown Content", "Images"]
+            if 'deepseek_results' in results:
+                tab_titles.insert(0, "OLED Structured Data")
+                
+            tabs = st.tabs(tab_titles)
+            
+            tab_index = 0
+            if 'deepseek_results' in results:
+                with tabs[0]:  # OLED Structured Data (formerly DeepSeek Analysis)
+                    st.subheader("OLED Structured Data")
+                    st.json(results['deepseek_results'])
+                    
+                    # Add download button for DeepSeek results
+                    with open(results['deepseek_path'], 'r', encoding='utf-8') as f:
+                        deepseek_content = f.read()
+                        st.download_button(
+                            label="Download Structured Data",
+                            data=deepseek_content,
+                            file_name=f"{results['data_id']}_structured.json",
+                            mime="application/json"
+                        )
+                tab_index += 1
+                
+            with tabs[tab_index]:  # Markdown Content
+                if 'markdown_content' in results:
+                    st.markdown(results['markdown_content'])
+                else:
+                    st.warning("No Markdown content found")
+                tab_index += 1
+            
+            with tabs[tab_index]:  # Images
+                # Display extracted images
+                if 'images' in results and results['images']:
+                    st.write(f"Found {len(results['images'])} images")
+                    
+                    # Images stay in the result zip; only the selected one is read from it
+                    image_sizes = {img_info['name']: img_info['size'] for img_info in results['images']}
+                    image_name = st.selectbox(
+                        "Select an image", list(image_sizes), index=None,
+                        format_func=lambda name: f"{os.path.basename(name)} ({image_sizes[name] / 1024:.0f} KB)",
+                        key=f"image_select_{results['data_id']}"
+                    )
+                    if image_name is not None:
+                        from mineru import MinerUArchive
+                        try:
+                            with MinerUArchive(results['zip_path'], results['output_dir']) as archive:
+                                st.image(archive.thumbnail(image_name), caption=image_name)
+                                st.download_button(
+                                    label="Download",
+                                    data=archive.read(image_name),
+                                    file_name=os.path.basename(image_name),
+                                    mime=f"image/{image_name.split('.')[-1]}",
+                                    key=f"download_image_{results['data_id']}"
+                                )
+                        except Exception as e:
+                            st.error(f"Error displaying image: {str(e)}")
+                else:
+                    st.warning("No images found in the document")
 
 def show_machine_learning():
     st.title("Deep Research Agent")
@@ -1060,6 +1097,77 @@ def show_machine_learning():
         st.selectbox("Framework", ["PyTorch", "TensorFlow", "Scikit-learn"])
         st.slider("Learning Rate", 0.0001, 0.1, 0.001)
 
+def show_run_dashboard():
+    st.title("Run Dashboard")
+    import pandas as pd
+    from utils import list_runs, summarize_run, RUN_METRICS_DIR
+
+    metrics_dir = st.text_input("Run metrics directory", value=RUN_METRICS_DIR)
+    runs = list_runs(metrics_dir)
+    if not runs:
+        st.info("No extraction runs found. Start extract_info.py to create a run log here.")
+        return
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        run_path = st.selectbox("Run", runs, format_func=os.path.basename)
+    with col2:
+        window = st.selectbox("Rate window", [60, 300, 900, 3600], index=1,
+                              format_func=lambda s: f"last {s // 60} min")
+    with col3:
+        auto_refresh = st.checkbox("Auto refresh (10 s)", value=True)
+
+    snapshot = summarize_run(run_path, window=window)
+    if not snapshot.get("done") and not snapshot.get("requests"):
+        st.info("No finished papers or requests yet.")
+    else:
+        total = snapshot.get("total")
+        done = snapshot["done"]
+        if total:
+            st.progress(min(done / total, 1.0), text=f"{done} / {total} papers")
+        eta = snapshot.get("eta_seconds")
+
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Papers/min", snapshot["papers_per_min"])
+        c2.metric("ETA", str(datetime.timedelta(seconds=int(eta))) if eta is not None else "–")
+        c3.metric("Tokens/min", f"{sum(snapshot['tokens_per_min'].values()):,}")
+        c4.metric("429 rate", f"{snapshot['rate_limited_ratio']:.1%}")
+        c5.metric("Failed", snapshot["failed"])
+
+        if snapshot["bound"] == "quota":
+            st.warning("Quota-bound: more than 5% of recent requests were rate limited (HTTP 429). "
+                       "Add API keys or lower concurrency per key.")
+        else:
+            st.success("Latency-bound: few rate-limit errors; throughput is limited by request latency. "
+                       "More concurrency per key should help.")
+
+        col_left, col_right = st.columns(2)
+        with col_left:
+            st.subheader("Latency histogram (successful requests)")
+            st.bar_chart(pd.Series(snapshot["latency_histogram"], name="requests"))
+            st.caption(f"p50 {snapshot['latency_p50']} s · p95 {snapshot['latency_p95']} s")
+            st.subheader("Failure classes")
+            if snapshot["failure_classes"]:
+                st.dataframe(pd.Series(snapshot["failure_classes"], name="papers"), use_container_width=True)
+            else:
+                st.write("No failed papers.")
+        with col_right:
+            st.subheader("Requests per API key")
+            per_key = pd.DataFrame(snapshot["per_key"]).T
+            if not per_key.empty:
+                per_key["in_flight"] = pd.Series(snapshot["in_flight"])
+                per_key["in_flight"] = per_key["in_flight"].fillna(0).astype(int)
+                st.dataframe(per_key, use_container_width=True)
+                st.bar_chart(per_key["in_flight"])
+            st.subheader("Request status")
+            st.dataframe(pd.Series(snapshot["request_status"], name="requests"), use_container_width=True)
+
+    st.caption(f"Updated {datetime.datetime.fromtimestamp(snapshot['updated_at']):%H:%M:%S} · "
+               f"{snapshot['events']} events")
+    if auto_refresh:
+        time.sleep(10)
+        st.rerun()
+
 # ---------------------------------------------------------------------------
 def main():
     if "current_page" not in st.session_state:
@@ -1076,6 +1184,8 @@ def main():
         show_paper_parser()
     elif page == "Deep Research Agent":
         show_machine_learning()
+    elif page == "Run Dashboard":
+        show_run_dashboard()
 
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
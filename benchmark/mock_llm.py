@@ -0,0 +1,80 @@
+import json
+import random
+import re
+import threading
+import time
+
+from utils import estimate_tokens
+
+ROW_LINE = re.compile(r"^- row (\d+): ", re.M)
+
+
+class ScriptedLLM:
+    """
+    Local stand-in for LLMCaller that answers from per-paper scripts with simulated latency.
+
+    scripts: {paper_id: {"markers": [strings that identify the paper in a prompt],
+                         "full": <answer to the combined extraction prompt>}}
+    The answers to the split, table-completion, repair and triage prompts are derived
+    from "full", so one script covers every pipeline configuration.
+
+    Latency models a hosted chat endpoint: a fixed overhead plus prefill time per 1k
+    prompt tokens plus decode time per 1k completion tokens, with multiplicative jitter.
+    Token counts use the same chars/4 estimate as the section filter.
+    """
+
+    def __init__(self, scripts, base_latency=0.3, prefill_per_1k=0.05, decode_per_1k=1.5,
+                 jitter=0.2, seed=0, time_scale=1.0):
+        self.scripts = scripts
+        self.model = "scripted"
+        self.base_latency = base_latency
+        self.prefill_per_1k = prefill_per_1k
+        self.decode_per_1k = decode_per_1k
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.last_usage = None
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _find_script(self, prompt):
+        for paper_id, script in self.scripts.items():
+            if any(marker in prompt for marker in script["markers"]):
+                return script
+        return None
+
+    def _answer(self, prompt):
+        if "Decide whether the following scientific paper" in prompt:
+            return {"extract": True, "reason": "scripted"}
+        if '{"fixes": [' in prompt:
+            return {"fixes": []}
+        script = self._find_script(prompt)
+        full = script["full"] if script else {"materials": [], "devices": []}
+        if "Task: extract only the emitter materials" in prompt:
+            return {"materials": full.get("materials", [])}
+        if "Task: extract only the OLED devices" in prompt:
+            return {"devices": full.get("devices", [])}
+        if "Device rows:" in prompt:
+            devices = full.get("devices", [])
+            rows = [int(i) for i in ROW_LINE.findall(prompt)]
+            return {
+                "materials": full.get("materials", []),
+                "devices": [{"row": i, **devices[i]} for i in rows if i < len(devices)]
+                           + [{"row": None, **device} for device in devices[len(rows):]],
+            }
+        return full
+
+    def call_llm(self, prompt, system_message="You are a helpful assistant.", response_json=False, stream=False):
+        response_text = json.dumps(self._answer(prompt), ensure_ascii=False)
+        prompt_tokens = estimate_tokens(system_message + prompt)
+        completion_tokens = estimate_tokens(response_text)
+        with self._lock:
+            jitter = 1 + self._random.uniform(-self.jitter, self.jitter)
+            self.last_usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += prompt_tokens
+            self.usage["completion_tokens"] += completion_tokens
+        latency = (self.base_latency + prompt_tokens / 1000 * self.prefill_per_1k
+                   + completion_tokens / 1000 * self.decode_per_1k) * jitter
+        time.sleep(latency * self.time_scale)
+        return response_text
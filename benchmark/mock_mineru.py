@@ -0,0 +1,343 @@
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STREAM_CHUNK = 64 * 1024
+IMAGE_REF = re.compile(r"!\[\]\((images/[^)]+)\)")
+
+
+def make_result_zip(data_id, markdown=None, content_list=None, n_images=3, image_bytes=50_000, seed=0):
+    """
+    A result zip in MinerU's layout: full.md, <data_id>_content_list.json and images/.
+
+    Images referenced by the markdown are created with image_bytes of random content;
+    n_images more are added (and referenced) when the markdown has none.
+    """
+    rng = random.Random(seed)
+    markdown = markdown if markdown is not None else f"# {data_id}\n\nSynthetic MinerU result.\n"
+    content_list = content_list if content_list is not None else [
+        {"type": "text", "text": data_id, "text_level": 1, "page_idx": 0}]
+    images = IMAGE_REF.findall(markdown)
+    if not images:
+        images = [f"images/{data_id}_{i}.jpg" for i in range(n_images)]
+        markdown += "".join(f"\n![]({name})\n" for name in images)
+        content_list = content_list + [{"type": "image", "img_path": name, "img_caption": [], "page_idx": i}
+                                       for i, name in enumerate(images)]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("full.md", markdown)
+        z.writestr(f"{data_id}_content_list.json", json.dumps(content_list, ensure_ascii=False))
+        z.writestr("layout.json", json.dumps({"pdf_info": []}))
+        for name in images:
+            # Random bytes do not compress, like real JPEGs
+            z.writestr(name, rng.randbytes(image_bytes), compress_type=zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+
+def load_fixture_zips(path=FIXTURES_DIR, n_images=3, image_bytes=50_000):
+    """
+    Result zips to serve: every *.zip in path as is, and every benchmark fixture directory
+    (paper.md, optional content_list.json) turned into a zip with synthetic images.
+    """
+    zips = []
+    for name in sorted(os.listdir(path)):
+        full_path = os.path.join(path, name)
+        if name.endswith(".zip"):
+            with open(full_path, "rb") as f:
+                zips.append(f.read())
+        elif os.path.isfile(os.path.join(full_path, "paper.md")):
+            with open(os.path.join(full_path, "paper.md"), "r", encoding="utf-8") as f:
+                markdown = f.read()
+            content_list = None
+            if os.path.exists(os.path.join(full_path, "content_list.json")):
+                with open(os.path.join(full_path, "content_list.json"), "r", encoding="utf-8") as f:
+                    content_list = json.load(f)
+            zips.append(make_result_zip(name, markdown, content_list, n_images=n_images, image_bytes=image_bytes,
+                                        seed=len(zips)))
+    return zips
+
+
+class MockMinerU:
+    """
+    Local stand-in for the MinerU batch API on a ThreadingHTTPServer.
+
+    Endpoints, with the same request/response shapes as mineru.net:
+        POST /api/v4/file-urls/batch                 -> batch_id and one upload url per file
+        PUT  /upload/<batch_id>/<data_id>            -> the PDF body (Content-Length or chunked)
+        GET  /api/v4/extract-results/batch/<id>      -> per-file state and extract_progress
+        GET  /zips/<batch_id>/<data_id>.zip          -> the result zip, streamed
+
+    After its upload a file is "pending" for queue_seconds, then "running" for
+    seconds_per_page per page (extract_progress counts pages up), then "done" or, with
+    probability failure_rate, "failed". Pages are counted with PyMuPDF when count_pages is
+    set and the body is a readable PDF, otherwise `pages` is used. status_error_rate makes
+    status requests return HTTP 503, upload_failure_rate makes uploads return 500.
+    All delays are multiplied by time_scale. Request counts and byte totals are in stats.
+    """
+
+    def __init__(self, fixture_zips=None, token=None, queue_seconds=1.0, seconds_per_page=0.1, pages=10,
+                 failure_rate=0.0, upload_failure_rate=0.0, status_error_rate=0.0, request_latency=0.02,
+                 upload_mbps=None, download_mbps=None, count_pages=False, time_scale=1.0, seed=0,
+                 host="127.0.0.1", port=0):
+        self.fixture_zips = fixture_zips or [make_result_zip("synthetic")]
+        self.token = token
+        self.queue_seconds = queue_seconds
+        self.seconds_per_page = seconds_per_page
+        self.pages = pages
+        self.failure_rate = failure_rate
+        self.upload_failure_rate = upload_failure_rate
+        self.status_error_rate = status_error_rate
+        self.request_latency = request_latency
+        self.upload_mbps = upload_mbps
+        self.download_mbps = download_mbps
+        self.count_pages = count_pages
+        self.time_scale = time_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.batches = {}
+        self._next_fixture = 0
+        self.stats = {"url_requests": 0, "uploads": 0, "status_requests": 0, "downloads": 0,
+                      "bytes_uploaded": 0, "bytes_downloaded": 0, "errors_injected": 0}
+        self.host, self.port = host, port
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api/v4"
+
+    def start(self):
+        mock = self
+
+        class Handler(_Handler):
+            server_mock = mock
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _chance(self, probability):
+        with self._lock:
+            return probability > 0 and self._random.random() < probability
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def file_status(self, batch_id, data_id):
+        f = self.batches[batch_id][data_id]
+        result = {"file_name": f["file_name"], "data_id": data_id, "state": "waiting-file", "err_msg": "",
+                  "full_zip_url": ""}
+        if f["uploaded_at"] is None:
+            return result
+        elapsed = (time.time() - f["uploaded_at"]) / self.time_scale if self.time_scale else float("inf")
+        running = elapsed - self.queue_seconds
+        duration = f["pages"] * self.seconds_per_page
+        if running < 0:
+            result["state"] = "pending"
+        elif running < duration:
+            result["state"] = "running"
+            result["extract_progress"] = {"extracted_pages": int(running / self.seconds_per_page),
+                                          "total_pages": f["pages"],
+                                          "start_time": time.strftime("%Y-%m-%d %H:%M:%S",
+                                                                      time.localtime(f["uploaded_at"]))}
+        elif f["fails"]:
+            result.update({"state": "failed", "err_msg": "mock parse failure"})
+        else:
+            result.update({"state": "done",
+                           "full_zip_url": f"http://{self.host}:{self.port}/zips/{batch_id}/{data_id}.zip"})
+        return result
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        mock = self.server_mock
+        if mock.token is None or self.headers.get("Authorization") == f"Bearer {mock.token}":
+            return True
+        self._send_json({"code": "A0202", "msg": "token error", "data": None}, status=401)
+        return False
+
+    def _read_body(self, keep):
+        """Read the request body (Content-Length or chunked); returns (size, bytes if keep else None)"""
+        chunks, size = [], 0
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                length = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if length == 0:
+                    self.rfile.readline()
+                    break
+                data = self.rfile.read(length)
+                self.rfile.readline()
+                size += len(data)
+                if keep:
+                    chunks.append(data)
+        else:
+            remaining = int(self.headers.get("Content-Length") or 0)
+            while remaining:
+                data = self.rfile.read(min(remaining, STREAM_CHUNK))
+                if not data:
+                    break
+                remaining -= len(data)
+                size += len(data)
+                if keep:
+                    chunks.append(data)
+        return size, b"".join(chunks) if keep else None
+
+    def do_POST(self):
+        mock = self.server_mock
+        _, body = self._read_body(keep=True)
+        if self.path.rstrip("/") != "/api/v4/file-urls/batch":
+            return self._send_json({"code": 404, "msg": "not found"}, status=404)
+        if not self._authorized():
+            return
+        mock._count("url_requests")
+        mock._sleep(mock.request_latency)
+        request = json.loads(body or b"{}")
+        batch_id = uuid.uuid4().hex
+        files = {}
+        for i, f in enumerate(request.get("files", [])):
+            data_id = f.get("data_id") or f"{batch_id[:8]}_{i}"
+            files[data_id] = {"file_name": f.get("name"), "uploaded_at": None, "pages": mock.pages,
+                              "fails": False, "zip": None}
+        with mock._lock:
+            mock.batches[batch_id] = files
+        urls = [f"http://{mock.host}:{mock.port}/upload/{batch_id}/{data_id}" for data_id in files]
+        self._send_json({"code": 0, "msg": "ok", "data": {"batch_id": batch_id, "file_urls": urls}})
+
+    def do_PUT(self):
+        mock = self.server_mock
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "upload" or parts[2] not in mock.batches.get(parts[1], {}):
+            self._read_body(keep=False)
+            return self._send_json({"code": 404, "msg": "not found"}, status=404)
+        _, batch_id, data_id = parts
+        size, body = self._read_body(keep=mock.count_pages and fitz is not None)
+        mock._count("uploads")
+        mock._count("bytes_uploaded", size)
+        if mock.upload_mbps:
+            mock._sleep(size / (mock.upload_mbps * 1024 * 1024))
+        if mock._chance(mock.upload_failure_rate):
+            mock._count("errors_injected")
+            return self._send_json({"code": 500, "msg": "mock upload failure"}, status=500)
+
+        f = mock.batches[batch_id][data_id]
+        if body:
+            try:
+                with fitz.open(stream=body, filetype="pdf") as doc:
+                    f["pages"] = doc.page_count
+            except Exception:
+                pass
+        f["fails"] = mock._chance(mock.failure_rate)
+        with mock._lock:
+            f["zip"] = mock.fixture_zips[mock._next_fixture % len(mock.fixture_zips)]
+            mock._next_fixture += 1
+        f["uploaded_at"] = time.time()
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        mock = self.server_mock
+        parts = self.path.strip("/").split("/")
+        if parts[:3] == ["api", "v4", "extract-results"] and len(parts) == 5 and parts[3] == "batch":
+            if not self._authorized():
+                return
+            mock._count("status_requests")
+            mock._sleep(mock.request_latency)
+            if mock._chance(mock.status_error_rate):
+                mock._count("errors_injected")
+                return self._send_json({"code": 503, "msg": "mock service unavailable"}, status=503)
+            batch_id = parts[4]
+            if batch_id not in mock.batches:
+                return self._send_json({"code": -60012, "msg": "batch not found", "data": None})
+            results = [mock.file_status(batch_id, data_id) for data_id in mock.batches[batch_id]]
+            return self._send_json({"code": 0, "msg": "ok",
+                                    "data": {"batch_id": batch_id, "extract_result": results}})
+
+        if parts[0] == "zips" and len(parts) == 3:
+            f = mock.batches.get(parts[1], {}).get(parts[2][:-len(".zip")])
+            if f is None or f["zip"] is None:
+                return self._send_json({"code": 404, "msg": "not found"}, status=404)
+            data = f["zip"]
+            mock._count("downloads")
+            mock._count("bytes_downloaded", len(data))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            for start in range(0, len(data), STREAM_CHUNK):
+                self.wfile.write(data[start:start + STREAM_CHUNK])
+                if mock.download_mbps:
+                    mock._sleep(STREAM_CHUNK / (mock.download_mbps * 1024 * 1024))
+            return
+
+        self._send_json({"code": 404, "msg": "not found"}, status=404)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local MinerU API stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of result zips / benchmark fixtures")
+    parser.add_argument("--token", default=None, help="require this bearer token")
+    parser.add_argument("--queue-seconds", type=float, default=1.0)
+    parser.add_argument("--seconds-per-page", type=float, default=0.1)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--status-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockMinerU(load_fixture_zips(args.fixtures), token=args.token, queue_seconds=args.queue_seconds,
+                        seconds_per_page=args.seconds_per_page, pages=args.pages, failure_rate=args.failure_rate,
+                        status_error_rate=args.status_error_rate, port=args.port)
+    print(f"Mock MinerU API at {server.start()}  (MinerUClient(token, base_url=...))")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
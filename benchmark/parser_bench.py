@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mineru import MinerUClient
+from parser_core import parse_pdf
+from mock_mineru import FIXTURES_DIR, MockMinerU, load_fixture_zips
+from run_benchmark import RELATIVE_TOLERANCE, RESULTS_DIR, _git_commit
+
+TOKEN = "mock-token"
+
+
+def make_pdfs(folder, n_files, pdf_kb):
+    """n_files 个假PDF（内容随机，模拟服务不解析内容），返回路径列表"""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(folder, f"paper_{i:04d}.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.7\n" + os.urandom(pdf_kb * 1024))
+        paths.append(path)
+    return paths
+
+
+def run_batch(client, paths, output_dir):
+    """所有文件一次提交，统一轮询，完成即下载（MinerUClient.parse_to_dir）"""
+    start = time.perf_counter()
+    latencies, failures = [], []
+    for result in client.parse_to_dir([(path, path) for path in paths], output_dir):
+        latencies.append(time.perf_counter() - start)
+        if result["state"] != "done":
+            failures.append(f"{result['file_name']}: {result.get('err_msg')}")
+    return latencies, failures
+
+
+def run_single(client, paths, output_dir, workers):
+    """每个文件单独走 parser_core.parse_pdf（与 Streamlit 页面相同的路径），workers 个并发"""
+    def one(path):
+        start = time.perf_counter()
+        try:
+            parse_pdf(path, TOKEN, output_dir=output_dir, client=client, split=False)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, f"{os.path.basename(path)}: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(one, paths))
+    return [latency for latency, _ in runs], [error for _, error in runs if error]
+
+
+def run_parser_benchmark(mode="batch", n_files=20, pdf_kb=500, workers=8, server_options=None,
+                         client_options=None, fixtures=FIXTURES_DIR, n_images=5, image_kb=200):
+    work_dir = tempfile.mkdtemp(prefix="parser_bench_")
+    zips = load_fixture_zips(fixtures, n_images=n_images, image_bytes=image_kb * 1024)
+    try:
+        paths = make_pdfs(os.path.join(work_dir, "pdf"), n_files, pdf_kb)
+        with MockMinerU(zips, token=TOKEN, **(server_options or {})) as server:
+            client = MinerUClient(TOKEN, base_url=server.base_url, **(client_options or {}))
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            tracemalloc.start()
+            start = time.perf_counter()
+            if mode == "batch":
+                latencies, failures = run_batch(client, paths, os.path.join(work_dir, "out"))
+            else:
+                latencies, failures = run_single(client, paths, os.path.join(work_dir, "out"), workers)
+            wall = time.perf_counter() - start
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            stats = dict(server.stats)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    latencies = np.array(latencies)
+    return {
+        "files": n_files,
+        "failures": failures,
+        "wall_seconds": round(wall, 3),
+        "papers_per_min": round(n_files / wall * 60, 2),
+        "latency_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95": round(float(np.percentile(latencies, 95)), 3),
+        "status_requests": stats["status_requests"],
+        "status_requests_per_file": round(stats["status_requests"] / n_files, 2),
+        "url_requests": stats["url_requests"],
+        "uploaded_mb": round(stats["bytes_uploaded"] / 1024 ** 2, 2),
+        "downloaded_mb": round(stats["bytes_downloaded"] / 1024 ** 2, 2),
+        # tracemalloc 统计本进程（含模拟服务线程）Python 分配的峰值；ru_maxrss 在 Linux 上单位为 KB
+        "traced_peak_mb": round(traced_peak / 1024 ** 2, 2),
+        "max_rss_growth_mb": round((rss_after - rss_before) / 1024, 2),
+    }
+
+
+def compare(report, baseline):
+    """打印与基线的差异，返回回归项列表"""
+    regressions = []
+    rows = [("papers_per_min", True), ("latency_p95", False), ("status_requests_per_file", False),
+            ("traced_peak_mb", False)]
+    print(f"\n{'metric':<26}{'baseline':>12}{'current':>12}{'delta':>12}")
+    for metric, higher_is_better in rows:
+        current, base = report[metric], baseline[metric]
+        print(f"{metric:<26}{base:>12}{current:>12}{current - base:>+12.3f}")
+        if higher_is_better and current < base * (1 - RELATIVE_TOLERANCE):
+            regressions.append(metric)
+        elif not higher_is_better and current > base * (1 + RELATIVE_TOLERANCE):
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用本地模拟的 MinerU 服务测PDF解析的吞吐、轮询次数和内存")
+    parser.add_argument("--mode", choices=["batch", "single"], default="batch",
+                        help="batch: 批量提交统一轮询；single: 每个文件单独调用 parse_pdf")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--pdf-kb", type=int, default=500, help="每个假PDF的大小")
+    parser.add_argument("--workers", type=int, default=8, help="single 模式的并发数")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="结果zip目录或 benchmark 语料目录")
+    parser.add_argument("--images", type=int, default=5, help="语料没有图片时每个结果zip的图片数")
+    parser.add_argument("--image-kb", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=10, help="模拟的每个文件页数")
+    parser.add_argument("--queue-seconds", type=float, default=1.0)
+    parser.add_argument("--seconds-per-page", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--status-error-rate", type=float, default=0.0)
+    parser.add_argument("--request-latency", type=float, default=0.02)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="模拟延迟的缩放")
+    parser.add_argument("--poll-interval", type=float, default=None, help="客户端最小轮询间隔")
+    parser.add_argument("--label", default=None, help="结果文件名，默认用时间戳")
+    parser.add_argument("--baseline", default=None, help="基线结果JSON，有回归时退出码为1")
+    args = parser.parse_args()
+
+    server_options = {"pages": args.pages, "queue_seconds": args.queue_seconds,
+                      "seconds_per_page": args.seconds_per_page, "failure_rate": args.failure_rate,
+                      "status_error_rate": args.status_error_rate, "request_latency": args.request_latency,
+                      "time_scale": args.time_scale}
+    client_options = {"poll_interval": args.poll_interval} if args.poll_interval is not None else {}
+    report = run_parser_benchmark(args.mode, args.files, args.pdf_kb, args.workers, server_options, client_options,
+                                  args.fixtures, args.images, args.image_kb)
+    report["config"] = {"mode": args.mode, "pdf_kb": args.pdf_kb, "workers": args.workers,
+                        "images": args.images, "image_kb": args.image_kb, "server": server_options,
+                        "client": client_options, "commit": _git_commit(),
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    print(f"文件 {report['files']} 个，用时 {report['wall_seconds']} s，{report['papers_per_min']} 篇/分钟")
+    print(f"延迟 p50 {report['latency_p50']} s，p95 {report['latency_p95']} s；"
+          f"状态请求 {report['status_requests']} 次（每文件 {report['status_requests_per_file']}）")
+    print(f"上传 {report['uploaded_mb']} MB，下载 {report['downloaded_mb']} MB；"
+          f"Python 内存峰值 {report['traced_peak_mb']} MB，RSS 增长 {report['max_rss_growth_mb']} MB")
+    for failure in report["failures"]:
+        print(f"解析失败 {failure}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"parser-{args.label or time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已保存到 {output_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f"回归: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import WorkQueue
+
+
+def run_worker(args):
+    """
+    领取-处理-完成的循环，按概率模拟两种异常：
+    crash 领取后直接丢下（不 complete 也不 fail，等租约过期），fail 调用 queue.fail 放回队列。
+    每次处理写一行事件到本进程的日志文件，返回 worker_id
+    """
+    db_path, log_path, worker_id, lease_seconds, max_attempts, work_seconds, crash_rate, fail_rate, seed = args
+    rng = random.Random(seed)
+    queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    with open(log_path, "w", encoding="utf-8") as log:
+        while True:
+            dois = queue.claim(worker_id)
+            if not dois:
+                stats = queue.stats()
+                if stats["pending"] + stats["leased"] + stats["expired"] == 0:
+                    break
+                time.sleep(lease_seconds / 10)  # 其他 worker 还持有租约，等它们完成或过期
+                continue
+            for doi in dois:
+                started = time.time()
+                time.sleep(work_seconds)
+                roll = rng.random()
+                if roll < crash_rate:
+                    event = "crash"
+                elif roll < crash_rate + fail_rate:
+                    queue.fail(doi, worker_id, "simulated failure")
+                    event = "fail"
+                else:
+                    queue.complete(doi, worker_id)
+                    event = "done"
+                log.write(json.dumps({"doi": doi, "worker": worker_id, "event": event,
+                                      "start": started, "end": time.time()}) + "\n")
+    queue.close()
+    return worker_id
+
+
+def check_queue(n_workers=8, n_dois=500, lease_seconds=1.0, max_attempts=3, work_seconds=0.002,
+                crash_rate=0.05, fail_rate=0.05, seed=0):
+    """
+    n_workers 个进程同时处理临时队列，返回统计和违反的约束列表：
+    每个DOI最多完成一次；同一DOI的两次处理不重叠（租约有效期内不会被他人领取）；
+    崩溃留下的过期租约被重新领取直到完成，或领取 max_attempts 次后标记为 failed；最终没有残留任务。
+    """
+    work_dir = tempfile.mkdtemp(prefix="queue_check_")
+    db_path = os.path.join(work_dir, "queue.sqlite")
+    try:
+        queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        dois = [f"10.1000/check.{i:06d}" for i in range(n_dois)]
+        queue.enqueue(dois)
+        queue.close()
+
+        worker_args = [(db_path, os.path.join(work_dir, f"worker-{i}.jsonl"), f"worker-{i}", lease_seconds,
+                        max_attempts, work_seconds, crash_rate, fail_rate, seed + i) for i in range(n_workers)]
+        start = time.perf_counter()
+        with Pool(n_workers) as pool:
+            worker_ids = pool.map(run_worker, worker_args)
+        wall = time.perf_counter() - start
+
+        events = []
+        for worker_id in worker_ids:
+            with open(os.path.join(work_dir, f"{worker_id}.jsonl"), "r", encoding="utf-8") as f:
+                events.extend(json.loads(line) for line in f)
+        queue = WorkQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        final = {doi: (status, attempts) for doi, status, attempts in
+                 queue.conn.execute("SELECT doi, status, attempts FROM tasks").fetchall()}
+        stats = queue.stats()
+        queue.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    violations = []
+    by_doi = defaultdict(list)
+    for event in events:
+        by_doi[event["doi"]].append(event)
+    done_counts = Counter(event["doi"] for event in events if event["event"] == "done")
+    violations += [f"{doi}: 完成 {count} 次" for doi, count in done_counts.items() if count > 1]
+    for doi, runs in by_doi.items():
+        runs.sort(key=lambda event: event["start"])
+        for previous, current in zip(runs, runs[1:]):
+            if current["start"] < previous["end"]:
+                violations.append(f"{doi}: {previous['worker']} 和 {current['worker']} 同时处理")
+    for doi in dois:
+        status, attempts = final[doi]
+        if status not in ("done", "failed"):
+            violations.append(f"{doi}: 结束时状态为 {status}")
+        elif status == "done" and done_counts[doi] != 1:
+            violations.append(f"{doi}: 状态为 done 但完成记录 {done_counts[doi]} 次")
+        elif status == "failed" and attempts < max_attempts:
+            violations.append(f"{doi}: 只领取 {attempts} 次就标记为 failed")
+        if attempts > max_attempts:
+            violations.append(f"{doi}: 领取 {attempts} 次，超过 max_attempts={max_attempts}")
+
+    crashed = {event["doi"] for event in events if event["event"] == "crash"}
+    return {
+        "workers": n_workers,
+        "dois": n_dois,
+        "wall_seconds": round(wall, 3),
+        "claims": len(events),
+        "crashes": sum(event["event"] == "crash" for event in events),
+        "failures": sum(event["event"] == "fail" for event in events),
+        "crashed_then_done": sum(final[doi][0] == "done" for doi in crashed),
+        "crashed_then_failed": sum(final[doi][0] == "failed" for doi in crashed),
+        "final": stats,
+        "violations": violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程同时处理临时任务队列，检查DOI不被重复处理、过期租约被重新领取")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dois", type=int, default=500)
+    parser.add_argument("--lease", type=float, default=1.0, help="租约秒数（处理时间要远小于它）")
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--work-seconds", type=float, default=0.002, help="每个DOI模拟的处理时间")
+    parser.add_argument("--crash-rate", type=float, default=0.05, help="领取后丢下租约的概率")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="调用 fail 放回队列的概率")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = check_queue(args.workers, args.dois, args.lease, args.max_attempts, args.work_seconds,
+                         args.crash_rate, args.fail_rate, args.seed)
+    print(f"{report['workers']} 个 worker 处理 {report['dois']} 个DOI，用时 {report['wall_seconds']} s，"
+          f"共领取 {report['claims']} 次")
+    print(f"模拟崩溃 {report['crashes']} 次（之后完成 {report['crashed_then_done']} 个，"
+          f"标记 failed {report['crashed_then_failed']} 个），模拟失败 {report['failures']} 次")
+    print(f"最终队列状态: {report['final']}")
+    for violation in report["violations"][:50]:
+        print(f"违反: {violation}")
+    if report["violations"]:
+        print(f"共 {len(report['violations'])} 处违反")
+        sys.exit(1)
+    print("检查通过")
+
+
+if __name__ == '__main__':
+    main()
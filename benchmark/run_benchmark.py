@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import extract_info
+from mock_llm import ScriptedLLM
+from scoring import score
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# 与基线比较时视为回归的阈值
+ACCURACY_TOLERANCE = 0.01      # precision/recall/f1 绝对下降
+RELATIVE_TOLERANCE = 0.10      # papers/min 下降或 tokens/paper 上升的比例
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """
+    每篇论文一个目录：paper.md、gold.json、llm_script.json，可选 content_list.json（MinerU JSON）
+    """
+    fixtures = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        paper_dir = os.path.join(fixtures_dir, name)
+        if not os.path.isdir(paper_dir):
+            continue
+        with open(os.path.join(paper_dir, "paper.md"), "r", encoding="utf-8") as f:
+            md = f.read()
+        with open(os.path.join(paper_dir, "gold.json"), "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        with open(os.path.join(paper_dir, "llm_script.json"), "r", encoding="utf-8") as f:
+            script = json.load(f)
+        content_list = None
+        if os.path.exists(os.path.join(paper_dir, "content_list.json")):
+            with open(os.path.join(paper_dir, "content_list.json"), "r", encoding="utf-8") as f:
+                content_list = json.load(f)
+        fixtures.append({"id": name, "md": md, "gold": gold, "script": script, "content_list": content_list})
+    return fixtures
+
+
+def run_one(fixture, scripts, llm_options, seed):
+    llm = ScriptedLLM(scripts, seed=seed, **llm_options)
+    start = time.perf_counter()
+    try:
+        result_dict, tokens_saved = extract_info.extract_paper(llm, fixture["md"], fixture["content_list"],
+                                                               doi=fixture["id"])
+        error = None
+    except Exception as e:
+        result_dict, tokens_saved, error = {"materials": [], "devices": []}, 0, str(e)
+    return {
+        "id": fixture["id"],
+        "latency": time.perf_counter() - start,
+        "usage": dict(llm.usage),
+        "tokens_saved": tokens_saved,
+        "result": result_dict,
+        "error": error,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(fixtures, workers=4, repeat=3, llm_options=None):
+    llm_options = llm_options or {}
+    scripts = {f["id"]: f["script"] for f in fixtures}
+    tasks = [(f, seed) for seed in range(repeat) for f in fixtures]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(lambda t: run_one(t[0], scripts, llm_options, t[1]), tasks))
+    wall = time.perf_counter() - start
+
+    latencies = np.array([r["latency"] for r in runs])
+    prompt_tokens = np.array([r["usage"]["prompt_tokens"] for r in runs])
+    completion_tokens = np.array([r["usage"]["completion_tokens"] for r in runs])
+    gold = {f["id"]: f["gold"] for f in fixtures}
+    accuracy = score([(r["result"], gold[r["id"]]) for r in runs])
+    return {
+        "papers": len(runs),
+        "errors": [{"id": r["id"], "error": r["error"]} for r in runs if r["error"]],
+        "wall_seconds": round(wall, 3),
+        "papers_per_min": round(len(runs) / wall * 60, 2),
+        "latency_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95": round(float(np.percentile(latencies, 95)), 3),
+        "calls_per_paper": round(float(np.mean([r["usage"]["calls"] for r in runs])), 2),
+        "prompt_tokens_per_paper": round(float(prompt_tokens.mean()), 1),
+        "completion_tokens_per_paper": round(float(completion_tokens.mean()), 1),
+        "tokens_per_paper": round(float((prompt_tokens + completion_tokens).mean()), 1),
+        "filter_tokens_saved_per_paper": round(float(np.mean([r["tokens_saved"] for r in runs])), 1),
+        "accuracy": accuracy,
+    }
+
+
+def compare(report, baseline):
+    """打印与基线的差异，返回回归项列表"""
+    regressions = []
+    rows = [
+        ("papers_per_min", report["papers_per_min"], baseline["papers_per_min"]),
+        ("tokens_per_paper", report["tokens_per_paper"], baseline["tokens_per_paper"]),
+        ("latency_p50", report["latency_p50"], baseline["latency_p50"]),
+        ("latency_p95", report["latency_p95"], baseline["latency_p95"]),
+    ] + [(m, report["accuracy"]["overall"][m], baseline["accuracy"]["overall"][m])
+         for m in ("precision", "recall", "f1")]
+    print(f"\n{'metric':<20}{'baseline':>12}{'current':>12}{'delta':>12}")
+    for metric, current, base in rows:
+        print(f"{metric:<20}{base:>12}{current:>12}{current - base:>+12.3f}")
+        if metric in ("precision", "recall", "f1") and current < base - ACCURACY_TOLERANCE:
+            regressions.append(metric)
+        elif metric == "papers_per_min" and current < base * (1 - RELATIVE_TOLERANCE):
+            regressions.append(metric)
+        elif metric == "tokens_per_paper" and current > base * (1 + RELATIVE_TOLERANCE):
+            regressions.append(metric)
+
+    base_fields = baseline["accuracy"]["per_field"]
+    for field, stats in report["accuracy"]["per_field"].items():
+        if field in base_fields and stats["recall"] < base_fields[field]["recall"] - ACCURACY_TOLERANCE:
+            print(f"  recall down: {field} {base_fields[field]['recall']} -> {stats['recall']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用固定语料和脚本化LLM测抽取流程的吞吐、token用量和字段级准确率")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--workers", type=int, default=4, help="并发处理的论文数")
+    parser.add_argument("--repeat", type=int, default=3, help="语料重复次数（延迟抖动的随机种子不同）")
+    parser.add_argument("--split", action="store_true", help="SPLIT_EXTRACTION=True")
+    parser.add_argument("--no-filter", action="store_true", help="FILTER_SECTIONS=False")
+    parser.add_argument("--no-table-first", action="store_true", help="TABLE_FIRST=False")
+    parser.add_argument("--triage", choices=["keyword", "none"], default="keyword")
+    parser.add_argument("--base-latency", type=float, default=0.3, help="每次调用的固定延迟（秒）")
+    parser.add_argument("--decode-per-1k", type=float, default=1.5, help="每1k输出token的生成时间（秒）")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="模拟延迟的缩放，0 只测本地开销")
+    parser.add_argument("--label", default=None, help="结果文件名，默认用时间戳")
+    parser.add_argument("--baseline", default=None, help="基线结果JSON，有回归时退出码为1")
+    args = parser.parse_args()
+
+    extract_info.SPLIT_EXTRACTION = args.split
+    extract_info.FILTER_SECTIONS = not args.no_filter
+    extract_info.TABLE_FIRST = not args.no_table_first
+    extract_info.TRIAGE_MODE = None if args.triage == "none" else args.triage
+    llm_options = {"base_latency": args.base_latency, "decode_per_1k": args.decode_per_1k,
+                   "time_scale": args.time_scale}
+
+    fixtures = load_fixtures(args.fixtures)
+    report = run_benchmark(fixtures, workers=args.workers, repeat=args.repeat, llm_options=llm_options)
+    report["config"] = {
+        "split": args.split, "filter_sections": not args.no_filter, "table_first": not args.no_table_first,
+        "triage": args.triage, "workers": args.workers, "repeat": args.repeat, "llm": llm_options,
+        "prompt_version": extract_info.current_prompt_version(), "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    overall = report["accuracy"]["overall"]
+    print(f"论文 {report['papers']} 篇，用时 {report['wall_seconds']} s，{report['papers_per_min']} 篇/分钟")
+    print(f"延迟 p50 {report['latency_p50']} s，p95 {report['latency_p95']} s；"
+          f"每篇 {report['tokens_per_paper']} tokens，{report['calls_per_paper']} 次调用")
+    print(f"字段级 precision {overall['precision']}，recall {overall['recall']}，f1 {overall['f1']}")
+    for error in report["errors"]:
+        print(f"抽取失败 {error['id']}: {error['error']}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"{args.label or time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"结果已保存到 {output_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print(f"回归: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
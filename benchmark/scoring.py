@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+# Fields that identify a record rather than describe it; they form the record key
+MATERIAL_KEY_FIELDS = ("emitter_name_abbreviation", "emitter_name_full")
+
+
+def _norm(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return f"{float(value):.4g}"
+    return " ".join(str(value).split()).lower()
+
+
+def _leaves(node, path):
+    """Yield (path, value) for every non-null leaf; list items share their parent path"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _leaves(value, f"{path}.{key}" if path else key)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _leaves(item, path)
+    elif node is not None:
+        yield path, _norm(node)
+
+
+def _material_key(material):
+    for field in MATERIAL_KEY_FIELDS:
+        if material.get(field):
+            return _norm(material[field])
+    return None
+
+
+def _device_key(device):
+    """Devices are matched on their emitter(s) and host, not on list position"""
+    details = ((device.get("device_structure") or {}).get("emission_layer_details") or {})
+    layers = [details] + [layer for layer in details.get("emission_layers") or [] if isinstance(layer, dict)]
+    emitters = set()
+    for layer in layers:
+        emitters.update(_norm(d.get("name")) for d in layer.get("dopants") or [] if isinstance(d, dict))
+        if layer.get("pure_emitter"):
+            emitters.add(_norm(layer["pure_emitter"]))
+    return "+".join(sorted(e for e in emitters if e)), _norm(details.get("host"))
+
+
+def extraction_facts(result_dict):
+    """Flatten an extraction result into a set of (field, record_key, value) facts"""
+    facts = set()
+    for material in result_dict.get("materials") or []:
+        key = _material_key(material)
+        facts.update((f"materials.{path}", key, value) for path, value in _leaves(material, ""))
+    for device in result_dict.get("devices") or []:
+        key = _device_key(device)
+        facts.update((f"devices.{path}", key, value) for path, value in _leaves(device, ""))
+    return facts
+
+
+def _prf(tp, n_pred, n_gold):
+    precision = tp / n_pred if n_pred else (1.0 if not n_gold else 0.0)
+    recall = tp / n_gold if n_gold else (1.0 if not n_pred else 0.0)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4),
+            "tp": tp, "predicted": n_pred, "gold": n_gold}
+
+
+def score(pairs):
+    """
+    Field-level precision/recall of predictions against gold over a corpus
+
+    pairs: [(predicted_dict, gold_dict)]
+    Returns {"overall": {...}, "per_field": {field: {...}}}; a fact counts as correct
+    only if the same field has the same value on the same (emitter-keyed) record.
+    Units are compared as written, so unit normalisation changes show up here too.
+    """
+    counts = defaultdict(lambda: [0, 0, 0])
+    for predicted, gold in pairs:
+        pred_facts, gold_facts = extraction_facts(predicted), extraction_facts(gold)
+        for fact in pred_facts:
+            counts[fact[0]][1] += 1
+            if fact in gold_facts:
+                counts[fact[0]][0] += 1
+        for fact in gold_facts:
+            counts[fact[0]][2] += 1
+    per_field = {field: _prf(*c) for field, c in sorted(counts.items())}
+    totals = [sum(c[i] for c in counts.values()) for i in range(3)]
+    return {"overall": _prf(*totals), "per_field": per_field}
@@ -0,0 +1,20 @@
+import argparse
+import os
+from utils import ResultStore, update_device_table, load_device_table, EXTRACT_INFO_DIR
+
+RESULT_STORE_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "results.sqlite")
+DEVICE_TABLE_DIR = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "device_table")
+
+def main():
+    parser = argparse.ArgumentParser(description="把汇总库中新增的抽取结果展开、统一单位后追加到器件表")
+    parser.add_argument("--store", default=RESULT_STORE_PATH, help="汇总结果库路径")
+    parser.add_argument("--output", default=DEVICE_TABLE_DIR, help="器件表 Parquet 分片目录")
+    args = parser.parse_args()
+
+    store = ResultStore(args.store)
+    n_new = update_device_table(store, args.output)
+    store.close()
+    print(f"本次处理 {n_new} 个DOI，器件表共 {len(load_device_table(args.output))} 行")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+import argparse
+import os
+from utils import (ResultStore, update_quality_index, build_quality_index_from_json, valid_mask,
+                   EXTRACT_INFO_DIR)
+
+RESULT_STORE_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "results.sqlite")
+QUALITY_INDEX_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "quality_index.parquet")
+
+def main():
+    parser = argparse.ArgumentParser(description="增量构建全库质量索引（has_emitter_name/has_EQE/has_SMILES/n_devices/n_materials）")
+    parser.add_argument("--output", default=QUALITY_INDEX_PATH, help="索引 Parquet 路径")
+    parser.add_argument("--from-json", action="store_true", help="从 extract_info/ 下的单DOI JSON 构建，而不是汇总库")
+    parser.add_argument("--processes", type=int, default=8, help="--from-json 时的进程数")
+    args = parser.parse_args()
+
+    if args.from_json:
+        index = build_quality_index_from_json(EXTRACT_INFO_DIR, args.output, processes=args.processes)
+    else:
+        store = ResultStore(RESULT_STORE_PATH)
+        index = update_quality_index(store, args.output)
+        store.close()
+    if index is None:
+        print("没有可索引的结果")
+        return
+    print(f"索引共 {len(index)} 个DOI，其中有效 {int(valid_mask(index).sum())} 个")
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,18 @@
 import pandas as pd
 import os
+import argparse
 from openai import OpenAI
 import base64
 import json
 from multiprocessing import Pool
+from itertools import islice
 from tqdm import tqdm
-from llm import LLMCaller, VisualLLMCaller, get_text_prompt
-from utils import read_md, doi_encode, doi_decode
+from llm import LLMCaller, VisualLLMCaller, stamp_result, is_stale, prompt_version
+from utils import (read_md, read_mineru_json, find_pdf,
+                   DedupIndex, file_sha256, simhash, ResultStore, doi_file, WorkQueue, LeaseHeartbeat,
+                   default_worker_id, stream_dois, bounded_imap_unordered, RunMetrics, classify_error, write_snapshot, RUN_METRICS_DIR,
+                   EXTRACT_INFO_DIR)
+import parser_core
 import time
 
 # API密钥列表
@@ -20,6 +26,48 @@ BASE_CONFIG = {
     "base_url": "https://api.deepseek.com/v1",
 }
 
+# 提示前去掉参考文献、致谢等无关章节
+FILTER_SECTIONS = True
+# 材料和器件分两个子提示并发抽取
+SPLIT_EXTRACTION = False
+# 器件指标优先从MinerU JSON中的性能表按规则读取，LLM只补全结构和材料
+TABLE_FIRST = True
+# 内容指纹索引：PDF哈希或markdown SimHash与已处理论文重复时直接关联已有结果
+DEDUP_INDEX_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "dedup_index.sqlite")
+# 汇总结果库（每个材料/器件一行）；WRITE_JSON 保留原来的单DOI JSON输出
+RESULT_STORE_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "results.sqlite")  # 与 build_device_table.py 一致
+WRITE_JSON = True
+# 多机 worker 模式：共享文件系统上的任务队列
+WORK_QUEUE_PATH = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "work_queue.sqlite")
+DOI_CSV_PATH = '/home/qianzhang/MyProject/deepseek/000-final/scripts/files/split_pdfs_info-20250417.csv'
+
+# 每个进程最多排队的任务数，DOI列表按需读取
+MAX_IN_FLIGHT_PER_PROCESS = 4
+ENQUEUE_BATCH = 10000
+
+# 运行指标事件日志（Run Dashboard 页面读取），main/worker 启动时设置
+RUN_METRICS_PATH = None
+SNAPSHOT_INTERVAL = 30
+
+_result_store = None
+_result_store_pid = None
+_result_store_wal = True
+_run_metrics = None
+
+# 完整抽取前的分诊："keyword" 本地关键词分类，"llm" 调用小模型，None 不分诊
+TRIAGE_MODE = "keyword"
+TRIAGE_CONFIG = {
+    "model": "deepseek-chat",
+    "base_url": "https://api.deepseek.com/v1",
+}
+
+def pipeline_options():
+    """影响抽取结果的流程开关，写进结果的版本记录（见 llm.prompt_version）"""
+    return {"filter_sections": FILTER_SECTIONS, "table_first": TABLE_FIRST, "split": SPLIT_EXTRACTION}
+
+def current_prompt_version():
+    return prompt_version(**pipeline_options())
+
 def get_config_with_key(api_key):
     """获取包含特定API密钥的配置"""
     return {
@@ -27,13 +75,117 @@ def get_config_with_key(api_key):
         "api_key": api_key
     }
 
+def get_triage_llm(api_key):
+    """TRIAGE_MODE 为 "llm" 时分诊用的小模型，其余模式返回None"""
+    if TRIAGE_MODE != "llm":
+        return None
+    return LLMCaller(model=TRIAGE_CONFIG["model"], api_key=api_key, base_url=TRIAGE_CONFIG["base_url"])
+
+def get_run_metrics():
+    """每个进程一个事件记录器，未设置 RUN_METRICS_PATH 时返回None"""
+    global _run_metrics
+    if _run_metrics is None and RUN_METRICS_PATH:
+        _run_metrics = RunMetrics(RUN_METRICS_PATH)
+    return _run_metrics
+
+def new_run_metrics_path(prefix="run"):
+    return os.path.join(RUN_METRICS_DIR, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+
+def result_path(doi, create=False):
+    """抽取结果JSON路径：已有目录（旧平铺布局或分片布局）优先，新结果写到分片布局"""
+    return doi_file(EXTRACT_INFO_DIR, doi, ".json", create=create)
+
+def get_result_store():
+    """每个进程共用一个汇总库连接；fork 出的子进程不沿用父进程的连接（SQLite 连接不能跨 fork 使用）"""
+    global _result_store, _result_store_pid
+    if _result_store is None or _result_store_pid != os.getpid():
+        _result_store = ResultStore(RESULT_STORE_PATH, wal=_result_store_wal)
+        _result_store_pid = os.getpid()
+    return _result_store
+
+def close_result_store():
+    """关闭本进程的汇总库连接，创建进程池前调用，避免子进程继承打开的连接"""
+    global _result_store, _result_store_pid
+    if _result_store is not None and _result_store_pid == os.getpid():
+        _result_store.close()
+    _result_store = _result_store_pid = None
+
+def result_exists(doi):
+    return doi in get_result_store() or os.path.exists(result_path(doi))
+
+def load_result(doi):
+    """从汇总库读取结果，库中没有时读单DOI JSON"""
+    result_dict = get_result_store().get(doi)
+    if result_dict is None and os.path.exists(result_path(doi)):
+        with open(result_path(doi), 'r', encoding='utf-8') as f:
+            result_dict = json.load(f)
+    return result_dict
+
+def save_result(doi, result_dict):
+    """保存抽取结果"""
+    get_result_store().put(doi, result_dict)
+    if not WRITE_JSON:
+        return
+    save_path = result_path(doi, create=True)
+    
+    with open(save_path, "w", encoding='utf-8') as f:
+        json.dump(result_dict, f, indent=2, ensure_ascii=False)
+
+def link_duplicate(doi, dedup_index, pdf_sha256, md_simhash):
+    """与已处理论文重复时复制其结果并记录来源，返回原DOI；否则返回None"""
+    original = dedup_index.find_duplicate(pdf_sha256, md_simhash, exclude=doi)
+    result_dict = load_result(original) if original is not None else None
+    if result_dict is None:
+        return None
+    # 原结果来自旧提示词时不复用
+    if is_stale(result_dict, BASE_CONFIG["model"], **pipeline_options()):
+        return None
+    result_dict["duplicate_of"] = original
+    save_result(doi, result_dict)
+    return original
+
+def extract_paper(llm, doi_text, mineru_json=None, api_key=None, doi=""):
+    """
+    单篇论文的抽取流程（分诊 -> 章节过滤 -> 表格规则读取 -> LLM结构化抽取），不读写任何文件
+
+    按本模块的配置调用 parser_core.run_extraction（Streamlit 页面走同一流程）；
+    process_single_doi 和 benchmark/run_benchmark.py 共用，llm 可以是任何有 call_llm 方法的对象。
+
+    Returns:
+        (result_dict, tokens_saved)；分诊判为不抽取时 materials/devices 为空
+    """
+    result_dict, stats = parser_core.run_extraction(
+        llm, doi_text, mineru_json, triage_mode=TRIAGE_MODE, triage_llm=get_triage_llm(api_key),
+        filter_sections=FILTER_SECTIONS, table_first=TABLE_FIRST, split=SPLIT_EXTRACTION)
+    repair_report = stats["repair"]
+    if repair_report and repair_report["invalid_fields"]:
+        print(f"{doi}: {repair_report['invalid_fields']} 个字段校验失败，"
+              f"修复 {repair_report['repaired']} 个，置空 {repair_report['nulled']} 个")
+    return result_dict, stats["tokens_saved"]
+
 def process_single_doi(args):
-    """处理单个DOI的函数"""
-    doi, api_key = args
+    """处理单个DOI的函数，args 为 (doi, api_key) 或 (doi, api_key, overwrite)"""
+    doi = args[0]
+    started = time.time()
+    metrics = get_run_metrics()
+    try:
+        tokens_saved = _process_single_doi(args, metrics)
+        success, error_msg, error_class = True, None, None
+    except Exception as e:
+        tokens_saved, success, error_msg, error_class = 0, False, str(e), classify_error(e)
+    if metrics is not None:
+        metrics.paper_finished(doi, success, time.time() - started, error_class, tokens_saved)
+    return doi, success, error_msg, tokens_saved
+
+def _process_single_doi(args, metrics=None):
+    """返回章节过滤节省的token数，失败时抛出异常"""
+    doi, api_key = args[:2]
+    overwrite = len(args) > 2 and args[2]
+    dedup_index = None
     try:
-        if os.path.exists(f"/home/qianzhang/MyProject/deepseek/000-final/extract_info/{doi_encode(doi)}/{doi_encode(doi)}.json"):
+        if not overwrite and result_exists(doi):
             print(f"文件已存在: {doi}.json")
-            return doi, True, None
+            return 0
 
         time.sleep(0.1)  # 添加小延迟以避免请求过快
         
@@ -43,75 +195,189 @@ def process_single_doi(args):
             model=config["model"], 
             api_key=config["api_key"], 
             base_url=config["base_url"],
+            metrics=metrics.for_key(api_key) if metrics is not None else None,
             # temperature=0.1,  # 添加temperature参数
             # top_p=0.95       # 添加top_p参数
         )
         
         # 读取文本并生成提示词
         doi_text = read_md(doi)
-        prompt = get_text_prompt(doi_text)
-        
-        # 调用LLM
-        result = llm.call_llm(prompt, response_json=True, stream=False)
         
-        # 解析结果
-        result_dict = json.loads(result)
+        # 去重：预印本、勘误、重复下载的PDF不再调用LLM
+        dedup_index = DedupIndex(DEDUP_INDEX_PATH)
+        pdf_path = find_pdf(doi)
+        pdf_sha256 = file_sha256(pdf_path) if pdf_path else None
+        md_simhash = simhash(doi_text)
+        if pdf_sha256 is None and md_simhash is None:
+            # 没有PDF、markdown又几乎为空：不参与去重，也不写入索引
+            dedup_index.close()
+            dedup_index = None
+        original = link_duplicate(doi, dedup_index, pdf_sha256, md_simhash) if dedup_index is not None else None
+        if original is not None:
+            print(f"重复论文 {doi} -> {original}")
+            dedup_index.add(doi, pdf_sha256, md_simhash)
+            return 0
         
-        # 保存结果
-        save_dir = f"/home/qianzhang/MyProject/deepseek/000-final/extract_info/{doi_encode(doi)}"
-        os.makedirs(save_dir, exist_ok=True)
-        save_path = os.path.join(save_dir, f"{doi_encode(doi)}.json")
-        
-        with open(save_path, "w", encoding='utf-8') as f:
-            json.dump(result_dict, f, indent=2, ensure_ascii=False)
+        # 分诊、章节过滤、表格优先和结构化抽取
+        mineru_json = read_mineru_json(doi) if TABLE_FIRST else None
+        result_dict, tokens_saved = extract_paper(llm, doi_text, mineru_json, api_key, doi)
+        if result_dict.get("triage") and not result_dict["triage"]["extract"]:
+            print(f"跳过 {doi}: {result_dict['triage']['reason']}")
+        save_result(doi, stamp_result(result_dict, config["model"], **pipeline_options()))
+        if dedup_index is not None:
+            dedup_index.add(doi, pdf_sha256, md_simhash)
             
-        return doi, True, None
-    except Exception as e:
-        return doi, False, str(e)
+        return tokens_saved
+    finally:
+        if dedup_index is not None:
+            dedup_index.close()
+
+def run_worker(args):
+    """
+    worker 进程：从共享队列领取DOI直到队列清空，结果写入共享汇总库
+
+    args 为 (queue_path, api_key, worker_id, lease_seconds)
+    """
+    global _result_store_wal
+    queue_path, api_key, worker_id, lease_seconds = args
+    # 多机共享同一个库文件，不能用 WAL
+    _result_store_wal = False
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+    done = failed = 0
+    try:
+        with LeaseHeartbeat(queue_path, worker_id, lease_seconds) as heartbeat:
+            while True:
+                claimed = queue.claim(worker_id)
+                if not claimed:
+                    stats = queue.stats()
+                    # 其他 worker 仍持有租约时等待，它们掉线后租约过期可被接管
+                    if stats["pending"] + stats["leased"] + stats["expired"] == 0:
+                        break
+                    time.sleep(min(30, lease_seconds / 3))
+                    continue
+                doi = claimed[0]
+                heartbeat.hold(doi)
+                try:
+                    _, success, error_msg, _ = process_single_doi((doi, api_key))
+                finally:
+                    heartbeat.release(doi)
+                if success:
+                    queue.complete(doi, worker_id)
+                    done += 1
+                else:
+                    queue.fail(doi, worker_id, error_msg)
+                    failed += 1
+                    print(f"处理失败 {doi}: {error_msg}")
+    finally:
+        queue.close()
+    return worker_id, done, failed
+
+def enqueue_main(args):
+    queue = WorkQueue(args.queue)
+    total, dois = stream_dois(args.csv, start=args.start, end=args.end)
+    # 年份从新到旧依次领取：越早读出的优先级越高
+    added = 0
+    for offset in range(0, total, ENQUEUE_BATCH):
+        batch = list(islice(dois, ENQUEUE_BATCH))
+        added += queue.enqueue(batch, priorities=range(total - offset, total - offset - len(batch), -1))
+    if args.reset_failed:
+        print(f"重新加入失败的DOI: {queue.reset_failed()} 个")
+    print(f"新加入 {added} 个DOI，队列状态: {queue.stats()}")
+    queue.close()
+
+def worker_main(args):
+    """在本机启动 len(API_KEYS) 个 worker 进程；多台机器各自运行即可分摊同一个队列"""
+    global RESULT_STORE_PATH, RUN_METRICS_PATH
+    if args.store:
+        RESULT_STORE_PATH = args.store
+    n_processes = args.processes or len(API_KEYS)
+    host_id = default_worker_id()
+    worker_args = [(args.queue, API_KEYS[i % len(API_KEYS)], f"{host_id}-{i}", args.lease)
+                   for i in range(n_processes)]
+    # 每台机器单独一个事件日志（网络文件系统上的追加写不保证原子）
+    RUN_METRICS_PATH = new_run_metrics_path(f"worker-{host_id}")
+    queue = WorkQueue(args.queue)
+    stats = queue.stats()
+    queue.close()
+    get_run_metrics().run_started(stats["pending"] + stats["expired"], mode="worker", processes=n_processes)
+    print(f"{host_id}: 启动 {n_processes} 个 worker，运行指标: {RUN_METRICS_PATH}")
+    with Pool(n_processes) as pool:
+        for worker_id, done, failed in pool.imap_unordered(run_worker, worker_args):
+            print(f"{worker_id}: 完成 {done} 个，失败 {failed} 个")
+    write_snapshot(RUN_METRICS_PATH)
+
+    queue = WorkQueue(args.queue)
+    print(f"队列状态: {queue.stats()}")
+    if args.report_failed:
+        pd.DataFrame(queue.failed(), columns=['DOI', 'Error']).to_csv('failed_dois.csv', index=False)
+    queue.close()
 
 def main():
-    # 读取DOI列表
-    df = pd.read_csv('/home/qianzhang/MyProject/deepseek/000-final/scripts/files/split_pdfs_info-20250417.csv')
-    df = df.sort_values(by='年份', ascending=False)
-    
-    doi_list = df['DOI'].tolist()
-    doi_list = [str(x) for x in doi_list if x is not None][10000:20000]
+    parser = argparse.ArgumentParser(description="批量抽取OLED论文信息")
+    subparsers = parser.add_subparsers(dest="command")
+    enqueue_parser = subparsers.add_parser("enqueue", help="把DOI列表加入共享任务队列")
+    enqueue_parser.add_argument("--queue", default=WORK_QUEUE_PATH, help="队列库路径（共享文件系统）")
+    enqueue_parser.add_argument("--csv", default=DOI_CSV_PATH, help="DOI列表CSV")
+    enqueue_parser.add_argument("--start", type=int, default=None)
+    enqueue_parser.add_argument("--end", type=int, default=None)
+    enqueue_parser.add_argument("--reset-failed", action="store_true", help="失败次数用尽的DOI重新加入")
+    worker_parser = subparsers.add_parser("worker", help="从共享任务队列领取DOI处理，直到队列清空")
+    worker_parser.add_argument("--queue", default=WORK_QUEUE_PATH, help="队列库路径（共享文件系统）")
+    worker_parser.add_argument("--store", default=None, help="共享汇总库路径，默认 RESULT_STORE_PATH")
+    worker_parser.add_argument("--processes", type=int, default=None, help="本机 worker 数，默认等于API密钥数")
+    worker_parser.add_argument("--lease", type=float, default=600, help="租约秒数，超时未续租的DOI会被重新领取")
+    worker_parser.add_argument("--report-failed", action="store_true", help="结束时把失败的DOI写到 failed_dois.csv")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        return enqueue_main(args)
+    if args.command == "worker":
+        return worker_main(args)
+
+    # 单机模式：处理固定区间，DOI按年份从新到旧流式读取
+    total, doi_stream = stream_dois(DOI_CSV_PATH, start=10000, end=20000)
     
-    # 创建参数列表，为每个DOI分配一个API密钥
-    args_list = []
-    for i, doi in enumerate(doi_list):
-        # 循环使用API密钥
-        api_key = API_KEYS[i % len(API_KEYS)]
-        args_list.append((doi, api_key))
+    # 为每个DOI循环分配一个API密钥，参数按需生成
+    args_iter = ((doi, API_KEYS[i % len(API_KEYS)]) for i, doi in enumerate(doi_stream))
     
     # 创建进程池，进程数等于API密钥数量
     n_processes = len(API_KEYS)
     print(f"使用 {n_processes} 个进程进行并行处理")
     
-    # 记录成功和失败的DOI
-    success_dois = []
-    failed_dois = []
+    # 运行指标：各进程追加写事件日志，主进程定时写快照
+    global RUN_METRICS_PATH
+    RUN_METRICS_PATH = new_run_metrics_path()
+    get_run_metrics().run_started(total, mode="batch", processes=n_processes)
+    print(f"运行指标: {RUN_METRICS_PATH}（Streamlit Run Dashboard 页面查看）")
     
-    # 使用进程池处理
-    with Pool(n_processes) as pool:
-        results = list(tqdm(
-            pool.imap(process_single_doi, args_list),
-            total=len(args_list),
-            desc="处理DOI"
-        ))
-        
-    # 处理结果
-    for doi, success, error_msg in results:
-        if success:
-            success_dois.append(doi)
-        else:
-            failed_dois.append((doi, error_msg))
-            print(f"处理失败 {doi}: {error_msg}")
+    # 使用进程池处理，已提交未完成的任务数有上限；结果边处理边写，不在内存中累积
+    n_success = 0
+    failed_dois = []
+    total_saved = 0
+    last_snapshot = time.time()
+    with Pool(n_processes) as pool, open('tokens_saved.csv', 'w', encoding='utf-8') as saved_file:
+        saved_file.write('DOI,TokensSaved\n')
+        stream = bounded_imap_unordered(pool, process_single_doi, args_iter,
+                                        max_in_flight=n_processes * MAX_IN_FLIGHT_PER_PROCESS)
+        for doi, success, error_msg, tokens_saved in tqdm(stream, total=total, desc="处理DOI"):
+            saved_file.write(f'"{doi}",{tokens_saved}\n')
+            total_saved += tokens_saved
+            if success:
+                n_success += 1
+            else:
+                failed_dois.append((doi, error_msg))
+                print(f"处理失败 {doi}: {error_msg}")
+            if time.time() - last_snapshot > SNAPSHOT_INTERVAL:
+                write_snapshot(RUN_METRICS_PATH)
+                last_snapshot = time.time()
+    write_snapshot(RUN_METRICS_PATH)
     
     # 保存处理结果
     print(f"\n处理完成:")
-    print(f"成功: {len(success_dois)} 个DOI")
+    print(f"成功: {n_success} 个DOI")
     print(f"失败: {len(failed_dois)} 个DOI")
+    if FILTER_SECTIONS:
+        print(f"章节过滤共节省约 {total_saved} tokens，明细已保存到 tokens_saved.csv")
     
     # 保存失败的DOI和错误信息
     if failed_dois:
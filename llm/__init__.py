@@ -1,2 +1,5 @@
 from .call_llm import *
-from .prompt import *
\ No newline at end of file
+from .prompt import *
+from .schema import *
+from .extraction import *
+from .versioning import *
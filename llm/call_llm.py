@@ -22,8 +22,13 @@ class LLMCaller:
                  model: str = "deepseek-chat",
                  base_url: str = "api.deepseek.com/v1",
                  max_retries: int = 3,
-                 retry_delay: float = 2.0):
-        """Initialize LLM caller with configuration."""
+                 retry_delay: float = 2.0,
+                 metrics: Optional[Any] = None):
+        """Initialize LLM caller with configuration.
+
+        metrics: optional per-key recorder (utils.RunMetrics.for_key) notified of every
+        request attempt, used by the batch run dashboard.
+        """
         if api_key:
             os.environ["OPENAI_API_KEY"] = api_key
         if base_url:
@@ -33,6 +38,19 @@ class LLMCaller:
         self.model = model
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.metrics = metrics
+        # Token usage of the last call and running totals, for throughput/cost reporting
+        self.last_usage: Optional[Dict[str, int]] = None
+        self.usage: Dict[str, int] = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _record_usage(self, usage) -> Optional[Dict[str, int]]:
+        if usage is None:
+            return None
+        self.last_usage = {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+        self.usage["calls"] += 1
+        self.usage["prompt_tokens"] += usage.prompt_tokens
+        self.usage["completion_tokens"] += usage.completion_tokens
+        return self.last_usage
 
     def call_llm(self, 
                 prompt: str, 
@@ -42,6 +60,9 @@ class LLMCaller:
         """Call LLM with prompt and return response with retry mechanism."""
         last_error = None
         for attempt in range(self.max_retries):
+            request_id = self.metrics.request_started() if self.metrics is not None else None
+            started = time.time()
+            usage = None
             try:
                 kwargs = {
                     "model": self.model,
@@ -66,18 +87,25 @@ class LLMCaller:
                             chunk_content = chunk.choices[0].delta.content
                             response_text += chunk_content
                             # print(chunk_content, end="", flush=True)
+                        usage = self._record_usage(getattr(chunk, "usage", None)) or usage
                     print()  # New line after streaming completes
-                    return response_text
                 else:
-                    return completion.choices[0].message.content
+                    usage = self._record_usage(completion.usage)
+                    response_text = completion.choices[0].message.content
+                if self.metrics is not None:
+                    self.metrics.request_finished(request_id, time.time() - started, usage=usage)
+                return response_text
                     
             except Exception as e:
+                if self.metrics is not None:
+                    self.metrics.request_finished(request_id, time.time() - started, error=e)
                 last_error = e
                 if attempt < self.max_retries - 1:
                     time.sleep(self.retry_delay)
                     continue
         
-        raise Exception(f"LLM API call failed after {self.max_retries} attempts. Last error: {str(last_error)}")
+        raise Exception(f"LLM API call failed after {self.max_retries} attempts. Last error: {str(last_error)}") \
+            from last_error
 
 class VisualLLMCaller:
     def __init__(self, 
@@ -0,0 +1,213 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from .prompt import (get_text_prompt, get_repair_prompt, get_materials_prompt, get_devices_prompt,
+                     get_table_completion_prompt)
+from .schema import Device, validate_extraction, format_loc
+
+DEVICE_METRICS = [field for field in Device.model_fields if field != "device_structure"]
+
+
+def _find_excerpts(text, needles, window=300, max_excerpts=3):
+    """Return short excerpts of text around the first occurrences of needles"""
+    excerpts = []
+    for needle in needles:
+        if needle is None or isinstance(needle, (dict, list)):
+            continue
+        needle = str(needle).strip()
+        if len(needle) < 2:
+            continue
+        pos = text.find(needle)
+        if pos >= 0:
+            excerpts.append(text[max(0, pos - window):pos + len(needle) + window])
+        if len(excerpts) >= max_excerpts:
+            break
+    return excerpts
+
+
+def _record_names(result_dict, loc):
+    """Emitter/dopant names of the record containing loc, used to locate context in the text"""
+    try:
+        record = result_dict[loc[0]][loc[1]]
+    except (KeyError, IndexError, TypeError):
+        return []
+    if loc[0] == "materials":
+        return [record.get("emitter_name_full"), record.get("emitter_name_abbreviation")]
+    details = ((record.get("device_structure") or {}).get("emission_layer_details") or {})
+    names = [details.get("pure_emitter"), details.get("host")]
+    names += [d.get("name") for d in details.get("dopants") or [] if isinstance(d, dict)]
+    return names
+
+
+def _get_path(d, loc):
+    for key in loc:
+        d = d[key]
+    return d
+
+
+def _set_path(d, loc, value):
+    _get_path(d, loc[:-1])[loc[-1]] = value
+
+
+def _discard(result_dict, error):
+    """Give up on an invalid field: drop unnamed dopants, reset lists, null everything else"""
+    loc = error["loc"]
+    try:
+        if loc[-1] == "name" and isinstance(loc[-2], int):
+            del _get_path(result_dict, loc[:-2])[loc[-2]]
+        elif error["type"] == "list_type":
+            _set_path(result_dict, loc, [])
+        else:
+            _set_path(result_dict, loc, None)
+    except (KeyError, IndexError, TypeError):
+        pass
+
+
+def repair_extraction(llm, text, result_dict, max_repair_rounds=1):
+    """
+    Validate an extraction result and re-ask only the fields that fail validation.
+
+    Each repair round sends a small prompt listing the offending field paths together
+    with short excerpts of the paper around their values. Fields that are still invalid
+    afterwards are set to null (or removed, for unnamed dopants).
+
+    Returns:
+        (result_dict, report) where result_dict conforms to the Extraction schema and
+        report counts invalid, repaired and nulled fields
+    """
+    report = {"invalid_fields": 0, "repaired": 0, "nulled": 0}
+    if not isinstance(result_dict, dict):
+        raise ValueError(f"Extraction result is not a JSON object: {type(result_dict).__name__}")
+
+    for round_index in range(max_repair_rounds):
+        model, errors = validate_extraction(result_dict)
+        if model is not None:
+            break
+        if round_index == 0:
+            report["invalid_fields"] = len(errors)
+
+        by_path = {format_loc(err["loc"]): err["loc"] for err in errors}
+        fields, excerpts = [], []
+        for err in errors:
+            fields.append({"path": format_loc(err["loc"]), "value": err["input"], "error": err["msg"]})
+            excerpts += _find_excerpts(text, [err["input"]] + _record_names(result_dict, err["loc"]))
+        if not excerpts:
+            break
+
+        context = "\n...\n".join(dict.fromkeys(excerpts))
+        response = llm.call_llm(get_repair_prompt(fields, context), response_json=True, stream=False)
+        answer = json.loads(response)
+        fixes = answer.get("fixes") if isinstance(answer, dict) else None
+        for fix in fixes if isinstance(fixes, list) else []:
+            if not isinstance(fix, dict):
+                continue
+            loc = by_path.get(fix.get("path"))
+            if loc is None:
+                continue
+            try:
+                _set_path(result_dict, loc, fix.get("value"))
+            except (KeyError, IndexError, TypeError):
+                continue
+
+    # Null out whatever is still invalid; a few passes cover nested fallout
+    for _ in range(3):
+        model, errors = validate_extraction(result_dict)
+        if model is not None:
+            break
+        report["nulled"] += len(errors)
+        # Deepest paths and highest list indices first so deletions don't shift later ones
+        errors.sort(key=lambda e: tuple((0, p, "") if isinstance(p, int) else (1, 0, p) for p in e["loc"]),
+                    reverse=True)
+        for err in errors:
+            _discard(result_dict, err)
+    else:
+        model, errors = validate_extraction(result_dict)
+        if model is None:
+            raise ValueError(f"Extraction result still invalid after repair: {errors[:3]}")
+
+    report["repaired"] = max(0, report["invalid_fields"] - report["nulled"])
+    return model.model_dump(), report
+
+
+def extract_split(llm, text):
+    """
+    Extract materials and devices with two concurrent sub-prompts and merge them.
+
+    Both prompts share the same prefix (rules + paper text) so the provider's prefix
+    cache is hit by whichever request arrives second; output length per request is
+    roughly halved, which is what dominates latency.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        materials = executor.submit(llm.call_llm, get_materials_prompt(text), response_json=True, stream=False)
+        devices = executor.submit(llm.call_llm, get_devices_prompt(text), response_json=True, stream=False)
+        materials_dict = json.loads(materials.result())
+        devices_dict = json.loads(devices.result())
+    return {
+        "materials": materials_dict.get("materials", []),
+        "devices": devices_dict.get("devices", []),
+    }
+
+
+def _row_index(value, n_rows):
+    """Row number of a table-completion entry ("0" and 0.0 count as 0), or None"""
+    try:
+        index = int(value)
+    except (TypeError, ValueError):
+        return None
+    return index if 0 <= index < n_rows and index == float(value) else None
+
+
+def extract_table_first(llm, text, table_rows):
+    """
+    Build devices from rule-extracted table rows and ask the LLM only for what the
+    rules can't provide: device structures, emitter materials and missing metrics.
+    Devices the LLM finds outside the rows (text-only devices) are appended as it returns them.
+
+    table_rows: output of utils.extract_device_tables
+    """
+    missing_fields = [
+        [field for field in DEVICE_METRICS if (row["device"].get(field) or {}).get("value") is None]
+        for row in table_rows
+    ]
+    prompt = get_table_completion_prompt(text, table_rows, missing_fields, DEVICE_METRICS)
+    answer = json.loads(llm.call_llm(prompt, response_json=True, stream=False))
+    if not isinstance(answer, dict):
+        answer = {}
+
+    completions, extra_devices = {}, []
+    for entry in answer.get("devices") or []:
+        if not isinstance(entry, dict):
+            continue
+        index = _row_index(entry.get("row"), len(table_rows))
+        if index is None:
+            extra_devices.append({key: value for key, value in entry.items() if key != "row"})
+        else:
+            completions.setdefault(index, entry)
+
+    devices = []
+    for i, row in enumerate(table_rows):
+        device = dict(row["device"])
+        completion = completions.get(i, {})
+        device["device_structure"] = completion.get("device_structure")
+        for field in missing_fields[i]:
+            if field in completion:
+                device[field] = completion[field]
+        devices.append(device)
+    return {"materials": answer.get("materials", []), "devices": devices + extra_devices}
+
+
+def extract_structured(llm, text, max_repair_rounds=1, split=False, table_rows=None):
+    """
+    Run extraction on text and return a schema-validated (result_dict, report).
+
+    table_rows: device rows read from the paper's tables by utils.extract_device_tables;
+    when non-empty the LLM only completes structures and materials around them.
+    split=True issues the materials and devices sub-prompts concurrently instead of
+    the single combined prompt.
+    """
+    if table_rows:
+        result_dict = extract_table_first(llm, text, table_rows)
+    elif split:
+        result_dict = extract_split(llm, text)
+    else:
+        result_dict = json.loads(llm.call_llm(get_text_prompt(text), response_json=True, stream=False))
+    return repair_extraction(llm, text, result_dict, max_repair_rounds)
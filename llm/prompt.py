@@ -1,5 +1,6 @@
 
 import os
+import json
 def get_text_prompt(text):
     return f"""
 Please carefully analyze the provided literature content and extract structured information related to OLED materials and devices. Follow the instructions strictly:
@@ -127,4 +128,241 @@ Return your answer in JSON format:
 }}
 
 Only return the JSON object, no additional text.
-"""
\ No newline at end of file
+"""
+
+def get_repair_prompt(fields, context):
+  """
+  fields: list of {"path", "value", "error"} for values that failed schema validation
+  context: excerpts of the paper around the offending values
+  """
+  field_lines = "\n".join(
+      f'- "{f["path"]}": current value {json.dumps(f["value"], ensure_ascii=False)} ({f["error"]})'
+      for f in fields
+  )
+  return f"""
+The following fields of an OLED extraction result do not match the required format:
+
+{field_lines}
+
+Re-read the excerpts below and return a corrected value for each field:
+- numeric "value" fields must be a single number (no units, ranges or text) or null;
+- "unit" fields must be a string or null;
+- "emission_layer_type" must be one of "pure", "host-dopant", "multi-dopant", "multi-layer" or null;
+- dopant "name" must be a string.
+If the excerpts do not state a value, return null. Do not speculate.
+
+Return only JSON in this format:
+{{"fixes": [{{"path": "<field path exactly as listed>", "value": <corrected value or null>}}]}}
+
+Excerpts:
+{context}
+"""
+
+
+# 拆分抽取：材料和器件两个子提示共享同一前缀（规则+原文），便于服务端前缀缓存
+def _get_split_prompt_prefix(text):
+  return f"""
+Please carefully analyze the provided literature content and extract structured information related to OLED materials and devices. Follow the instructions strictly:
+
+1. All extracted data must strictly follow the original text — no speculation or inferred content.
+
+2. If a data point is not mentioned, return its value as null.
+
+3. Units may vary across different papers (e.g., “%” or “percent”, “cd/m²” or “cd m⁻²”). Always extract the unit as written in the original text, do not normalize or convert units, and return null for the unit field if no unit is mentioned.
+
+4. Use the unit formats shown in the requested JSON format and do not fabricate missing information.
+
+Below is the text content:
+{text}
+
+"""
+
+
+def get_materials_prompt(text):
+  return _get_split_prompt_prefix(text) + """
+Task: extract only the emitter materials described in the text above.
+
+- If the text describes multiple emitter molecules, extract each one as an entry in the list.
+- For each emitter, extract both:
+   - "emitter_name_full" — the full chemical name or standard molecule label (e.g., “4CzIPN”, “2CzPN”)
+   - "emitter_name_abbreviation" — the nickname, code, or label used in the paper (e.g., “compound 1”, “TADF-A”, “EML-1”)
+   - If only one form is present, leave the other as null.
+
+✅ Return the extracted result in the following JSON format:
+
+{
+  "materials": [
+    {
+      "emitter_name_full": "string or null",
+      "emitter_name_abbreviation": "string or null",
+      "emitter_SMILES": "Emitter molecule SMILES",
+      "emission_wavelength_material": {"value": number or null, "unit": "nm"},
+      "emission_efficiency": {"value": number or null, "unit": "%"},
+      "emission_lifetime": {"value": number or null, "unit": "ns"},
+      "energy_levels": {
+        "HOMO": {"value": number or null, "unit": "eV"},
+        "LUMO": {"value": number or null, "unit": "eV"}
+      }
+    }
+  ]
+}
+
+❗ Only return the JSON result. Do not include explanations or inferred information.
+"""
+
+
+def get_devices_prompt(text):
+  return _get_split_prompt_prefix(text) + """
+Task: extract only the OLED devices described in the text above.
+
+- If the text describes multiple device configurations, extract each one as an entry in the list.
+- For all device performance metrics, such as EQE (external quantum efficiency), brightness, lifetime, etc., extract the maximum reported value.
+- For the emission layer, support pure emitters, host-dopant systems, multi-dopant blends and multi-layer emission structures. Use the structured "emission_layer_details" format to represent this information clearly.
+
+✅ Return the extracted result in the following JSON format:
+
+{
+  "devices": [
+    {
+      "device_structure": {
+        "anode": "string or null",
+        "hole_injection_layer": "string or null",
+        "hole_transport_layer": "string or null",
+        "emission_layer_details": {
+          "emission_layer_type": "pure" | "host-dopant" | "multi-dopant" | "multi-layer" | null,
+          "pure_emitter": "string or null",
+          "host": "string or null",
+          "dopants": [
+            {
+              "name": "string",
+              "wt_percent": number or null
+            }
+          ],
+          "emission_layers": [
+            {
+              "layer_index": number,
+              "host": "string or null",
+              "dopants": [ { "name": "string", "wt_percent": number or null } ],
+              "pure_emitter": "string or null"
+            }
+          ]
+        },
+        "electron_transport_layer": "string or null",
+        "electron_injection_layer": "string or null",
+        "cathode": "string or null"
+      },
+      "device_emission_wavelength": {"value": number or null, "unit": "nm"},
+      "device_brightness": {"value": number or null, "unit": "cd/m²"},
+      "turn_on_voltage": {"value": number or null, "unit": "V"},
+      "current_efficiency": {"value": number or null, "unit": "cd/A"},
+      "power_efficiency": {"value": number or null, "unit": "lm/W"},
+      "maximum_EQE": {"value": number or null, "unit": "%"},
+      "device_lifetime": {"value": number or null, "unit": "h"}
+    }
+  ]
+}
+
+❗ Only return the JSON result. Do not include explanations or inferred information.
+"""
+
+
+def get_triage_prompt(title, abstract, table):
+  return f"""
+Decide whether the following scientific paper reports original OLED device results (fabricated electroluminescent devices with performance metrics such as EQE, current efficiency, luminance or turn-on voltage).
+Reviews, perspectives, purely theoretical/computational studies and papers without fabricated OLED devices should NOT be extracted.
+
+Title: {title}
+
+Abstract:
+{abstract}
+
+First table:
+{table or "(none)"}
+
+Return only JSON in this format:
+{{"extract": true or false, "reason": "short reason"}}
+"""
+
+
+def get_table_completion_prompt(text, table_rows, missing_fields, metric_fields):
+  """
+  table_rows: device rows already read from the paper's performance tables by rules
+  missing_fields: for each row, the metric fields the rules could not fill
+  metric_fields: all device metric fields, requested for devices that are not in the rows
+  """
+  row_lines = "\n".join(
+      f'- row {i}: "{row["label"]}" (table: {row["caption"] or "untitled"}); '
+      f'metrics already extracted: {json.dumps(row["device"], ensure_ascii=False)}; '
+      f'missing: {", ".join(missing_fields[i]) or "none"}'
+      for i, row in enumerate(table_rows)
+  )
+  return f"""
+Please carefully analyze the provided literature content. The device performance metrics below were already read from the paper's tables; do NOT repeat them. Follow the instructions strictly:
+
+1. All extracted data must strictly follow the original text — no speculation or inferred content.
+
+2. If a data point is not mentioned, return its value as null.
+
+3. For each device row, extract the full device structure and the emitter(s) used. For the emission layer, support pure emitters, host-dopant systems, multi-dopant blends and multi-layer emission structures.
+
+4. For each row, also extract the listed missing metrics (maximum reported value, unit as written in the text), using the field names given.
+
+5. Extract every emitter molecule as an entry in "materials", with "emitter_name_full" (full chemical name or standard label, e.g. “4CzIPN”) and "emitter_name_abbreviation" (code used in the paper, e.g. “compound 1”). If only one form is present, leave the other as null.
+
+6. If the text reports OLED devices that are not among the rows below (e.g. devices described only in the text or in another table), add each of them to "devices" with "row": null, its device structure and all of its metrics ({", ".join(metric_fields)}).
+
+Device rows:
+{row_lines}
+
+✅ Return the extracted result in the following JSON format:
+
+{{
+  "materials": [
+    {{
+      "emitter_name_full": "string or null",
+      "emitter_name_abbreviation": "string or null",
+      "emitter_SMILES": "Emitter molecule SMILES",
+      "emission_wavelength_material": {{"value": number or null, "unit": "nm"}},
+      "emission_efficiency": {{"value": number or null, "unit": "%"}},
+      "emission_lifetime": {{"value": number or null, "unit": "ns"}},
+      "energy_levels": {{
+        "HOMO": {{"value": number or null, "unit": "eV"}},
+        "LUMO": {{"value": number or null, "unit": "eV"}}
+      }}
+    }}
+  ],
+  "devices": [
+    {{
+      "row": number or null,
+      "device_structure": {{
+        "anode": "string or null",
+        "hole_injection_layer": "string or null",
+        "hole_transport_layer": "string or null",
+        "emission_layer_details": {{
+          "emission_layer_type": "pure" | "host-dopant" | "multi-dopant" | "multi-layer" | null,
+          "pure_emitter": "string or null",
+          "host": "string or null",
+          "dopants": [ {{ "name": "string", "wt_percent": number or null }} ],
+          "emission_layers": [
+            {{
+              "layer_index": number,
+              "host": "string or null",
+              "dopants": [ {{ "name": "string", "wt_percent": number or null }} ],
+              "pure_emitter": "string or null"
+            }}
+          ]
+        }},
+        "electron_transport_layer": "string or null",
+        "electron_injection_layer": "string or null",
+        "cathode": "string or null"
+      }},
+      "<missing metric field, or every metric field when row is null>": {{"value": number or null, "unit": "string or null"}}
+    }}
+  ]
+}}
+
+❗ Only return the JSON result. Do not include explanations or inferred information.
+
+Below is the text content:
+{text}
+"""
@@ -0,0 +1,99 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ValidationError
+
+# 与 prompt.py 中 get_text_prompt 的 JSON 格式一一对应
+
+
+class Quantity(BaseModel):
+    value: Optional[float] = None
+    unit: Optional[str] = None
+
+
+class EnergyLevels(BaseModel):
+    HOMO: Optional[Quantity] = None
+    LUMO: Optional[Quantity] = None
+
+
+class Material(BaseModel):
+    emitter_name_full: Optional[str] = None
+    emitter_name_abbreviation: Optional[str] = None
+    emitter_SMILES: Optional[str] = None
+    emission_wavelength_material: Optional[Quantity] = None
+    emission_efficiency: Optional[Quantity] = None
+    emission_lifetime: Optional[Quantity] = None
+    energy_levels: Optional[EnergyLevels] = None
+
+
+class Dopant(BaseModel):
+    name: str
+    wt_percent: Optional[float] = None
+
+
+class EmissionLayer(BaseModel):
+    layer_index: Optional[int] = None
+    host: Optional[str] = None
+    dopants: List[Dopant] = []
+    pure_emitter: Optional[str] = None
+
+
+class EmissionLayerDetails(BaseModel):
+    emission_layer_type: Optional[Literal["pure", "host-dopant", "multi-dopant", "multi-layer"]] = None
+    pure_emitter: Optional[str] = None
+    host: Optional[str] = None
+    dopants: List[Dopant] = []
+    emission_layers: List[EmissionLayer] = []
+
+
+class DeviceStructure(BaseModel):
+    anode: Optional[str] = None
+    hole_injection_layer: Optional[str] = None
+    hole_transport_layer: Optional[str] = None
+    emission_layer_details: Optional[EmissionLayerDetails] = None
+    electron_transport_layer: Optional[str] = None
+    electron_injection_layer: Optional[str] = None
+    cathode: Optional[str] = None
+
+
+class Device(BaseModel):
+    device_structure: Optional[DeviceStructure] = None
+    device_emission_wavelength: Optional[Quantity] = None
+    device_brightness: Optional[Quantity] = None
+    turn_on_voltage: Optional[Quantity] = None
+    current_efficiency: Optional[Quantity] = None
+    power_efficiency: Optional[Quantity] = None
+    maximum_EQE: Optional[Quantity] = None
+    device_lifetime: Optional[Quantity] = None
+
+
+class Extraction(BaseModel):
+    materials: List[Material] = []
+    devices: List[Device] = []
+
+
+def validate_extraction(result_dict):
+    """
+    Validate an extraction result against the schema.
+
+    Returns:
+        (Extraction or None, errors) where errors is a list of
+        {"loc": tuple, "type": str, "msg": str, "input": value} for the offending fields
+    """
+    try:
+        return Extraction.model_validate(result_dict), []
+    except ValidationError as e:
+        errors = [
+            {"loc": tuple(err["loc"]), "type": err["type"], "msg": err["msg"], "input": err.get("input")}
+            for err in e.errors()
+        ]
+        return None, errors
+
+
+def format_loc(loc):
+    """('devices', 0, 'maximum_EQE', 'value') -> 'devices[0].maximum_EQE.value'"""
+    path = ""
+    for part in loc:
+        if isinstance(part, int):
+            path += f"[{part}]"
+        else:
+            path += f".{part}" if path else part
+    return path
@@ -0,0 +1,95 @@
+import hashlib
+import inspect
+import json
+import time
+from functools import lru_cache
+from . import prompt
+from .schema import Extraction
+from utils import section_filter, table_extract, triage
+
+# 所有可能影响抽取结果的提示词和预处理规则
+PROMPT_FUNCTIONS = [
+    prompt.get_text_prompt,
+    prompt._get_split_prompt_prefix,
+    prompt.get_materials_prompt,
+    prompt.get_devices_prompt,
+    prompt.get_table_completion_prompt,
+    prompt.get_repair_prompt,
+    prompt.get_triage_prompt,
+    triage,  # 关键词分诊规则，改动后被跳过的论文也需要重新判断
+    section_filter,  # 决定哪些章节进入提示
+    table_extract,  # 表格优先时器件指标由规则读取
+]
+# 分诊（关键词规则和LLM分诊提示词）单独的版本
+TRIAGE_SOURCES = [triage, prompt.get_triage_prompt]
+
+
+def _source_hash(sources):
+    sha = hashlib.sha256()
+    for source in sources:
+        sha.update(inspect.getsource(source).encode("utf-8"))
+    return sha
+
+
+@lru_cache(maxsize=None)
+def prompt_version(filter_sections=True, table_first=True, split=False):
+    """
+    提示词和预处理规则源码、输出schema以及抽取流程开关的哈希，任何一处修改都会得到新版本
+
+    开关与 extract_info 的 FILTER_SECTIONS / TABLE_FIRST / SPLIT_EXTRACTION 对应。
+    """
+    sha = _source_hash(PROMPT_FUNCTIONS)
+    sha.update(str(Extraction.model_json_schema()).encode("utf-8"))
+    sha.update(json.dumps(pipeline_settings(filter_sections, table_first, split), sort_keys=True).encode("utf-8"))
+    return sha.hexdigest()[:12]
+
+
+def pipeline_settings(filter_sections=True, table_first=True, split=False):
+    return {"filter_sections": bool(filter_sections), "table_first": bool(table_first), "split": bool(split)}
+
+
+@lru_cache(maxsize=None)
+def triage_version():
+    """分诊规则和分诊提示词的哈希"""
+    return _source_hash(TRIAGE_SOURCES).hexdigest()[:12]
+
+
+def stamp_result(result_dict, model, **settings):
+    """在抽取结果中记录提示词版本、分诊版本、抽取流程开关和模型；settings 见 prompt_version"""
+    result_dict["_meta"] = {
+        "prompt_version": prompt_version(**settings),
+        "triage_version": triage_version(),
+        "pipeline": pipeline_settings(**settings),
+        "model": model,
+        "extracted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return result_dict
+
+
+def is_stale(result_dict, model, **settings):
+    """结果没有版本记录，或由旧提示词/其他抽取流程开关/其他模型产生"""
+    meta = result_dict.get("_meta") or {}
+    return meta.get("prompt_version") != prompt_version(**settings) or meta.get("model") != model
+
+
+def is_stale_triage(result_dict):
+    """被分诊跳过的结果在分诊规则或分诊提示词修改后需要重新判断"""
+    triage = result_dict.get("triage") or {}
+    meta = result_dict.get("_meta") or {}
+    return triage.get("extract") is False and meta.get("triage_version") != triage_version()
+
+
+def has_fields(result_dict, fields):
+    """结果中是否有任一字段取到非空值（递归查找，用于只重跑受修改字段影响的论文）"""
+    stack = [result_dict]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in fields and value not in (None, [], {}) and not (
+                        isinstance(value, dict) and value.get("value", 0) is None):
+                    return True
+                stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
@@ -0,0 +1,15 @@
+import argparse
+from utils import migrate_to_sharded, PDF_SPLIT_DIR, EXTRACT_INFO_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="把 pdf_split/、extract_info/ 的平铺DOI目录迁移到两级分片布局")
+    parser.add_argument("roots", nargs="*", default=[PDF_SPLIT_DIR, EXTRACT_INFO_DIR], help="要迁移的目录")
+    parser.add_argument("--dry-run", action="store_true", help="只打印迁移计划")
+    args = parser.parse_args()
+
+    for root in args.roots:
+        moved = migrate_to_sharded(root, dry_run=args.dry_run)
+        print(f"{root}: {'计划迁移' if args.dry_run else '已迁移'} {moved} 个目录")
+
+if __name__ == '__main__':
+    main()
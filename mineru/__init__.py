@@ -0,0 +1,6 @@
+from .client import *
+from .archive import *
+from .poller import *
+from .cache import *
+from .local import *
+from .split import *
@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import threading
+import zipfile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+# Zip member copies go through buffers of this size, so memory per parse stays flat
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = (320, 320)
+
+
+def _safe_member_path(output_dir, name):
+    """Destination of a zip member under output_dir, or None if it would escape it"""
+    path = os.path.normpath(os.path.join(output_dir, name))
+    if not path.startswith(os.path.normpath(output_dir) + os.sep):
+        return None
+    return path
+
+
+class MinerUArchive:
+    """
+    A MinerU result zip kept on disk as the source of truth.
+
+    The member index is read once from the zip's central directory. The markdown and
+    content-list JSON are decompressed by unpack(); images stay compressed in the zip
+    until image_path() extracts one on first access, and thumbnail() renders (and caches)
+    a small preview straight from the zip without extracting the full image.
+
+    Thumbnails need Pillow; without it thumbnail() falls back to the extracted image.
+    """
+
+    def __init__(self, zip_path, output_dir=None, thumbnail_dir=None, thumbnail_size=THUMBNAIL_SIZE):
+        self.zip_path = zip_path
+        self.output_dir = output_dir or os.path.dirname(os.path.abspath(zip_path))
+        self.thumbnail_dir = thumbnail_dir or os.path.join(self.output_dir, ".thumbnails")
+        self.thumbnail_size = thumbnail_size
+        self._zip = None
+        self._lock = threading.Lock()
+        with zipfile.ZipFile(zip_path) as z:
+            self.members = {info.filename: info for info in z.infolist() if not info.is_dir()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def open(self, name):
+        """Binary file object for one member (streamed from the zip)"""
+        with self._lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.zip_path)
+            return self._zip.open(name)
+
+    @property
+    def markdown_name(self):
+        return next((name for name in self.members if name.endswith(".md")), None)
+
+    @property
+    def json_name(self):
+        return next((name for name in self.members if name.endswith("_content_list.json")),
+                    next((name for name in self.members if name.endswith(".json")), None))
+
+    @property
+    def image_names(self):
+        return [name for name in self.members if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+    def read(self, name):
+        """Bytes of one member"""
+        with self.open(name) as f:
+            return f.read()
+
+    def extract(self, name, dest_path):
+        """Copy one member to dest_path in CHUNK_SIZE blocks"""
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp_path = f"{dest_path}.part"
+        with self.open(name) as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+    def image_path(self, name):
+        """Path of an image under output_dir, extracting it from the zip on first access"""
+        path = _safe_member_path(self.output_dir, name)
+        if path is None or name not in self.members:
+            raise KeyError(name)
+        if not os.path.exists(path):
+            self.extract(name, path)
+        return path
+
+    def thumbnail(self, name):
+        """Path of a cached thumbnail of an image (the full image if Pillow is unavailable)"""
+        if Image is None:
+            return self.image_path(name)
+        if name not in self.members:
+            raise KeyError(name)
+        thumb_path = os.path.join(self.thumbnail_dir, name.replace("/", "__") + ".jpg")
+        if not os.path.exists(thumb_path):
+            os.makedirs(self.thumbnail_dir, exist_ok=True)
+            with self.open(name) as f:
+                img = Image.open(f)
+                img.draft("RGB", self.thumbnail_size)  # JPEG: decode at reduced scale
+                img = img.convert("RGB")
+                img.thumbnail(self.thumbnail_size)
+                img.save(f"{thumb_path}.part", "JPEG", quality=85)
+            os.replace(f"{thumb_path}.part", thumb_path)
+        return thumb_path
+
+    def unpack(self, data_id):
+        """
+        Extract the markdown (as <data_id>.md) and content-list JSON (as <data_id>.json)
+        into output_dir; images are only listed.
+
+        Returns:
+            dict with markdown_path/markdown_content, json_path/json_content and images
+            ([{"name", "size"}]) where present
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        results = {}
+        if self.markdown_name is not None:
+            md_path = self.extract(self.markdown_name, os.path.join(self.output_dir, f"{data_id}.md"))
+            with open(md_path, "r", encoding="utf-8") as f:
+                results['markdown_content'] = f.read()
+            results['markdown_path'] = md_path
+
+        if self.json_name is not None:
+            json_path = self.extract(self.json_name, os.path.join(self.output_dir, f"{data_id}.json"))
+            with open(json_path, "r", encoding="utf-8") as f:
+                results['json_content'] = json.load(f)
+            results['json_path'] = json_path
+
+        images = [{'name': name, 'size': self.members[name].file_size} for name in self.image_names
+                  if _safe_member_path(self.output_dir, name) is not None]
+        if images:
+            results['images'] = images
+        return results
+
+
+def unpack_result(zip_path, output_dir, data_id):
+    """
+    Extract the markdown and content-list JSON of a MinerU result zip into output_dir.
+
+    Images are left in the zip; open a MinerUArchive on zip_path to get them lazily.
+    See MinerUArchive.unpack for the returned dict.
+    """
+    with MinerUArchive(zip_path, output_dir) as archive:
+        return archive.unpack(data_id)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+
+from .archive import CHUNK_SIZE, MinerUArchive
+
+DEFAULT_CACHE_DIR = os.environ.get("MINERU_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mineru"))
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+
+def pdf_sha256(source):
+    """SHA-256 of a PDF given as a path, bytes or a binary file object (rewound afterwards)"""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(block)
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(CHUNK_SIZE), b""):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def options_hash(options, is_ocr):
+    """Short hash of the parse options that change MinerU's output"""
+    canonical = json.dumps({**options, "is_ocr": is_ocr}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    Persistent cache of MinerU result zips keyed by PDF SHA-256 + parse options hash.
+
+    The zip (markdown, content-list JSON and images) is stored as <cache_dir>/<key>.zip and
+    an SQLite index records its size, image names, last access and hit count. Reopening a
+    cached zip through MinerUArchive makes a repeat parse return instantly with the same
+    result fields. When the total size exceeds max_bytes the least recently used entries
+    are evicted. Safe to share between processes (SQLite locking, atomic file renames).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=60, isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, sha256 TEXT, options TEXT, file_name TEXT, "
+            "size INTEGER, images TEXT, created_at REAL, last_access REAL, hits INTEGER DEFAULT 0)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+
+    @staticmethod
+    def key(sha256, options, is_ocr):
+        return f"{sha256}-{options_hash(options, is_ocr)}"
+
+    def _zip_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.zip")
+
+    def _count(self, name):
+        self.conn.execute("INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                          (name,))
+
+    def get(self, key):
+        """Path of the cached zip for key, or None; counts the hit or miss"""
+        row = self.conn.execute("SELECT key FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or not os.path.exists(self._zip_path(key)):
+            if row is not None:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        self.conn.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return self._zip_path(key)
+
+    def put(self, key, zip_path, file_name=None):
+        """Copy a result zip into the cache, then evict down to max_bytes; returns the cached path"""
+        with MinerUArchive(zip_path) as archive:
+            images = archive.image_names
+        dest_path = self._zip_path(key)
+        tmp_path = f"{dest_path}.{uuid.uuid4().hex[:8]}.part"
+        shutil.copyfile(zip_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+        now = time.time()
+        sha256, options = key.rsplit("-", 1)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (key, sha256, options, file_name, size, images, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, sha256, options, file_name, os.path.getsize(dest_path), json.dumps(images), now, now),
+        )
+        self.evict()
+        return dest_path
+
+    def evict(self, max_bytes=None):
+        """Remove least recently used entries until the cache holds at most max_bytes; returns the count"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        evicted = 0
+        for key, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(self._zip_path(key))
+            except FileNotFoundError:
+                pass
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if evicted:
+            self.conn.execute("INSERT INTO counters VALUES ('evictions', ?) "
+                              "ON CONFLICT(name) DO UPDATE SET value = value + ?", (evicted, evicted))
+        return evicted
+
+    def stats(self):
+        entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        counters = dict(self.conn.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def entries(self):
+        """Cached entries, most recently used first"""
+        columns = ["key", "file_name", "size", "images", "created_at", "last_access", "hits"]
+        rows = self.conn.execute(f"SELECT {', '.join(columns)} FROM entries ORDER BY last_access DESC").fetchall()
+        return [{**dict(zip(columns, row)), "images": len(json.loads(row[3] or "[]"))} for row in rows]
+
+    def clear(self):
+        for key, in self.conn.execute("SELECT key FROM entries").fetchall():
+            try:
+                os.remove(self._zip_path(key))
+            except FileNotFoundError:
+                pass
+        self.conn.execute("DELETE FROM entries")
+        self.conn.execute("DELETE FROM counters")
+
+    def close(self):
+        self.conn.close()
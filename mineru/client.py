@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from .archive import CHUNK_SIZE, unpack_result
+
+DEFAULT_BASE_URL = "https://mineru.net/api/v4"
+# MinerU accepts at most 200 files per /file-urls/batch request
+MAX_FILES_PER_BATCH = 200
+DEFAULT_OPTIONS = {"enable_formula": True, "language": "en", "enable_table": True}
+# Files still unfinished after this many seconds of polling are reported as failed
+DEFAULT_POLL_TIMEOUT = 30 * 60
+
+
+class MinerUError(Exception):
+    pass
+
+
+class MinerUClient:
+    """
+    Client for the MinerU precise-parsing batch API.
+
+    Files are submitted in batches of up to MAX_FILES_PER_BATCH: one upload-URL request
+    per batch, then concurrent PUTs of the PDFs. All batch ids are polled in a single
+    loop and a per-file result is yielded as soon as that file is done (or failed), so
+    a folder of PDFs costs a handful of round-trips instead of one sequential cycle each.
+
+    All requests share one requests.Session (connection pooling, keep-alive) sized for
+    upload_workers concurrent connections. poll_interval / max_poll_interval bound the
+    adaptive status polling interval.
+    """
+
+    def __init__(self, token, base_url=DEFAULT_BASE_URL, options=None, is_ocr=True,
+                 upload_workers=8, poll_interval=1.0, max_poll_interval=30.0, request_timeout=60, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.is_ocr = is_ocr
+        self.upload_workers = upload_workers
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.request_timeout = request_timeout
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(upload_workers, 10))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'}
+
+    def _check(self, response):
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("code", 0) != 0:
+            raise MinerUError(f"MinerU API error {payload.get('code')}: {payload.get('msg')}")
+        return payload["data"]
+
+    def request_upload_urls(self, files):
+        """
+        files: [{"name": file name, "data_id": id}]
+
+        Returns:
+            (batch_id, upload urls in the same order as files)
+        """
+        data = {**self.options, "files": [{**f, "is_ocr": self.is_ocr} for f in files]}
+        response = self.session.post(f"{self.base_url}/file-urls/batch", headers=self.headers, json=data,
+                                     timeout=self.request_timeout)
+        result = self._check(response)
+        return result["batch_id"], result["file_urls"]
+
+    def upload(self, url, source):
+        """
+        PUT one file to its pre-signed upload url.
+
+        source is a path, bytes or a binary file object (e.g. a Streamlit UploadedFile);
+        paths and file objects are streamed in blocks rather than read into memory first.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                response = self.session.put(url, data=f, timeout=None)
+        else:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            response = self.session.put(url, data=source, timeout=None)
+        if response.status_code != 200:
+            raise MinerUError(f"File upload failed, status code: {response.status_code}")
+
+    def get_batch_results(self, batch_id):
+        response = self.session.get(f"{self.base_url}/extract-results/batch/{batch_id}", headers=self.headers,
+                                    timeout=self.request_timeout)
+        return self._check(response).get("extract_result", [])
+
+    def submit(self, sources):
+        """
+        Request upload urls and upload all files, MAX_FILES_PER_BATCH per batch.
+
+        sources: [(file_name, source)] where source is a path, bytes or a binary file object;
+                 data_id is the file name without extension (made unique if repeated)
+
+        Returns:
+            (batches, failed) where batches is {batch_id: {data_id: file_name}} and failed lists
+            per-file results for uploads that did not succeed
+        """
+        entries, seen = [], set()
+        for file_name, source in sources:
+            data_id = base = os.path.splitext(os.path.basename(file_name))[0]
+            n = 1
+            while data_id in seen:
+                data_id, n = f"{base}_{n}", n + 1
+            seen.add(data_id)
+            entries.append({"name": os.path.basename(file_name), "data_id": data_id, "source": source})
+
+        batches, failed = {}, []
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            for start in range(0, len(entries), MAX_FILES_PER_BATCH):
+                chunk = entries[start:start + MAX_FILES_PER_BATCH]
+                batch_id, urls = self.request_upload_urls([{"name": e["name"], "data_id": e["data_id"]}
+                                                           for e in chunk])
+                futures = [(e, executor.submit(self.upload, url, e["source"])) for e, url in zip(chunk, urls)]
+                batches[batch_id] = {}
+                for entry, future in futures:
+                    try:
+                        future.result()
+                        batches[batch_id][entry["data_id"]] = entry["name"]
+                    except Exception as e:
+                        failed.append({"batch_id": batch_id, "data_id": entry["data_id"],
+                                       "file_name": entry["name"], "state": "failed",
+                                       "err_msg": f"upload: {e}"})
+        return batches, failed
+
+    def poll(self, batches, timeout=DEFAULT_POLL_TIMEOUT, on_status=None):
+        """
+        Poll every batch with adaptive backoff (see BatchPoller) and yield each file's final result.
+
+        batches: {batch_id: {data_id: file_name}} from submit
+        timeout: seconds after which unfinished files are yielded as failed (None waits forever)
+        on_status: optional callback(list of per-file status dicts of unfinished files, with
+                   state, extracted_pages and total_pages), e.g. to update a progress display
+
+        Yields:
+            {"batch_id", "data_id", "file_name", "state": "done"|"failed", "full_zip_url", "err_msg", ...}
+        """
+        from .poller import BatchPoller
+        poller = BatchPoller(self, min_interval=self.poll_interval, max_interval=self.max_poll_interval,
+                             timeout=timeout)
+        return poller.poll(batches, on_status=on_status)
+
+    def parse_files(self, sources, timeout=DEFAULT_POLL_TIMEOUT, on_status=None):
+        """Submit files and yield per-file results as they finish (upload failures first)"""
+        batches, failed = self.submit(sources)
+        yield from failed
+        yield from self.poll(batches, timeout=timeout, on_status=on_status)
+
+    def parse_folder(self, folder, timeout=DEFAULT_POLL_TIMEOUT, on_status=None):
+        """Parse every PDF in a folder"""
+        paths = sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith(".pdf"))
+        return self.parse_files([(path, path) for path in paths], timeout=timeout, on_status=on_status)
+
+    def _fetch(self, result, output_dir):
+        file_output_dir = os.path.join(output_dir, result["data_id"])
+        try:
+            zip_path = self.download(result["full_zip_url"],
+                                     os.path.join(file_output_dir, f"{result['data_id']}.zip"))
+            return {**result, **unpack_result(zip_path, file_output_dir, result["data_id"]),
+                    "output_dir": file_output_dir, "zip_path": zip_path}
+        except Exception as e:
+            return {**result, "state": "failed", "err_msg": f"download: {e}"}
+
+    def parse_to_dir(self, sources, output_dir, timeout=DEFAULT_POLL_TIMEOUT, on_status=None):
+        """
+        Parse files and download/unpack each result into output_dir/<data_id>/ as soon as
+        it is done; downloads run in the background while the remaining files are polled.
+
+        Yields:
+            the per-file result from poll, extended with the unpack_result fields,
+            output_dir and zip_path for files that succeeded
+        """
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            downloads = set()
+            for result in self.parse_files(sources, timeout=timeout, on_status=on_status):
+                if result["state"] == "done":
+                    downloads.add(executor.submit(self._fetch, result, output_dir))
+                else:
+                    yield result
+                for future in [f for f in downloads if f.done()]:
+                    downloads.discard(future)
+                    yield future.result()
+            for future in as_completed(downloads):
+                yield future.result()
+
+    def download(self, zip_url, dest_path):
+        """Stream a result zip to dest_path in CHUNK_SIZE pieces (written to a .part file, then renamed)"""
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        part_path = f"{dest_path}.part"
+        with self.session.get(zip_url, stream=True, timeout=self.request_timeout) as response:
+            response.raise_for_status()
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(part_path, dest_path)
+        return dest_path
@@ -0,0 +1,256 @@
+import html
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import zipfile
+from collections import Counter
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+# Pages per task sent to the worker pool; smaller documents are parsed in-process
+PAGES_PER_TASK = 8
+MIN_POOL_PAGES = 16
+# Quality heuristics: a page with little text under a large image is a scan, a page with
+# many replacement/private-use characters has a broken text layer (missing ToUnicode map)
+MIN_PAGE_CHARS = 100
+SCANNED_IMAGE_AREA = 0.5
+MAX_GARBLED_RATIO = 0.05
+MIN_DOCUMENT_CHARS = 1000
+HEADING_SIZE_RATIO = 1.15
+MAX_HEADING_CHARS = 150
+MIN_IMAGE_SIDE = 50
+TABLE_CAPTION = re.compile(r"^\s*Table\s+[\dIVX]+", re.I)
+
+_doc = None
+
+
+class LocalParseError(Exception):
+    """The local text layer is not good enough (scanned or garbled pages); report says why"""
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report or {}
+
+
+def local_backend_available():
+    return fitz is not None
+
+
+def _open_document(source):
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _init_worker(source):
+    global _doc
+    _doc = _open_document(source)
+
+
+def _is_garbled(ch):
+    code = ord(ch)
+    return ch == "�" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\n\t")
+
+
+def _table_html(table):
+    rows = table.extract()
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(' '.join((cell or '').split()))}</td>" for cell in row)
+                   + "</tr>" for row in rows)
+    return f"<html><body><table>{body}</table></body></html>"
+
+
+def _inside(bbox, outer):
+    x = (bbox[0] + bbox[2]) / 2
+    y = (bbox[1] + bbox[3]) / 2
+    return outer[0] <= x <= outer[2] and outer[1] <= y <= outer[3]
+
+
+def _parse_page(doc, page_idx):
+    page = doc[page_idx]
+    page_area = max(page.rect.width * page.rect.height, 1)
+    blocks = []
+
+    tables = []
+    if hasattr(page, "find_tables"):
+        tables = [t for t in page.find_tables().tables if t.row_count >= 2 and t.col_count >= 2]
+    for table in tables:
+        blocks.append({"kind": "table", "html": _table_html(table), "bbox": tuple(table.bbox)})
+
+    chars = garbled = 0
+    image_area = 0.0
+    images = 0
+    for block in page.get_text("dict")["blocks"]:
+        bbox = tuple(block["bbox"])
+        if block["type"] == 1:
+            width, height = block.get("width", 0), block.get("height", 0)
+            image_area += (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+            if width < MIN_IMAGE_SIDE or height < MIN_IMAGE_SIDE or not block.get("image"):
+                continue
+            images += 1
+            name = f"images/p{page_idx + 1:04d}_{images}.{block.get('ext', 'png')}"
+            blocks.append({"kind": "image", "name": name, "data": block["image"], "bbox": bbox})
+            continue
+        if any(_inside(bbox, table.bbox) for table in tables):
+            continue
+        spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+        if not spans:
+            continue
+        text = "\n".join("".join(span["text"] for span in line["spans"]) for line in block["lines"]).strip()
+        # Join hyphenated line breaks and wrap lines into one paragraph
+        text = re.sub(r"-\n(?=[a-z])", "", text).replace("\n", " ")
+        chars += len(text)
+        garbled += sum(1 for ch in text if _is_garbled(ch))
+        size = Counter({round(span["size"], 1): len(span["text"]) for span in spans}).most_common(1)[0][0]
+        blocks.append({"kind": "text", "text": text, "size": size, "bbox": bbox})
+
+    # Keep the text layer order and slot tables/images in before the first block below them
+    flow = [b for b in blocks if b["kind"] == "text"]
+    for block in sorted((b for b in blocks if b["kind"] != "text"), key=lambda b: b["bbox"][1]):
+        position = next((i for i, b in enumerate(flow) if b["kind"] == "text" and b["bbox"][1] >= block["bbox"][1]),
+                        len(flow))
+        flow.insert(position, block)
+
+    return {
+        "page_idx": page_idx,
+        "chars": chars,
+        "garbled": garbled,
+        "image_area_ratio": min(image_area / page_area, 1.0),
+        "blocks": flow,
+    }
+
+
+def _parse_pages(page_indices):
+    return [_parse_page(_doc, page_idx) for page_idx in page_indices]
+
+
+def assess_quality(pages):
+    """
+    Decide whether the local text layer can replace MinerU for this document.
+
+    Returns:
+        {"ok", "reason", "pages", "chars", "scanned_pages", "garbled_pages"} with 1-based page numbers
+    """
+    scanned = [p["page_idx"] + 1 for p in pages
+               if p["chars"] < MIN_PAGE_CHARS and p["image_area_ratio"] >= SCANNED_IMAGE_AREA]
+    garbled = [p["page_idx"] + 1 for p in pages
+               if p["chars"] and p["garbled"] / p["chars"] > MAX_GARBLED_RATIO]
+    chars = sum(p["chars"] for p in pages)
+    reason = None
+    if scanned:
+        reason = f"scanned pages {scanned}"
+    elif garbled:
+        reason = f"garbled text layer on pages {garbled}"
+    elif chars < MIN_DOCUMENT_CHARS:
+        reason = f"only {chars} characters of text"
+    return {"ok": reason is None, "reason": reason, "pages": len(pages), "chars": chars,
+            "scanned_pages": scanned, "garbled_pages": garbled}
+
+
+def _to_content_list(pages):
+    """Page blocks -> MinerU content_list items, markdown and {image name: bytes}"""
+    sizes = Counter()
+    for page in pages:
+        for block in page["blocks"]:
+            if block["kind"] == "text":
+                sizes[block["size"]] += len(block["text"])
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    content_list, md_parts, images = [], [], {}
+    for page in pages:
+        for block in page["blocks"]:
+            if block["kind"] == "text":
+                text = block["text"]
+                item = {"type": "text", "text": text, "page_idx": page["page_idx"]}
+                if body_size and block["size"] >= body_size * HEADING_SIZE_RATIO \
+                        and len(text) <= MAX_HEADING_CHARS and not text.endswith("."):
+                    item["text_level"] = 1
+                    md_parts.append(f"# {text}")
+                else:
+                    md_parts.append(text)
+                content_list.append(item)
+            elif block["kind"] == "table":
+                caption = []
+                # A "Table N ..." paragraph right before the table is its caption, as in MinerU output
+                if content_list and content_list[-1]["type"] == "text" and "text_level" not in content_list[-1] \
+                        and TABLE_CAPTION.match(content_list[-1]["text"]):
+                    caption = [content_list.pop()["text"]]
+                content_list.append({"type": "table", "img_path": "", "table_caption": caption,
+                                     "table_footnote": [], "table_body": block["html"],
+                                     "page_idx": page["page_idx"]})
+                md_parts.append(block["html"])
+            else:
+                images[block["name"]] = block["data"]
+                content_list.append({"type": "image", "img_path": block["name"], "img_caption": [],
+                                     "img_footnote": [], "page_idx": page["page_idx"]})
+                md_parts.append(f"![]({block['name']})")
+    return content_list, "\n\n".join(md_parts) + "\n", images
+
+
+def parse_pdf_local(source, zip_path, data_id, workers=None, check_quality=True):
+    """
+    Parse a born-digital PDF from its text layer with PyMuPDF, without any network access.
+
+    Pages are parsed in a process pool (PAGES_PER_TASK pages per task, each worker opens the
+    document once). The pool uses the "spawn" start method, so it is safe to call from threaded
+    hosts such as Streamlit; workers open the document by path (in-memory sources are written
+    to a temporary file first). Text blocks become paragraphs, larger-font short lines headings, ruled
+    tables HTML tables and embedded images image items. The result is written as a zip in the
+    MinerU layout (full.md, <data_id>_content_list.json, images/), so MinerUArchive,
+    ParseCache and the extraction stage work on it unchanged.
+
+    source: path, bytes or a binary file object
+    check_quality: raise LocalParseError when assess_quality rejects the text layer. The verdict
+                   is for the whole document: callers fall back to MinerU for all pages, not
+                   only the scanned or garbled ones
+
+    Returns:
+        (zip_path, quality report from assess_quality)
+    """
+    if fitz is None:
+        raise LocalParseError("PyMuPDF is not installed (pip install PyMuPDF)")
+    if not isinstance(source, (str, os.PathLike, bytes, bytearray)):
+        source.seek(0)
+        source = source.read()
+
+    doc = _open_document(source)
+    page_count = doc.page_count
+    if page_count < MIN_POOL_PAGES or workers == 1:
+        pages = [_parse_page(doc, page_idx) for page_idx in range(page_count)]
+        doc.close()
+    else:
+        doc.close()
+        tasks = [range(start, min(start + PAGES_PER_TASK, page_count))
+                 for start in range(0, page_count, PAGES_PER_TASK)]
+        spooled = None
+        if not isinstance(source, (str, os.PathLike)):
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spooled:
+                spooled.write(source)
+        try:
+            pool = multiprocessing.get_context("spawn").Pool(
+                processes=workers or min(os.cpu_count() or 1, len(tasks)), initializer=_init_worker,
+                initargs=(spooled.name if spooled is not None else source,))
+            with pool:
+                pages = [page for chunk in pool.imap(_parse_pages, tasks) for page in chunk]
+        finally:
+            if spooled is not None:
+                os.remove(spooled.name)
+
+    report = assess_quality(pages)
+    if check_quality and not report["ok"]:
+        raise LocalParseError(f"Local text layer rejected: {report['reason']}", report)
+
+    content_list, markdown, images = _to_content_list(pages)
+    os.makedirs(os.path.dirname(zip_path) or ".", exist_ok=True)
+    tmp_path = f"{zip_path}.part"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("full.md", markdown)
+        z.writestr(f"{data_id}_content_list.json", json.dumps(content_list, ensure_ascii=False, indent=2))
+        for name, data in images.items():
+            z.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+    os.replace(tmp_path, zip_path)
+    return zip_path, report
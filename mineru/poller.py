@@ -0,0 +1,163 @@
+import random
+import time
+
+import requests
+
+from .client import MinerUError
+
+# MinerU per-file states; anything not final is still in progress
+FINAL_STATES = ("done", "failed")
+
+
+class BatchPoller:
+    """
+    Polls many MinerU batches on one thread with per-batch adaptive intervals.
+
+    Each batch starts at min_interval. A round in which nothing changed multiplies its
+    interval by backoff (up to max_interval). Any state transition or new page progress
+    resets it to min_interval, because a file that just moved to running or converting
+    tends to finish soon. While pages are being extracted, the next poll is also pulled in
+    to the estimated finish time from the observed page rate. Every interval gets
+    +/- jitter so many batches submitted together do not poll in lockstep. Failed status
+    requests back off the same way.
+
+    The latest per-file state is kept in `files`:
+        {data_id: {"batch_id", "data_id", "file_name", "state", "extracted_pages",
+                   "total_pages", "err_msg", "state_since", "updated_at"}}
+    """
+
+    def __init__(self, client, min_interval=1.0, max_interval=30.0, backoff=1.6, jitter=0.2, timeout=None):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.files = {}
+        self.requests = 0
+
+    def _delay(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _update(self, batch_id, data_id, result, now):
+        """Record one extract_result; returns True if the file's state or page count moved"""
+        extract_progress = result.get("extract_progress") or {}
+        previous = self.files.get(data_id)
+        status = {
+            "batch_id": batch_id,
+            "data_id": data_id,
+            "file_name": result.get("file_name"),
+            "state": result.get("state"),
+            "extracted_pages": extract_progress.get("extracted_pages"),
+            "total_pages": extract_progress.get("total_pages"),
+            "err_msg": result.get("err_msg") or "",
+            "state_since": now,
+            "updated_at": now,
+        }
+        changed = previous is None or previous["state"] != status["state"] \
+            or previous["extracted_pages"] != status["extracted_pages"]
+        if previous is not None and previous["state"] == status["state"]:
+            status["state_since"] = previous["state_since"]
+            if previous["extracted_pages"] is not None and status["extracted_pages"] is not None:
+                # Pages per second since the previous update, for the finish-time estimate
+                pages = status["extracted_pages"] - previous["extracted_pages"]
+                if pages > 0:
+                    status["page_rate"] = pages / max(now - previous["updated_at"], 1e-3)
+                elif previous.get("page_rate"):
+                    status["page_rate"] = previous["page_rate"]
+                    status["updated_at"] = previous["updated_at"]
+        self.files[data_id] = status
+        return changed
+
+    def _eta(self, data_ids):
+        """Shortest estimated time until one of the files finishes extracting, or None"""
+        etas = []
+        for data_id in data_ids:
+            status = self.files.get(data_id) or {}
+            if status.get("page_rate") and status.get("total_pages"):
+                remaining = status["total_pages"] - (status["extracted_pages"] or 0)
+                etas.append(max(remaining / status["page_rate"] - (time.time() - status["updated_at"]), 0))
+        return min(etas) if etas else None
+
+    def progress(self):
+        """Overall fraction of pages extracted across all files seen so far (None if unknown)"""
+        total = extracted = 0
+        for status in self.files.values():
+            if status["state"] == "done":
+                pages = status["total_pages"] or 1
+                total, extracted = total + pages, extracted + pages
+            elif status["total_pages"]:
+                total += status["total_pages"]
+                extracted += status["extracted_pages"] or 0
+        return extracted / total if total else None
+
+    def poll(self, batches, on_status=None):
+        """
+        Poll until every file is final or the timeout passes; yield each file's final result.
+
+        batches: {batch_id: {data_id: file_name}} from MinerUClient.submit
+        on_status: optional callback(list of per-file status dicts of unfinished files),
+                   called after every round that polled at least one batch
+
+        Yields:
+            {"batch_id", "data_id", "file_name", "state": "done"|"failed", "full_zip_url", "err_msg", ...}
+        """
+        started = time.time()
+        pending = {batch_id: dict(files) for batch_id, files in batches.items() if files}
+        intervals = {batch_id: self.min_interval for batch_id in pending}
+        next_poll = {batch_id: started + self._delay(self.min_interval) for batch_id in pending}
+        deadline = started + self.timeout if self.timeout is not None else None
+
+        while pending:
+            wake = min(next_poll.values())
+            if deadline is not None:
+                wake = min(wake, deadline)
+            time.sleep(max(wake - time.time(), 0))
+            now = time.time()
+
+            if deadline is not None and now >= deadline:
+                for batch_id, files in pending.items():
+                    for data_id, file_name in files.items():
+                        yield {**self.files.get(data_id, {}), "batch_id": batch_id, "data_id": data_id,
+                               "file_name": file_name, "state": "failed",
+                               "err_msg": f"timed out after {self.timeout} s"}
+                return
+
+            for batch_id in [b for b, t in next_poll.items() if t <= now]:
+                files = pending[batch_id]
+                self.requests += 1
+                try:
+                    results = self.client.get_batch_results(batch_id)
+                except (requests.RequestException, MinerUError, ValueError) as e:
+                    # Transient status errors: back off and try this batch again
+                    print(f"Polling batch {batch_id} failed: {e}")
+                    intervals[batch_id] = min(intervals[batch_id] * self.backoff, self.max_interval)
+                    next_poll[batch_id] = time.time() + self._delay(intervals[batch_id])
+                    continue
+
+                changed = False
+                for result in results:
+                    data_id = result.get("data_id")
+                    if data_id not in files:
+                        data_id = next((d for d, name in files.items() if name == result.get("file_name")), None)
+                    if data_id is None:
+                        continue
+                    changed |= self._update(batch_id, data_id, result, now)
+                    if result.get("state") in FINAL_STATES:
+                        del files[data_id]
+                        yield {**result, "batch_id": batch_id, "data_id": data_id}
+
+                if not files:
+                    del pending[batch_id], next_poll[batch_id], intervals[batch_id]
+                    continue
+                intervals[batch_id] = self.min_interval if changed \
+                    else min(intervals[batch_id] * self.backoff, self.max_interval)
+                delay = self._delay(intervals[batch_id])
+                eta = self._eta(files)
+                if eta is not None:
+                    delay = min(delay, max(eta, self.min_interval))
+                next_poll[batch_id] = time.time() + delay
+
+            if on_status is not None and pending:
+                on_status([self.files[data_id] for files in pending.values() for data_id in files
+                           if data_id in self.files])
@@ -0,0 +1,172 @@
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .archive import MinerUArchive
+from .client import DEFAULT_POLL_TIMEOUT, MinerUError
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+# Documents with at least SPLIT_MIN_PAGES pages are parsed as PAGES_PER_PART-page parts
+SPLIT_MIN_PAGES = 60
+PAGES_PER_PART = 25
+# Image references in markdown (![](images/..), <img src="images/..">) and content_list paths
+IMAGE_REF = re.compile(r"(?<=[(\"'])images/")
+
+
+@contextmanager
+def _open_pdf(source):
+    """
+    fitz Document for a path, bytes or binary file object without copying the PDF into a new buffer:
+    in-memory streams (BytesIO, Streamlit UploadedFile) are opened on a view of their buffer, files
+    by their path; other streams are spooled to a temporary file.
+    """
+    buffer = spooled = None
+    if isinstance(source, (str, os.PathLike)):
+        doc = fitz.open(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        doc = fitz.open(stream=memoryview(source), filetype="pdf")
+    elif isinstance(source, io.BytesIO):
+        buffer = source.getbuffer()
+        doc = fitz.open(stream=buffer, filetype="pdf")
+    elif isinstance(getattr(source, "name", None), str) and os.path.isfile(source.name):
+        doc = fitz.open(source.name)
+    else:
+        source.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spooled:
+            shutil.copyfileobj(source, spooled)
+        source.seek(0)
+        doc = fitz.open(spooled.name)
+    try:
+        yield doc
+    finally:
+        doc.close()
+        if buffer is not None:
+            buffer.release()  # the BytesIO can be resized/closed again
+        if spooled is not None:
+            os.remove(spooled.name)
+
+
+def page_count(source):
+    """Number of pages of a PDF (path, bytes or binary file object), or None without PyMuPDF"""
+    if fitz is None:
+        return None
+    with _open_pdf(source) as doc:
+        return doc.page_count
+
+
+def plan_ranges(n_pages, pages_per_part=PAGES_PER_PART):
+    """[(first_page, last_page)] 0-based inclusive ranges; a short tail is merged into the previous part"""
+    ranges = [(start, min(start + pages_per_part, n_pages) - 1) for start in range(0, n_pages, pages_per_part)]
+    if len(ranges) > 1 and ranges[-1][1] - ranges[-1][0] + 1 < pages_per_part // 2:
+        ranges[-2:] = [(ranges[-2][0], ranges[-1][1])]
+    return ranges
+
+
+def split_pdf(source, ranges, output_dir, data_id):
+    """Cut a PDF into one file per page range under output_dir; returns [(part_name, path)]"""
+    if fitz is None:
+        raise MinerUError("PyMuPDF is required to split PDFs (pip install PyMuPDF)")
+    parts = []
+    with _open_pdf(source) as doc:
+        for first, last in ranges:
+            name = part_name(data_id, first, last)
+            path = os.path.join(output_dir, f"{name}.pdf")
+            with fitz.open() as part:
+                part.insert_pdf(doc, from_page=first, to_page=last)
+                part.save(path, garbage=3, deflate=True)
+            parts.append((name, path))
+    return parts
+
+
+def part_name(data_id, first, last):
+    return f"{data_id}__p{first + 1:04d}-{last + 1:04d}"
+
+
+def _rewrite_item(item, prefix, page_offset):
+    item = dict(item)
+    if isinstance(item.get("page_idx"), int):
+        item["page_idx"] += page_offset
+    for key in ("img_path", "table_body", "text"):
+        if isinstance(item.get(key), str) and "images/" in item[key]:
+            item[key] = item[key].replace("images/", f"images/{prefix}_") if key == "img_path" \
+                else IMAGE_REF.sub(f"images/{prefix}_", item[key])
+    return item
+
+
+def stitch_parts(parts, zip_path, data_id):
+    """
+    Combine the result zips of page-range parts into one MinerU-layout zip.
+
+    parts: [(first_page, part_zip_path)] in any order; they are stitched in page order.
+    Images are renamed images/<part>_<name> so names from different parts cannot collide,
+    and every markdown/content_list reference is rewritten to match; content_list page_idx
+    is offset by the part's first page.
+    """
+    markdown, content_list = [], []
+    tmp_path = f"{zip_path}.part"
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+        for first, part_zip in sorted(parts):
+            prefix = f"p{first + 1:04d}"
+            with MinerUArchive(part_zip) as archive:
+                if archive.markdown_name is not None:
+                    md = archive.read(archive.markdown_name).decode("utf-8")
+                    markdown.append(IMAGE_REF.sub(f"images/{prefix}_", md).strip())
+                if archive.json_name is not None:
+                    items = json.loads(archive.read(archive.json_name))
+                    content_list.extend(_rewrite_item(item, prefix, first) for item in items)
+                for name in archive.image_names:
+                    new_name = name.replace("images/", f"images/{prefix}_", 1) if name.startswith("images/") \
+                        else f"images/{prefix}_{os.path.basename(name)}"
+                    with archive.open(name) as src, out.open(new_name, "w") as dst:
+                        shutil.copyfileobj(src, dst)
+        out.writestr("full.md", "\n\n".join(markdown) + "\n")
+        out.writestr(f"{data_id}_content_list.json", json.dumps(content_list, ensure_ascii=False, indent=2))
+    os.replace(tmp_path, zip_path)
+    return zip_path
+
+
+def parse_in_parts(client, source, data_id, zip_path, pages_per_part=PAGES_PER_PART, n_pages=None,
+                   timeout=DEFAULT_POLL_TIMEOUT, on_status=None):
+    """
+    Parse a large PDF as concurrent page-range jobs and stitch the results into zip_path.
+
+    The parts are written as temporary files next to zip_path and all go into one MinerU batch,
+    so they are uploaded concurrently (streamed from disk) and parsed in parallel; each part's zip is downloaded as soon as it is done, while the rest are polled.
+
+    Raises:
+        MinerUError if any part fails (the stitched document would have a gap)
+    """
+    n_pages = n_pages or page_count(source)
+    ranges = plan_ranges(n_pages, pages_per_part)
+
+    os.makedirs(os.path.dirname(zip_path) or ".", exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f"{data_id}_parts_", dir=os.path.dirname(zip_path) or None)
+    try:
+        # Parts are written to work_dir and streamed from disk on upload
+        part_files = split_pdf(source, ranges, work_dir, data_id)
+        first_pages = {name: first for (name, _), (first, _) in zip(part_files, ranges)}
+        sources = [(f"{name}.pdf", path) for name, path in part_files]
+        downloads, errors = [], []
+        with ThreadPoolExecutor(max_workers=client.upload_workers) as executor:
+            for result in client.parse_files(sources, timeout=timeout, on_status=on_status):
+                if result["state"] != "done":
+                    errors.append(f"{result['file_name']}: {result.get('err_msg')}")
+                    continue
+                downloads.append((first_pages[result["data_id"]], executor.submit(
+                    client.download, result["full_zip_url"], os.path.join(work_dir, f"{result['data_id']}.zip"))))
+            if errors:
+                raise MinerUError(f"{len(errors)} of {len(ranges)} parts failed: {'; '.join(errors)}")
+            parts = [(first, future.result()) for first, future in downloads]
+        return stitch_parts(parts, zip_path, data_id)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
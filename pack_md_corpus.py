@@ -0,0 +1,21 @@
+import argparse
+from utils import pack_md_tree, compact_pack, MdPack, PDF_SPLIT_DIR, MD_PACK_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="把 pdf_split/*/output/*.md 打包成可随机读取的压缩语料")
+    parser.add_argument("--source", default=PDF_SPLIT_DIR, help="MinerU 输出目录")
+    parser.add_argument("--output", default=MD_PACK_PATH, help="打包文件路径（索引为 <output>.idx）")
+    parser.add_argument("--codec", choices=["zstd", "zlib"], default=None, help="新建包时的压缩算法，默认有 zstandard 时用 zstd")
+    parser.add_argument("--level", type=int, default=None, help="压缩级别")
+    parser.add_argument("--compact", action="store_true", help="打包后去掉被覆盖的旧记录")
+    args = parser.parse_args()
+
+    packed = pack_md_tree(args.source, args.output, codec=args.codec, level=args.level)
+    if args.compact:
+        compact_pack(args.output)
+    pack = MdPack(args.output)
+    print(f"新打包 {packed} 篇，共 {len(pack)} 篇（{pack.codec}）")
+    pack.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+import json
+import os
+import shutil
+import tempfile
+
+from llm import LLMCaller, extract_structured, get_triage_prompt
+from utils import filter_md_sections, extract_device_tables, get_triage_snippet, keyword_triage
+from mineru import DEFAULT_POLL_TIMEOUT, MinerUClient, pdf_sha256, unpack_result
+from mineru.local import LocalParseError, local_backend_available, parse_pdf_local
+from mineru.split import SPLIT_MIN_PAGES, page_count, parse_in_parts
+
+DEEPSEEK_MODEL = "deepseek-chat"
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+BACKENDS = ("mineru", "local", "auto")
+# Cache key options for results of the local backend
+LOCAL_OPTIONS = {"backend": "local"}
+
+
+class ParseError(Exception):
+    pass
+
+
+def _no_progress(stage, message, fraction=None):
+    pass
+
+
+def _cached_copy(cache, key, zip_path):
+    """Copy the cached zip for key to zip_path; returns False on a cache miss"""
+    cached_zip = cache.get(key)
+    if cached_zip is None:
+        return False
+    os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+    shutil.copyfile(cached_zip, zip_path)
+    return True
+
+
+def parse_pdf(pdf_path, token=None, output_dir=None, file_name=None, progress=None, client=None,
+              timeout=DEFAULT_POLL_TIMEOUT, cache=None, backend="mineru", split=True):
+    """
+    Parse a PDF with the MinerU API or the local text-layer backend. No UI code: progress is
+    reported through a callback and failures are raised, so this runs equally in Streamlit,
+    worker processes and batch jobs.
+
+    Parameters:
+        pdf_path: Path to the PDF file, or a binary file object uploaded straight from its buffer
+        token: MinerU API token (not needed for backend="local")
+        output_dir: Output directory, if None uses a temporary directory
+        file_name: File name to report to MinerU, defaults to the basename of pdf_path
+        progress: Optional callback progress(stage, message, fraction) with stage one of
+                  "local", "upload", "parse", "download", "unpack", "done" and fraction in [0, 1] or None
+        client: Optional MinerUClient to reuse (connection pool, options)
+        timeout: Give up waiting for MinerU after this many seconds (DEFAULT_POLL_TIMEOUT; None waits forever)
+        cache: Optional ParseCache; a PDF already parsed with the same backend and options is served
+               from it without parsing again, and new results are added to it
+        backend: "mineru" (cloud), "local" (PyMuPDF text layer, offline) or "auto" (local first;
+                 the whole document goes to MinerU when its text layer fails the quality checks
+                 or PyMuPDF is missing)
+        split: Parse documents of SPLIT_MIN_PAGES pages or more with MinerU as concurrent page-range
+               parts stitched back together (needs PyMuPDF)
+
+    Returns:
+        dict: markdown_path/markdown_content, json_path/json_content, images, data_id, file_name,
+              output_dir, zip_path, batch_id (None unless parsed by MinerU as one job just now),
+              cached, backend, and quality for local parses or parts for split ones
+
+    Raises:
+        ParseError if the upload or the parse fails; MinerUError/requests exceptions from the API
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    progress = progress or _no_progress
+    if output_dir is None:
+        output_dir = tempfile.mkdtemp()
+    if file_name is None:
+        file_name = os.path.basename(pdf_path if isinstance(pdf_path, (str, os.PathLike))
+                                     else getattr(pdf_path, 'name', 'upload.pdf'))
+    sha256 = pdf_sha256(pdf_path) if cache is not None else None
+
+    def finish(zip_path, data_id, **fields):
+        file_output_dir = os.path.dirname(zip_path)
+        progress("unpack", "Extracting parsed content...", 0.95)
+        results = unpack_result(zip_path, file_output_dir, data_id)
+        results.update({'data_id': data_id, 'file_name': file_name, 'output_dir': file_output_dir,
+                        'zip_path': zip_path, 'batch_id': None, **fields})
+        progress("done", f"Parsing completed{' (cached result)' if fields.get('cached') else ''}", 1.0)
+        return results
+
+    if backend in ("local", "auto"):
+        data_id = os.path.splitext(file_name)[0]
+        zip_path = os.path.join(output_dir, data_id, f"{data_id}.zip")
+        local_key = cache.key(sha256, LOCAL_OPTIONS, False) if cache is not None else None
+        if cache is not None and _cached_copy(cache, local_key, zip_path):
+            return finish(zip_path, data_id, cached=True, backend="local")
+        if not local_backend_available() and backend == "auto":
+            progress("local", "PyMuPDF is not installed, using MinerU", None)
+        else:
+            progress("local", f"Parsing the text layer of {file_name} locally...", 0.1)
+            try:
+                zip_path, report = parse_pdf_local(pdf_path, zip_path, data_id)
+            except LocalParseError as e:
+                if backend == "local":
+                    raise ParseError(str(e)) from e
+                progress("local", f"{e}, falling back to MinerU", 0.1)
+            else:
+                if cache is not None:
+                    cache.put(local_key, zip_path, file_name)
+                return finish(zip_path, data_id, cached=False, backend="local", quality=report)
+
+    if not token:
+        raise ParseError("No MinerU API token provided")
+    client = client or MinerUClient(token)
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(sha256, client.options, client.is_ocr)
+        data_id = os.path.splitext(file_name)[0]
+        zip_path = os.path.join(output_dir, data_id, f"{data_id}.zip")
+        if _cached_copy(cache, cache_key, zip_path):
+            return finish(zip_path, data_id, cached=True, backend="mineru")
+
+    def on_status(unfinished):
+        # Real page progress from MinerU's extract_progress once the files are running
+        total = sum(status["total_pages"] or 0 for status in unfinished)
+        extracted = sum(status["extracted_pages"] or 0 for status in unfinished if status["total_pages"])
+        states = ", ".join(sorted({status["state"] for status in unfinished}))
+        if total:
+            progress("parse", f"Current status: {states} ({extracted}/{total} pages), continuing to wait...",
+                     0.1 + 0.8 * extracted / total)
+        else:
+            progress("parse", f"Current status: {states}, continuing to wait...", None)
+
+    n_pages = page_count(pdf_path) if split else None
+    if n_pages is not None and n_pages >= SPLIT_MIN_PAGES:
+        data_id = os.path.splitext(file_name)[0]
+        progress("upload", f"Splitting {n_pages} pages into parts and uploading them...", 0.0)
+        zip_path = parse_in_parts(client, pdf_path, data_id, os.path.join(output_dir, data_id, f"{data_id}.zip"),
+                                  n_pages=n_pages, timeout=timeout, on_status=on_status)
+        if cache is not None:
+            cache.put(cache_key, zip_path, file_name)
+        return finish(zip_path, data_id, cached=False, backend="mineru", parts=True)
+
+    progress("upload", f"Requesting upload link and uploading {file_name}...", 0.0)
+    batches, failed = client.submit([(file_name, pdf_path)])
+    if failed:
+        raise ParseError(f"File upload failed: {failed[0]['err_msg']}")
+    batch_id = next(iter(batches))
+    progress("upload", f"File uploaded successfully, batch_id: {batch_id}", 0.1)
+
+    progress("parse", "Waiting for parsing to complete...", 0.1)
+    extract_result = next(client.poll(batches, timeout=timeout, on_status=on_status))
+    if extract_result["state"] == "failed":
+        raise ParseError(f"Parsing failed: {extract_result.get('err_msg', 'Unknown error')}")
+    data_id = extract_result["data_id"]
+
+    progress("download", "Downloading parsing results...", 0.9)
+    zip_path = client.download(extract_result["full_zip_url"], os.path.join(output_dir, data_id, f"{data_id}.zip"))
+    if cache is not None:
+        cache.put(cache_key, zip_path, file_name)
+    return finish(zip_path, data_id, batch_id=batch_id, cached=False, backend="mineru")
+
+
+def triage_paper(text, mode="keyword", llm=None):
+    """
+    Decide from the title, abstract and first table whether a full extraction is worthwhile.
+
+    mode: "keyword" (local rules) or "llm" (ask llm; an unparseable answer means extract)
+
+    Returns:
+        {"extract": bool, "method", "reason", ...}
+    """
+    snippet = get_triage_snippet(text)
+    if mode == "llm":
+        response = llm.call_llm(get_triage_prompt(**snippet), response_json=True, stream=False)
+        try:
+            answer = json.loads(response)
+            return {"extract": bool(answer.get("extract")), "method": "llm", "reason": answer.get("reason")}
+        except (TypeError, ValueError, AttributeError):
+            # Rather extract one paper too many than fail it on a malformed triage answer
+            return {"extract": True, "method": "llm", "reason": "unparseable triage answer"}
+    return keyword_triage(snippet)
+
+
+def run_extraction(llm, text, mineru_json=None, triage_mode="keyword", triage_llm=None, filter_sections=True,
+                   table_first=True, split=False, progress=None):
+    """
+    The extraction pipeline shared by the Streamlit page (extract_pdf_info) and the batch job
+    (extract_info.extract_paper): triage -> section filter -> table rules -> LLM structured extraction.
+    Reads and writes no files.
+
+    Parameters:
+        llm: anything with a call_llm method (LLMCaller, benchmark stand-ins)
+        text: Markdown content of the paper
+        mineru_json: MinerU content list; device metrics are read from its performance tables by rules
+        triage_mode: "keyword", "llm" (uses triage_llm, defaults to llm) or None to skip triage
+        progress: Optional callback progress(stage, message, fraction), stages "triage", "filter",
+                  "tables", "extract", "validate"
+
+    Returns:
+        (result_dict, stats): result_dict carries "triage" when triage ran and has empty materials/devices
+        when triage skipped the paper; stats has tokens_saved, table_rows and the repair report
+    """
+    progress = progress or _no_progress
+    stats = {"tokens_saved": 0, "table_rows": 0, "repair": None}
+    triage = None
+    if triage_mode:
+        triage = triage_paper(text, triage_mode, triage_llm or llm)
+        if not triage["extract"]:
+            progress("triage", f"Triage skipped the paper: {triage['reason']}", 1.0)
+            return {"materials": [], "devices": [], "triage": triage}, stats
+
+    # Strip non-informative sections to shorten the prompt
+    if filter_sections:
+        text, filter_stats = filter_md_sections(text)
+        stats["tokens_saved"] = filter_stats["tokens_saved"]
+        progress("filter", f"Section filter saved ~{filter_stats['tokens_saved']} tokens "
+                           f"({filter_stats['tokens_before']} -> {filter_stats['tokens_after']})", 0.1)
+
+    # Read device metrics from performance tables; the LLM then only fills structures and materials
+    table_rows = extract_device_tables(mineru_json) if table_first and mineru_json is not None else None
+    if table_rows:
+        stats["table_rows"] = len(table_rows)
+        progress("tables", f"Read {len(table_rows)} devices from performance tables", 0.2)
+
+    # Call LLM to extract information; fields failing schema validation are re-asked individually
+    progress("extract", "Processing with DeepSeek AI...", 0.3)
+    result_dict, repair_report = extract_structured(llm, text, split=split, table_rows=table_rows)
+    stats["repair"] = repair_report
+    if repair_report['invalid_fields']:
+        progress("validate", f"Schema validation: {repair_report['invalid_fields']} invalid fields, "
+                             f"{repair_report['repaired']} repaired, {repair_report['nulled']} set to null", 0.9)
+    if triage is not None:
+        result_dict["triage"] = triage
+    return result_dict, stats
+
+
+def extract_pdf_info(markdown_content=None, markdown_path=None, api_key=None, output_path=None,
+                     filter_sections=True, split=False, json_content=None, progress=None, llm=None,
+                     triage_mode="keyword"):
+    """
+    Extract structured OLED data from parsed PDF content with the DeepSeek API, without UI code.
+    Runs the same pipeline as the batch job (run_extraction).
+
+    Parameters:
+        markdown_content: Markdown content as string
+        markdown_path: Path to a markdown file (alternative to markdown_content)
+        api_key: DeepSeek API key (ignored when llm is given)
+        output_path: Path to save extracted information
+        filter_sections: Drop references, acknowledgements and other sections without device data before prompting
+        split: Extract materials and devices with two concurrent prompts (lower latency)
+        json_content: MinerU JSON; device metrics are read from its performance tables by rules when present
+        progress: Optional callback progress(stage, message, fraction), stages as in run_extraction plus
+                  "save" and "done"
+        llm: Optional LLMCaller to reuse
+        triage_mode: "keyword", "llm" or None, see run_extraction
+
+    Returns:
+        dict: Structured data extracted from the document
+
+    Raises:
+        ValueError on missing input or API key; errors from reading the markdown or calling the LLM
+    """
+    progress = progress or _no_progress
+    if markdown_content is None and markdown_path is None:
+        raise ValueError("Either markdown_content or markdown_path must be provided")
+    if llm is None:
+        if not api_key:
+            raise ValueError("No DeepSeek API key provided")
+        llm = LLMCaller(model=DEEPSEEK_MODEL, api_key=api_key, base_url=DEEPSEEK_BASE_URL)
+    if markdown_content is None:
+        with open(markdown_path, "r", encoding="utf-8") as f:
+            markdown_content = f.read()
+
+    result_dict, _ = run_extraction(llm, markdown_content, json_content, triage_mode=triage_mode,
+                                    filter_sections=filter_sections, split=split, progress=progress)
+
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding='utf-8') as f:
+            json.dump(result_dict, f, indent=2, ensure_ascii=False)
+        progress("save", f"Extracted information saved to {output_path}", 1.0)
+    progress("done", "Extraction completed", 1.0)
+    return result_dict
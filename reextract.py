@@ -0,0 +1,61 @@
+import argparse
+import json
+from multiprocessing import Pool
+from tqdm import tqdm
+from llm import has_fields, is_stale_triage
+from utils import import_json_tree, EXTRACT_INFO_DIR
+from extract_info import (API_KEYS, BASE_CONFIG, process_single_doi, get_result_store,
+                          close_result_store, current_prompt_version)
+
+def find_stale_dois(fields=None):
+    """
+    从汇总库中找出由旧提示词/抽取流程开关/模型产生的DOI
+
+    指定fields时只保留这些字段非空的DOI，以及被旧版分诊规则跳过的DOI（它们没有字段值，分诊改动后需要重新判断）
+    """
+    papers = get_result_store().read_table(
+        "papers", ["doi", "result_json"],
+        where="prompt_version IS NOT ? OR model IS NOT ?",
+        params=(current_prompt_version(), BASE_CONFIG["model"]),
+    )
+    if fields:
+        def affected(result_json):
+            result_dict = json.loads(result_json)
+            return has_fields(result_dict, fields) or is_stale_triage(result_dict)
+        papers = papers[papers["result_json"].map(affected)]
+    return papers["doi"].tolist()
+
+def main():
+    parser = argparse.ArgumentParser(description="只对旧提示词版本产生的结果重新抽取")
+    parser.add_argument("--fields", default=None,
+                        help="逗号分隔的schema字段，只重跑这些字段有值的论文，如 maximum_EQE,dopants")
+    parser.add_argument("--limit", type=int, default=None, help="最多重跑的DOI数量")
+    parser.add_argument("--dry-run", action="store_true", help="只列出需要重跑的DOI")
+    parser.add_argument("--import-json", action="store_true",
+                        help="先把 extract_info/ 下已有的单DOI JSON 导入汇总库")
+    args = parser.parse_args()
+
+    if args.import_json:
+        print(f"已导入 {import_json_tree(get_result_store(), EXTRACT_INFO_DIR)} 个结果")
+
+    fields = set(args.fields.split(",")) if args.fields else None
+    stale_dois = find_stale_dois(fields)[:args.limit]
+    print(f"当前提示词版本 {current_prompt_version()}，模型 {BASE_CONFIG['model']}")
+    print(f"需要重新抽取: {len(stale_dois)} 个DOI")
+    if args.dry_run or not stale_dois:
+        for doi in stale_dois:
+            print(doi)
+        return
+
+    args_list = [(doi, API_KEYS[i % len(API_KEYS)], True) for i, doi in enumerate(stale_dois)]
+    close_result_store()
+    with Pool(len(API_KEYS)) as pool:
+        results = list(tqdm(pool.imap(process_single_doi, args_list), total=len(args_list), desc="重新抽取"))
+
+    failed = [(doi, error_msg) for doi, success, error_msg, _ in results if not success]
+    print(f"成功: {len(results) - len(failed)} 个DOI，失败: {len(failed)} 个DOI")
+    for doi, error_msg in failed:
+        print(f"处理失败 {doi}: {error_msg}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+import os
+
+from utils.dedup import MIN_SIMHASH_WORDS, DedupIndex, hamming, simhash
+
+PAPER = " ".join(f"word{i % 97} token{i % 13}" for i in range(400))
+
+
+def test_short_or_empty_markdown_has_no_simhash():
+    assert simhash("") is None
+    assert simhash("# Title\n\n<table></table>") is None
+    assert simhash(" ".join(["word"] * (MIN_SIMHASH_WORDS - 1))) is None
+
+
+def test_near_duplicate_text_has_close_simhash():
+    assert hamming(simhash(PAPER), simhash(PAPER + " erratum")) <= 3
+
+
+def test_empty_parses_are_not_duplicates(tmp_path):
+    index = DedupIndex(os.path.join(tmp_path, "dedup.sqlite"))
+    index.add("10.1/empty-a", None, simhash(""))
+    assert index.find_duplicate(None, simhash(""), exclude="10.1/empty-b") is None
+    index.add("10.1/paper", None, simhash(PAPER))
+    assert index.find_duplicate(None, simhash(PAPER), exclude="10.1/copy") == "10.1/paper"
+    index.close()
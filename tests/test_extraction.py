@@ -0,0 +1,49 @@
+import json
+
+from llm.extraction import extract_table_first, repair_extraction
+
+
+class FakeLLM:
+    """Returns the queued answers in order and records the prompts"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def call_llm(self, prompt, response_json=False, stream=False):
+        self.prompts.append(prompt)
+        return json.dumps(self.answers.pop(0))
+
+
+TABLE_ROWS = [
+    {"label": "Device A", "caption": "Table 1", "device": {
+        "maximum_EQE": {"value": 20.1, "unit": "%"}, "current_efficiency": {"value": 50.0, "unit": "cd/A"}}},
+    {"label": "Device B", "caption": "Table 1", "device": {
+        "maximum_EQE": {"value": 15.0, "unit": "%"}, "current_efficiency": {"value": None, "unit": None}}},
+]
+
+
+def test_table_first_matches_string_rows_and_keeps_text_only_devices():
+    llm = FakeLLM({
+        "materials": [{"emitter_name_full": "4CzIPN"}],
+        "devices": [
+            {"row": "0", "device_structure": {"anode": "ITO"}},
+            {"row": 1.0, "device_structure": {"anode": "FTO"}, "current_efficiency": {"value": 40, "unit": "cd/A"}},
+            {"row": None, "device_structure": {"anode": "Ag"}, "maximum_EQE": {"value": 8.0, "unit": "%"}},
+        ],
+    })
+    result = extract_table_first(llm, "paper text", TABLE_ROWS)
+    devices = result["devices"]
+    assert [d["device_structure"]["anode"] for d in devices] == ["ITO", "FTO", "Ag"]
+    assert devices[0]["maximum_EQE"]["value"] == 20.1
+    assert devices[1]["current_efficiency"]["value"] == 40
+    assert devices[2]["maximum_EQE"]["value"] == 8.0 and "row" not in devices[2]
+    assert "row\": null" in llm.prompts[0]
+
+
+def test_repair_ignores_non_object_answers():
+    invalid = {"materials": [], "devices": [{"maximum_EQE": {"value": "about 20", "unit": "%"}}]}
+    for answer in ([], "no fixes", None, {"fixes": None}, {"fixes": ["bad"]}):
+        result, report = repair_extraction(FakeLLM(answer), "EQE of about 20 %", json.loads(json.dumps(invalid)))
+        assert result["devices"][0]["maximum_EQE"]["value"] is None
+        assert report["invalid_fields"] == 1
@@ -0,0 +1,30 @@
+import os
+
+from utils.md_pack import MdPack, pack_md_tree
+from utils.paths import doi_encode
+
+
+def _write_md(root, doi, text):
+    name = doi_encode(doi)
+    os.makedirs(os.path.join(root, name, "output"))
+    with open(os.path.join(root, name, "output", f"{name}.md"), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_pack_without_index_is_rebuilt(tmp_path):
+    root = os.path.join(tmp_path, "pdf_split")
+    pack_path = os.path.join(tmp_path, "md.pack")
+    _write_md(root, "10.1/a", "# A")
+    _write_md(root, "10.1/b", "# B")
+    assert pack_md_tree(root, pack_path, codec="zlib") == 2
+
+    # 模拟写入中途崩溃：数据文件留下半条记录，索引没有写出
+    os.remove(f"{pack_path}.idx")
+    with open(pack_path, "ab") as f:
+        f.write(b"partial")
+    assert pack_md_tree(root, pack_path, codec="zlib") == 2
+
+    pack = MdPack(pack_path)
+    assert sorted(pack.dois()) == ["10.1/a", "10.1/b"]
+    assert pack.get("10.1/a") == "# A"
+    pack.close()
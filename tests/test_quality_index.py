@@ -0,0 +1,38 @@
+import json
+import os
+from datetime import datetime
+
+from utils import doi_file
+from utils.quality_index import build_quality_index_from_json, quality_flags
+
+MATERIAL = {"emitter_name_full": "4CzIPN", "emitter_name_abbreviation": None, "emitter_SMILES": None}
+
+
+def test_null_eqe_value_does_not_count():
+    flags = quality_flags({"materials": [MATERIAL], "devices": [{"maximum_EQE": {"value": None, "unit": "%"}}]})
+    assert flags["has_emitter_name"] and not flags["has_EQE"]
+    flags = quality_flags({"materials": [MATERIAL], "devices": [{"maximum_EQE": {"value": 20.1, "unit": "%"}}]})
+    assert flags["has_EQE"]
+
+
+def _write(extract_dir, doi, result):
+    with open(doi_file(extract_dir, doi, ".json", create=True), "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def test_json_index_uses_iso_timestamps_and_drops_deleted_dois(tmp_path):
+    extract_dir, index_path = str(tmp_path / "extract_info"), str(tmp_path / "quality.parquet")
+    os.makedirs(extract_dir)
+    result = {"materials": [MATERIAL], "devices": [{"maximum_EQE": {"value": 20.1, "unit": "%"}}]}
+    _write(extract_dir, "10.1/a", result)
+    _write(extract_dir, "10.1/b", result)
+
+    index = build_quality_index_from_json(extract_dir, index_path, processes=2)
+    assert sorted(index["doi"]) == ["10.1/a", "10.1/b"]
+    for extracted_at in index["extracted_at"]:
+        datetime.fromisoformat(extracted_at)
+
+    os.remove(doi_file(extract_dir, "10.1/b", ".json"))
+    index = build_quality_index_from_json(extract_dir, index_path, processes=2)
+    assert list(index["doi"]) == ["10.1/a"]
+    assert build_quality_index_from_json(extract_dir, index_path, processes=2)["doi"].tolist() == ["10.1/a"]
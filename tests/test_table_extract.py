@@ -0,0 +1,37 @@
+import pytest
+
+from utils.table_extract import _parse_value, parse_html_table
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("20.1", 20.1),
+    ("20.1/18.3/15.2", 20.1),
+    ("20.1 ± 0.2", 20.1),
+    ("20.1 (18.3)", 20.1),
+    ("−3.2", -3.2),
+    ("~3.0", 3.0),
+    ("34%", 34.0),
+    ("1.2 × 10^4", 12000.0),
+    ("5.6 x 10^-3", 0.0056),
+    ("$1.2\\times10^{4}$", 12000.0),
+    ("1.2e4", 12000.0),
+    ("10^4", 10000.0),
+    ("12 450", 12450.0),
+    ("12,450", 12450.0),
+    ("12,450.5", 12450.5),
+    ("1,234,567", 1234567.0),
+    ("20.1^a", 20.1),
+])
+def test_parse_value(cell, expected):
+    assert _parse_value(cell) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("cell", ["—", "n/a", "3.1 V", "1.2 3.4", "110^4", "0.5,100", "1.5,2.5", "12,34"])
+def test_parse_value_rejects_non_numbers(cell):
+    assert _parse_value(cell) is None
+
+
+def test_sup_exponent():
+    rows = parse_html_table("<table><tr><td>1.5×10<sup>4</sup></td></tr></table>")
+    assert rows == [["1.5×10^4"]]
+    assert _parse_value(rows[0][0]) == pytest.approx(15000.0)
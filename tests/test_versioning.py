@@ -0,0 +1,25 @@
+from llm import has_fields, is_stale, is_stale_triage, prompt_version, stamp_result
+
+
+def test_pipeline_settings_change_the_version():
+    assert prompt_version() != prompt_version(split=True)
+    assert prompt_version() != prompt_version(filter_sections=False)
+    assert prompt_version() != prompt_version(table_first=False)
+
+
+def test_result_is_stale_under_other_settings():
+    result = stamp_result({"materials": [], "devices": []}, "deepseek-chat", split=True)
+    assert result["_meta"]["pipeline"]["split"] is True
+    assert not is_stale(result, "deepseek-chat", split=True)
+    assert is_stale(result, "deepseek-chat")
+
+
+def test_triage_skipped_results_are_rerun_after_triage_changes():
+    skipped = stamp_result({"materials": [], "devices": [], "triage": {"extract": False}}, "deepseek-chat")
+    assert not has_fields(skipped, {"maximum_EQE"})
+    assert not is_stale_triage(skipped)
+    skipped["_meta"]["triage_version"] = "older-rules"
+    assert is_stale_triage(skipped)
+    extracted = stamp_result({"materials": [], "devices": [], "triage": {"extract": True}}, "deepseek-chat")
+    extracted["_meta"]["triage_version"] = "older-rules"
+    assert not is_stale_triage(extracted)
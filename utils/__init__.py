@@ -1 +1,13 @@
-from .utils import *
\ No newline at end of file
+from .paths import *
+from .utils import *
+from .section_filter import *
+from .triage import *
+from .table_extract import *
+from .md_pack import *
+from .dedup import *
+from .work_queue import *
+from .ingest import *
+from .result_store import *
+from .etl import *
+from .quality_index import *
+from .run_metrics import *
@@ -0,0 +1,102 @@
+import hashlib
+import re
+import sqlite3
+from collections import Counter
+
+WORD = re.compile(r"[a-z0-9]+")
+SIMHASH_BITS = 64
+# 4 个 16 位分段：汉明距离 <= 3 的两个指纹至少有一段完全相同
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+# 单词太少（解析失败、空markdown）时不计算指纹，否则这些文档都会得到同一个SimHash
+MIN_SIMHASH_WORDS = 50
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """分块计算文件的SHA-256"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def simhash(text, shingle=3):
+    """markdown文本的64位SimHash（小写单词3-gram），单词少于 MIN_SIMHASH_WORDS 时返回None"""
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_SIMHASH_WORDS:
+        return None
+    grams = Counter(" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1)))
+    weights = [0] * SIMHASH_BITS
+    for gram, count in grams.items():
+        h = int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _to_signed(h):
+    # SQLite INTEGER 为有符号64位
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _bands(h):
+    return [(h >> (i * BAND_BITS)) & ((1 << BAND_BITS) - 1) for i in range(BANDS)]
+
+
+class DedupIndex:
+    """
+    DOI -> (PDF SHA-256, markdown SimHash) 指纹索引，保存在SQLite中
+
+    PDF哈希精确匹配；SimHash按分段建索引，只对候选计算汉明距离。
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "doi TEXT PRIMARY KEY, pdf_sha256 TEXT, simhash INTEGER, "
+            + ", ".join(f"band{i} INTEGER" for i in range(BANDS)) + ")"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf ON fingerprints(pdf_sha256)")
+        for i in range(BANDS):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_band{i} ON fingerprints(band{i})")
+        self.conn.commit()
+
+    def add(self, doi, pdf_sha256=None, md_simhash=None):
+        bands = _bands(md_simhash) if md_simhash is not None else [None] * BANDS
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, {', '.join('?' * BANDS)})",
+            [doi, pdf_sha256, _to_signed(md_simhash) if md_simhash is not None else None, *bands],
+        )
+        self.conn.commit()
+
+    def find_duplicate(self, pdf_sha256=None, md_simhash=None, max_distance=3, exclude=None):
+        """返回与给定指纹重复的已处理DOI，没有则返回None"""
+        if pdf_sha256 is not None:
+            row = self.conn.execute(
+                "SELECT doi FROM fingerprints WHERE pdf_sha256 = ? AND doi IS NOT ?", (pdf_sha256, exclude)
+            ).fetchone()
+            if row:
+                return row[0]
+        if md_simhash is not None:
+            where = " OR ".join(f"band{i} = ?" for i in range(BANDS))
+            rows = self.conn.execute(
+                f"SELECT doi, simhash FROM fingerprints WHERE ({where}) AND doi IS NOT ?",
+                [*_bands(md_simhash), exclude],
+            )
+            best = None
+            for doi, stored in rows:
+                distance = hamming(md_simhash, stored & ((1 << 64) - 1))
+                if distance <= max_distance and (best is None or distance < best[1]):
+                    best = (doi, distance)
+            if best:
+                return best[0]
+        return None
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,175 @@
+import glob
+import json
+import os
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+# 指标 -> (规范单位, {归一化后的单位写法: 换算系数})
+# 单位写法先经 _unit_key 去空格、统一上标和大小写
+UNIT_RULES = {
+    "device_emission_wavelength": ("nm", {"nm": 1.0, "μm": 1000.0, "um": 1000.0}),
+    "device_brightness": ("cd/m²", {
+        "cd/m2": 1.0, "cdm-2": 1.0, "cd/m^2": 1.0, "nit": 1.0, "nits": 1.0,
+        "kcd/m2": 1000.0, "kcdm-2": 1000.0, "×103cd/m2": 1000.0, "x103cdm-2": 1000.0,
+    }),
+    "turn_on_voltage": ("V", {"v": 1.0, "volt": 1.0, "volts": 1.0, "mv": 0.001}),
+    "current_efficiency": ("cd/A", {"cd/a": 1.0, "cda-1": 1.0, "cd/a-1": 1.0}),
+    "power_efficiency": ("lm/W", {"lm/w": 1.0, "lmw-1": 1.0, "lm/w-1": 1.0}),
+    "maximum_EQE": ("%", {"%": 1.0, "percent": 1.0, "pct": 1.0}),
+    "device_lifetime": ("h", {"h": 1.0, "hr": 1.0, "hrs": 1.0, "hour": 1.0, "hours": 1.0,
+                              "min": 1 / 60, "mins": 1 / 60, "s": 1 / 3600}),
+}
+DEVICE_LAYERS = ["anode", "hole_injection_layer", "hole_transport_layer",
+                 "electron_transport_layer", "electron_injection_layer", "cathode"]
+
+
+def _unit_key(units):
+    """向量化统一单位写法："cd m⁻²" / "cd·m^-2" -> "cdm-2"，"cd/m²" -> "cd/m2" """
+    return (units.astype("string")
+            .str.replace("⁻", "-", regex=False)
+            .str.replace("¹", "1", regex=False)
+            .str.replace("²", "2", regex=False)
+            .str.replace("³", "3", regex=False)
+            .str.replace(r"[\s·•⋅*^{}$]", "", regex=True)
+            .str.replace("−", "-", regex=False)
+            .str.lower())
+
+
+def normalize_units(df):
+    """
+    把 <metric>_value/<metric>_unit 列换算为规范单位（nm, cd/m², V, cd/A, lm/W, %, h）
+
+    只换算单位能识别的行；无法识别的单位保留原值和原单位，没有单位的行单位仍为空、数值不变。
+    """
+    for metric, (canonical, factors) in UNIT_RULES.items():
+        value_col, unit_col = f"{metric}_value", f"{metric}_unit"
+        if value_col not in df:
+            continue
+        values = pd.to_numeric(df[value_col], errors="coerce")
+        keys = _unit_key(df[unit_col])
+        factor = keys.map({k.lower(): v for k, v in factors.items()}).astype("float64")
+        known = factor.notna()
+        df[value_col] = np.where(known, values * factor, values)
+        df[unit_col] = df[unit_col].where(~known, canonical)
+    return df
+
+
+def _device_emitters(details):
+    """发光层中的所有发光体：[(名称, wt%)]，包括多层结构各层的掺杂剂"""
+    layers = [details] + [layer for layer in details.get("emission_layers") or [] if isinstance(layer, dict)]
+    emitters = []
+    for layer in layers:
+        emitters += [(d.get("name"), d.get("wt_percent")) for d in layer.get("dopants") or [] if isinstance(d, dict)]
+        if layer.get("pure_emitter"):
+            emitters.append((layer["pure_emitter"], None))
+    return emitters or [(None, None)]
+
+
+def flatten_devices(records):
+    """
+    把抽取结果展开成器件表，每个 (器件, 发光体) 一行
+
+    records: [(doi, result_dict)]
+    列名与相似度检索用的 data.pkl 一致：anode..cathode、emission_layer_details、host、
+    dopants、dopants_name、dopants_wt_percent、<metric>/<metric>_value/<metric>_unit、
+    material_name、material_SMILES
+    """
+    devices, materials = [], []
+    for doi, result_dict in records:
+        extracted_at = (result_dict.get("_meta") or {}).get("extracted_at")
+        for device in result_dict.get("devices") or []:
+            devices.append({**device, "DOI": doi, "extracted_at": extracted_at})
+        for material in result_dict.get("materials") or []:
+            materials.append({**material, "DOI": doi})
+    if not devices:
+        return pd.DataFrame()
+
+    df = pd.json_normalize(devices, sep=".")
+    df.columns = [c.replace("device_structure.emission_layer_details.", "")
+                   .replace("device_structure.", "")
+                   .replace(".value", "_value").replace(".unit", "_unit") for c in df.columns]
+    for column in ["host", "pure_emitter", "emission_layer_type", "dopants", "emission_layers"] + DEVICE_LAYERS:
+        if column not in df:
+            df[column] = None
+
+    details = [((d.get("device_structure") or {}).get("emission_layer_details") or {}) for d in devices]
+    df["emission_layer_details"] = [json.dumps(x, ensure_ascii=False) for x in details]
+    for metric in UNIT_RULES:
+        for part in ("value", "unit"):
+            if f"{metric}_{part}" not in df:
+                df[f"{metric}_{part}"] = None
+        df[metric] = [json.dumps(d.get(metric), ensure_ascii=False) for d in devices]
+    df["dopants"] = df["dopants"].map(lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, list) else None)
+    df["emission_layers"] = df["emission_layers"].map(
+        lambda x: json.dumps(x, ensure_ascii=False) if isinstance(x, list) else None)
+
+    # 多掺杂/多层器件展开为每个发光体一行
+    df["_emitter"] = [_device_emitters(x) for x in details]
+    df = df.explode("_emitter", ignore_index=True)
+    df["dopants_name"] = df["_emitter"].str[0]
+    df["dopants_wt_percent"] = pd.to_numeric(df["_emitter"].str[1], errors="coerce")
+    df["material_name"] = df["dopants_name"].fillna(df["pure_emitter"])
+    df = df.drop(columns=["_emitter", "device_structure"], errors="ignore")
+    df = normalize_units(df)
+
+    # 按发光体名称（全名或缩写）关联材料的 SMILES
+    if materials:
+        mat = pd.json_normalize(materials)
+        for column in ["emitter_name_full", "emitter_name_abbreviation", "emitter_SMILES"]:
+            if column not in mat:
+                mat[column] = None
+        names = pd.concat([
+            mat[["DOI", "emitter_name_full", "emitter_SMILES"]].rename(columns={"emitter_name_full": "material_name"}),
+            mat[["DOI", "emitter_name_abbreviation", "emitter_SMILES"]].rename(
+                columns={"emitter_name_abbreviation": "material_name"}),
+        ]).dropna(subset=["material_name"]).drop_duplicates(["DOI", "material_name"])
+        names = names.rename(columns={"emitter_SMILES": "material_SMILES"})
+        df = df.merge(names, on=["DOI", "material_name"], how="left")
+    else:
+        df["material_SMILES"] = None
+    return df
+
+
+def load_device_table(table_dir):
+    """读取器件表所有分片；同一DOI重新抽取过时只保留最新一次的行"""
+    parts = sorted(glob.glob(os.path.join(table_dir, "part-*.parquet")))
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    latest = df.groupby("DOI")["extracted_at"].transform("max")
+    return df[(df["extracted_at"] == latest) | latest.isna()].reset_index(drop=True)
+
+
+def update_device_table(store, table_dir, chunk_size=500):
+    """
+    增量更新器件表：只处理汇总库中新增或重新抽取过的DOI，结果写成新的 Parquet 分片
+
+    Returns:
+        本次处理的DOI数量
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    # 已处理清单单独记录，没有器件的论文也不会被反复处理
+    manifest_path = os.path.join(table_dir, "processed.parquet")
+    manifest = (pd.read_parquet(manifest_path) if os.path.exists(manifest_path)
+                else pd.DataFrame({"DOI": pd.Series(dtype="object"), "extracted_at": pd.Series(dtype="object")}))
+    papers = store.read_table("papers", ["doi", "extracted_at"]).rename(columns={"doi": "DOI"})
+    merged = papers.merge(manifest, on=["DOI", "extracted_at"], how="left", indicator=True)
+    pending = merged.loc[merged["_merge"] == "left_only", "DOI"].tolist()
+
+    frames = []
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        rows = store.read_table("papers", ["doi", "result_json"],
+                                where=f"doi IN ({', '.join('?' * len(chunk))})", params=chunk)
+        frames.append(flatten_devices(zip(rows["doi"], rows["result_json"].map(json.loads))))
+    frames = [f for f in frames if not f.empty]
+    if frames:
+        # 同一秒内或多个进程同时更新时分片名也不重复
+        part_path = os.path.join(table_dir, f"part-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet")
+        pd.concat(frames, ignore_index=True).to_parquet(part_path, index=False)
+    if pending:
+        processed = papers[papers["DOI"].isin(pending)]
+        pd.concat([manifest, processed], ignore_index=True).to_parquet(manifest_path, index=False)
+    return len(pending)
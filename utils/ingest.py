@@ -0,0 +1,109 @@
+import os
+import queue
+import shutil
+import tempfile
+from itertools import islice
+
+import pandas as pd
+
+UNKNOWN_YEAR = "unknown"
+
+
+def _spill_by_year(csv_path, spill_dir, doi_column, year_column, chunksize):
+    """分块读取CSV，按年份把DOI追加写到 spill_dir/<year>.txt，返回 {year: 数量}"""
+    counts, files = {}, {}
+    try:
+        for chunk in pd.read_csv(csv_path, usecols=[doi_column, year_column], chunksize=chunksize,
+                                 dtype={doi_column: "string"}):
+            chunk = chunk.dropna(subset=[doi_column])
+            years = pd.to_numeric(chunk[year_column], errors="coerce").astype("Int64").astype("string")
+            for year, dois in chunk[doi_column].groupby(years.fillna(UNKNOWN_YEAR), sort=False):
+                if year not in files:
+                    files[year] = open(os.path.join(spill_dir, f"{year}.txt"), "w", encoding="utf-8")
+                files[year].write("\n".join(dois.str.strip()) + "\n")
+                counts[year] = counts.get(year, 0) + len(dois)
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def _iter_spilled(spill_dir, counts):
+    """年份从新到旧逐个读回，年份未知的最后"""
+    years = sorted((y for y in counts if y != UNKNOWN_YEAR), key=int, reverse=True)
+    if UNKNOWN_YEAR in counts:
+        years.append(UNKNOWN_YEAR)
+    try:
+        for year in years:
+            with open(os.path.join(spill_dir, f"{year}.txt"), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def stream_dois(csv_path, doi_column="DOI", year_column="年份", newest_first=True, start=None, end=None,
+                chunksize=100_000):
+    """
+    流式读取DOI列表，内存占用与CSV行数无关
+
+    newest_first=True 时先分块扫一遍CSV，按年份把DOI写到临时文件，再从最新年份开始逐个读回；
+    只需要一次顺序扫描，不会把整张表读进内存排序。newest_first=False 时按文件顺序直接流式产出。
+    start/end 与原来的列表切片 [start:end] 含义相同。
+
+    Returns:
+        (total, iterator)；total 为切片后的DOI数量（newest_first=False 时为 None）
+    """
+    if not newest_first:
+        def iter_in_file_order():
+            for chunk in pd.read_csv(csv_path, usecols=[doi_column], chunksize=chunksize,
+                                     dtype={doi_column: "string"}):
+                yield from chunk[doi_column].dropna().str.strip()
+        return None, islice(iter_in_file_order(), start, end)
+
+    spill_dir = tempfile.mkdtemp(prefix="doi_ingest_")
+    try:
+        counts = _spill_by_year(csv_path, spill_dir, doi_column, year_column, chunksize)
+    except BaseException:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        raise
+    total = sum(counts.values())
+    sliced_total = len(range(total)[slice(start, end)])
+    return sliced_total, islice(_iter_spilled(spill_dir, counts), start, end)
+
+
+def bounded_imap_unordered(pool, func, iterable, max_in_flight):
+    """
+    与 Pool.imap_unordered 相同，但最多只有 max_in_flight 个任务已提交未完成
+
+    Pool.imap 的任务分发线程会一次性取完输入迭代器，百万级输入时所有参数都会堆在内存里；
+    这里每完成一个才从 iterable 取下一个，输入可以是惰性的生成器。
+    func 抛出的异常在取到对应结果时重新抛出。
+    """
+    results = queue.Queue()
+    in_flight = 0
+
+    def on_error(exc):
+        results.put(_TaskError(exc))
+
+    def take():
+        result = results.get()
+        if isinstance(result, _TaskError):
+            raise result.exc
+        return result
+
+    for item in iterable:
+        if in_flight >= max_in_flight:
+            yield take()
+            in_flight -= 1
+        pool.apply_async(func, (item,), callback=results.put, error_callback=on_error)
+        in_flight += 1
+    while in_flight:
+        yield take()
+        in_flight -= 1
+
+
+class _TaskError:
+    def __init__(self, exc):
+        self.exc = exc
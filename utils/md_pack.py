@@ -0,0 +1,162 @@
+import json
+import mmap
+import os
+import zlib
+from .paths import iter_doi_dirs
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 数据文件头：魔数 + 压缩算法名（补齐到固定长度）
+PACK_MAGIC = b"MDPACK1\0"
+HEADER_SIZE = 16
+
+
+def _codec_header(codec):
+    return PACK_MAGIC + codec.encode("ascii").ljust(HEADER_SIZE - len(PACK_MAGIC), b"\0")
+
+
+def _read_codec(header):
+    if len(header) < HEADER_SIZE or not header.startswith(PACK_MAGIC):
+        raise ValueError("Not a markdown pack file")
+    return header[len(PACK_MAGIC):HEADER_SIZE].rstrip(b"\0").decode("ascii")
+
+
+def _compressor(codec, level=None):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is required for zstd packs. Please run: pip install zstandard")
+        return zstandard.ZstdCompressor(level=level or 10).compress
+    return lambda data: zlib.compress(data, level or 6)
+
+
+def _decompressor(codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is required for zstd packs. Please run: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+class MdPack:
+    """
+    打包的markdown语料（只读）
+
+    数据文件 <path> 是逐篇压缩后首尾相接的记录，索引 <path>.idx 记录 DOI -> (偏移, 长度, 源文件mtime)。
+    读取时 mmap 数据文件，按索引直接切片解压，不再逐篇查找和打开小文件。
+    每个进程在第一次读取时才打开 mmap，可以在 Pool 的 fork 之前创建。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(f"{path}.idx", "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.records = index["records"]
+        self._file = self._mm = self._pid = None
+        with open(path, "rb") as f:
+            self.codec = _read_codec(f.read(HEADER_SIZE))
+        self._decompress = _decompressor(self.codec)
+
+    def _map(self):
+        if self._pid != os.getpid():
+            self._file = open(self.path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._pid = os.getpid()
+        return self._mm
+
+    def __contains__(self, doi):
+        return doi in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def dois(self):
+        return list(self.records)
+
+    def mtime(self, doi):
+        """打包时源文件的mtime，不在包中时返回None"""
+        record = self.records.get(doi)
+        return record[2] if record is not None else None
+
+    def get(self, doi):
+        """读取一篇markdown，不在包中时返回None"""
+        record = self.records.get(doi)
+        if record is None:
+            return None
+        offset, length = record[0], record[1]
+        return self._decompress(self._map()[offset:offset + length]).decode("utf-8")
+
+    def close(self):
+        if self._mm is not None and self._pid == os.getpid():
+            self._mm.close()
+            self._file.close()
+        self._file = self._mm = self._pid = None
+
+
+def pack_md_tree(pdf_split_dir, pack_path, codec=None, level=None):
+    """
+    把 pdf_split/<doi>/output/<name>.md 打包进 pack_path（平铺或分片布局均可）
+
+    增量追加：已打包且源文件未修改的DOI跳过；修改过的追加新记录并更新索引，旧记录成为空洞。
+    codec 默认有 zstandard 时用 "zstd"，否则 "zlib"；已有包沿用其文件头中的算法。
+
+    Returns:
+        本次新打包的DOI数量
+    """
+    # 数据文件在但索引不在（上次写入中途崩溃），其中的记录无法定位，按新包重建
+    if os.path.exists(pack_path) and os.path.exists(f"{pack_path}.idx"):
+        with open(pack_path, "rb") as f:
+            codec = _read_codec(f.read(HEADER_SIZE))
+        with open(f"{pack_path}.idx", "r", encoding="utf-8") as f:
+            records = json.load(f)["records"]
+    else:
+        codec = codec or ("zstd" if zstandard is not None else "zlib")
+        records = {}
+        with open(pack_path, "wb") as f:
+            f.write(_codec_header(codec))
+    compress = _compressor(codec, level)
+
+    packed = 0
+    with open(pack_path, "ab") as f:
+        offset = f.tell()
+        for doi, dir_path, name in iter_doi_dirs(pdf_split_dir):
+            md_path = os.path.join(dir_path, "output", f"{name}.md")
+            if not os.path.exists(md_path):
+                continue
+            mtime = os.stat(md_path).st_mtime
+            if doi in records and records[doi][2] >= mtime:
+                continue
+            with open(md_path, "rb") as md:
+                data = compress(md.read())
+            f.write(data)
+            records[doi] = [offset, len(data), mtime]
+            offset += len(data)
+            packed += 1
+        f.flush()
+        os.fsync(f.fileno())
+
+    # 索引最后原子替换，中途失败时旧索引仍然有效
+    tmp_path = f"{pack_path}.idx.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"codec": codec, "records": records}, f, ensure_ascii=False)
+    os.replace(tmp_path, f"{pack_path}.idx")
+    return packed
+
+
+def compact_pack(pack_path):
+    """重写数据文件，去掉被覆盖的旧记录"""
+    pack = MdPack(pack_path)
+    tmp_path = f"{pack_path}.tmp"
+    records = {}
+    with open(tmp_path, "wb") as f:
+        f.write(_codec_header(pack.codec))
+        for doi, (offset, length, mtime) in sorted(pack.records.items(), key=lambda x: x[1][0]):
+            records[doi] = [f.tell(), length, mtime]
+            f.write(pack._map()[offset:offset + length])
+    pack.close()
+    with open(f"{tmp_path}.idx", "w", encoding="utf-8") as f:
+        json.dump({"codec": pack.codec, "records": records}, f, ensure_ascii=False)
+    os.replace(tmp_path, pack_path)
+    os.replace(f"{tmp_path}.idx", f"{pack_path}.idx")
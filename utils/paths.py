@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+from urllib.parse import quote, unquote
+
+# 文件名长度上限（多数文件系统为255字节，给后缀留余量）
+MAX_NAME_LENGTH = 200
+SHARD = re.compile(r"^[0-9a-f]{2}$")
+# 超长名称截断后以 "%%<hash>" 结尾，quote 不会产生 "%%"
+LONG_NAME_MARK = "%%"
+DOI_MARKER_FILE = ".doi"
+
+
+def doi_encode(doi):
+    """旧的平铺布局编码，只替换 '/'"""
+    return doi.replace('/', '%2F')
+
+def doi_decode(doi):
+    return doi.replace('%2F', '/')
+
+
+def encode_doi_name(doi):
+    """
+    DOI -> 目录/文件名，可逆
+
+    除字母、数字和 "-._~" 外全部百分号编码（包括 "%" 本身），开头的 "." 也编码，
+    保证不会出现 "."、".." 或隐藏文件。常见DOI的结果与旧的 doi_encode 相同。
+    """
+    name = quote(doi, safe="-._~")
+    if name.startswith("."):
+        name = "%2E" + name[1:]
+    if len(name) > MAX_NAME_LENGTH:
+        name = name[:MAX_NAME_LENGTH - 18] + LONG_NAME_MARK + hashlib.sha1(doi.encode("utf-8")).hexdigest()[:16]
+    return name
+
+
+def decode_doi_name(name, dir_path=None):
+    """目录/文件名 -> DOI；超长名称需要从目录中的 .doi 文件读回原DOI"""
+    if LONG_NAME_MARK in name:
+        if dir_path is None:
+            raise ValueError(f"Truncated DOI name needs its directory to decode: {name}")
+        with open(os.path.join(dir_path, DOI_MARKER_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    return unquote(name)
+
+
+def shard_of(doi):
+    """两级分片目录，如 ('3f', 'a2')；大小写不同的同一DOI落在同一分片"""
+    digest = hashlib.sha1(doi.lower().encode("utf-8")).hexdigest()
+    return digest[:2], digest[2:4]
+
+
+def sharded_doi_dir(root, doi, create=False):
+    """新布局下的 root/<xx>/<yy>/<encoded_doi>"""
+    name = encode_doi_name(doi)
+    path = os.path.join(root, *shard_of(doi), name)
+    if create:
+        os.makedirs(path, exist_ok=True)
+        if LONG_NAME_MARK in name:
+            with open(os.path.join(path, DOI_MARKER_FILE), "w", encoding="utf-8") as f:
+                f.write(doi)
+    return path
+
+
+def locate_doi_dir(root, doi):
+    """
+    查找DOI的目录，先新分片布局再旧的平铺布局
+
+    Returns:
+        (dir_path, name)，name 为目录内文件使用的前缀；都不存在时返回 (None, None)
+    """
+    path = sharded_doi_dir(root, doi)
+    if os.path.isdir(path):
+        return path, os.path.basename(path)
+    legacy = doi_encode(doi)
+    path = os.path.join(root, legacy)
+    if os.path.isdir(path):
+        return path, legacy
+    return None, None
+
+
+def doi_file(root, doi, suffix, subdir=None, create=False):
+    """
+    DOI 对应的文件路径，如 doi_file(EXTRACT_INFO_DIR, doi, ".json")
+
+    已存在的目录（任一布局）优先；否则返回新分片布局下的路径，create=True 时创建目录
+    """
+    dir_path, name = locate_doi_dir(root, doi)
+    if dir_path is None:
+        dir_path = sharded_doi_dir(root, doi, create=create)
+        name = os.path.basename(dir_path)
+    if subdir:
+        dir_path = os.path.join(dir_path, subdir)
+        if create:
+            os.makedirs(dir_path, exist_ok=True)
+    return os.path.join(dir_path, f"{name}{suffix}")
+
+
+def iter_doi_dirs(root):
+    """遍历两种布局下的所有DOI目录，返回 (doi, dir_path, name)"""
+    for entry in os.scandir(root):
+        if not entry.is_dir():
+            continue
+        if not SHARD.match(entry.name):
+            yield doi_decode(entry.name), entry.path, entry.name
+            continue
+        for sub in os.scandir(entry.path):
+            if not (sub.is_dir() and SHARD.match(sub.name)):
+                continue
+            for item in os.scandir(sub.path):
+                if item.is_dir():
+                    yield decode_doi_name(item.name, item.path), item.path, item.name
+
+
+def migrate_to_sharded(root, dry_run=False):
+    """
+    把旧的平铺目录 root/<doi_encode(doi)> 迁移到分片布局，
+    并把目录内以旧名称开头的文件（.md/.json/.pdf/_content_list.json 等）改成新名称
+
+    Returns:
+        迁移的目录数量
+    """
+    moved = 0
+    for entry in list(os.scandir(root)):
+        if not entry.is_dir() or SHARD.match(entry.name):
+            continue
+        doi = doi_decode(entry.name)
+        target = sharded_doi_dir(root, doi)
+        new_name = os.path.basename(target)
+        if os.path.exists(target):
+            print(f"目标已存在，跳过: {entry.name} -> {target}")
+            continue
+        print(f"{entry.name} -> {os.path.relpath(target, root)}")
+        moved += 1
+        if dry_run:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.rename(entry.path, target)
+        if LONG_NAME_MARK in new_name:
+            with open(os.path.join(target, DOI_MARKER_FILE), "w", encoding="utf-8") as f:
+                f.write(doi)
+        if new_name != entry.name:
+            for dir_path, _, files in os.walk(target):
+                for file_name in files:
+                    if file_name.startswith(entry.name):
+                        os.rename(os.path.join(dir_path, file_name),
+                                  os.path.join(dir_path, new_name + file_name[len(entry.name):]))
+    return moved
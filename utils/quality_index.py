@@ -0,0 +1,147 @@
+import json
+import os
+from datetime import datetime
+from multiprocessing import Pool
+import pandas as pd
+from .paths import iter_doi_dirs
+
+FLAG_COLUMNS = ["has_emitter_name", "has_EQE", "has_SMILES", "n_devices", "n_materials"]
+_DTYPES = {"has_emitter_name": "bool", "has_EQE": "bool", "has_SMILES": "bool",
+           "n_devices": "int16", "n_materials": "int16"}
+
+
+def _has_value(quantity):
+    if isinstance(quantity, dict):
+        return quantity.get("value") is not None
+    return quantity is not None
+
+
+def quality_flags(extract_dict):
+    """
+    单篇抽取结果的质量标记
+
+    has_EQE 要求 maximum_EQE 有数值：schema 校验后每个器件都带 {"value": null, "unit": ...}，
+    只看键是否存在几乎总为真；汇总库路径也只能看到 maximum_EQE_value，两条路径结果一致。
+    """
+    materials = extract_dict.get("materials") or []
+    devices = extract_dict.get("devices") or []
+    return {
+        "has_emitter_name": any(m.get("emitter_name_full") is not None or
+                                m.get("emitter_name_abbreviation") is not None for m in materials),
+        "has_EQE": any(_has_value(d.get("maximum_EQE")) for d in devices),
+        "has_SMILES": any(m.get("emitter_SMILES") for m in materials),
+        "n_devices": len(devices),
+        "n_materials": len(materials),
+    }
+
+
+def valid_mask(index):
+    """有效论文（有发光体名称且有EQE）的布尔掩码，替代逐篇调用 adjust_if_have_materils"""
+    return index["has_emitter_name"] & index["has_EQE"]
+
+
+def load_quality_index(index_path):
+    return pd.read_parquet(index_path)
+
+
+def _save(index, index_path):
+    index = index.astype(_DTYPES).sort_values("doi").reset_index(drop=True)
+    index.to_parquet(index_path, index=False)
+    return index
+
+
+def _flags_from_store(store, dois, chunk_size=500):
+    frames = []
+    for start in range(0, len(dois), chunk_size):
+        chunk = dois[start:start + chunk_size]
+        where, params = f"doi IN ({', '.join('?' * len(chunk))})", chunk
+        papers = store.read_table("papers", ["doi", "extracted_at", "n_devices", "n_materials"], where, params)
+        materials = store.read_table("materials", ["doi", "emitter_name_full", "emitter_name_abbreviation",
+                                                   "emitter_SMILES"], where, params)
+        devices = store.read_table("devices", ["doi", "maximum_EQE_value"], where, params)
+        materials["has_emitter_name"] = (materials["emitter_name_full"].notna()
+                                         | materials["emitter_name_abbreviation"].notna())
+        materials["has_SMILES"] = materials["emitter_SMILES"].fillna("").astype(bool)
+        devices["has_EQE"] = devices["maximum_EQE_value"].notna()
+        flags = (papers
+                 .merge(materials.groupby("doi")[["has_emitter_name", "has_SMILES"]].any(), on="doi", how="left")
+                 .merge(devices.groupby("doi")[["has_EQE"]].any(), on="doi", how="left"))
+        frames.append(flags.fillna({"has_emitter_name": False, "has_SMILES": False, "has_EQE": False}))
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def update_quality_index(store, index_path):
+    """
+    从汇总结果库增量更新质量索引（Parquet）：只重新计算新增或重新抽取过的DOI
+
+    Returns:
+        更新后的索引 DataFrame
+    """
+    index = load_quality_index(index_path) if os.path.exists(index_path) else None
+    papers = store.read_table("papers", ["doi", "extracted_at"])
+    if index is not None:
+        known = index[["doi", "extracted_at"]]
+        merged = papers.merge(known, on=["doi", "extracted_at"], how="left", indicator=True)
+        pending = merged.loc[merged["_merge"] == "left_only", "doi"].tolist()
+    else:
+        pending = papers["doi"].tolist()
+
+    fresh = _flags_from_store(store, pending)
+    # 库中已删除的DOI从索引中去掉
+    removed = index is not None and not index["doi"].isin(papers["doi"]).all()
+    if fresh is None and not removed:
+        return index
+    if index is not None:
+        index = index[index["doi"].isin(papers["doi"]) & ~index["doi"].isin(pending)]
+        index = pd.concat([index, fresh], ignore_index=True) if fresh is not None else index
+    else:
+        index = fresh
+    return _save(index, index_path)
+
+
+def _flags_from_json(args):
+    doi, json_path, mtime = args
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            flags = quality_flags(json.load(f))
+    except (OSError, ValueError):
+        flags = {"has_emitter_name": False, "has_EQE": False, "has_SMILES": False, "n_devices": 0, "n_materials": 0}
+    return {"doi": doi, "extracted_at": _mtime_iso(mtime), **flags}
+
+
+def _mtime_iso(mtime):
+    # 与汇总库的 extracted_at 同为ISO格式；保留微秒，同一秒内的修改也能识别
+    return datetime.fromtimestamp(mtime).isoformat()
+
+
+def build_quality_index_from_json(extract_dir, index_path, processes=8):
+    """
+    扫描 extract_info/ 下的单DOI JSON（平铺或分片布局），多进程一次性计算质量索引；
+    已有索引时只重新读取修改时间变化过的文件，JSON已不存在的DOI从索引中删除。
+    extracted_at 记录文件修改时间（ISO格式）
+    """
+    index = load_quality_index(index_path) if os.path.exists(index_path) else None
+    known = dict(zip(index["doi"], index["extracted_at"])) if index is not None else {}
+
+    tasks, present = [], set()
+    for doi, dir_path, name in iter_doi_dirs(extract_dir):
+        json_path = os.path.join(dir_path, f"{name}.json")
+        if not os.path.exists(json_path):
+            continue
+        present.add(doi)
+        mtime = os.stat(json_path).st_mtime
+        if known.get(doi) != _mtime_iso(mtime):
+            tasks.append((doi, json_path, mtime))
+
+    # 已删除的JSON对应的DOI从索引中去掉
+    removed = index is not None and not index["doi"].isin(present).all()
+    if not tasks and not removed:
+        return index
+    if index is not None:
+        index = index[index["doi"].isin(present)]
+    if tasks:
+        with Pool(processes) as pool:
+            fresh = pd.DataFrame(pool.map(_flags_from_json, tasks, chunksize=64))
+        index = pd.concat([index[~index["doi"].isin(fresh["doi"])], fresh], ignore_index=True) \
+            if index is not None else fresh
+    return _save(index, index_path)
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+from .paths import iter_doi_dirs
+
+MATERIAL_QUANTITIES = ["emission_wavelength_material", "emission_efficiency", "emission_lifetime"]
+DEVICE_LAYERS = ["anode", "hole_injection_layer", "hole_transport_layer",
+                 "electron_transport_layer", "electron_injection_layer", "cathode"]
+DEVICE_METRICS = ["device_emission_wavelength", "device_brightness", "turn_on_voltage",
+                  "current_efficiency", "power_efficiency", "maximum_EQE", "device_lifetime"]
+
+_MATERIAL_COLUMNS = (["emitter_name_full", "emitter_name_abbreviation", "emitter_SMILES"]
+                     + [f"{q}_{part}" for q in MATERIAL_QUANTITIES + ["HOMO", "LUMO"] for part in ("value", "unit")])
+_DEVICE_COLUMNS = (DEVICE_LAYERS + ["emission_layer_type"]
+                   + [f"{m}_{part}" for m in DEVICE_METRICS for part in ("value", "unit")])
+
+
+def _quantity(record, key, part):
+    quantity = record.get(key)
+    return quantity.get(part) if isinstance(quantity, dict) else None
+
+
+def _material_row(material):
+    energy = material.get("energy_levels") or {}
+    row = [material.get("emitter_name_full"), material.get("emitter_name_abbreviation"), material.get("emitter_SMILES")]
+    for q in MATERIAL_QUANTITIES:
+        row += [_quantity(material, q, "value"), _quantity(material, q, "unit")]
+    for level in ("HOMO", "LUMO"):
+        row += [_quantity(energy, level, "value"), _quantity(energy, level, "unit")]
+    return row
+
+
+def _device_row(device):
+    structure = device.get("device_structure") or {}
+    details = structure.get("emission_layer_details") or {}
+    row = [structure.get(layer) for layer in DEVICE_LAYERS] + [details.get("emission_layer_type")]
+    for m in DEVICE_METRICS:
+        row += [_quantity(device, m, "value"), _quantity(device, m, "unit")]
+    return row
+
+
+class ResultStore:
+    """
+    所有论文抽取结果的汇总库（SQLite），DOI 为主键
+
+    - papers:    每篇论文一行，含版本信息和完整结果JSON
+    - materials: 每个发光材料一行，主要字段展开成列
+    - devices:   每个器件一行，器件结构和性能指标展开成列
+
+    全库统计只需一次 read_table，不必再逐个打开 extract_info/ 下的JSON；
+    export_json 可导出与原来相同的单DOI JSON。
+    多台机器通过共享文件系统写同一个库时需 wal=False（WAL 依赖共享内存，网络文件系统上不可用）。
+    """
+
+    def __init__(self, db_path, wal=True):
+        self.conn = sqlite3.connect(db_path, timeout=60)
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers (doi TEXT PRIMARY KEY, prompt_version TEXT, model TEXT, "
+            "extracted_at TEXT, duplicate_of TEXT, n_materials INTEGER, n_devices INTEGER, result_json TEXT)"
+        )
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS materials (doi TEXT, idx INTEGER, {', '.join(_MATERIAL_COLUMNS)}, "
+            "record_json TEXT, PRIMARY KEY (doi, idx))"
+        )
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS devices (doi TEXT, idx INTEGER, {', '.join(_DEVICE_COLUMNS)}, "
+            "record_json TEXT, PRIMARY KEY (doi, idx))"
+        )
+        self.conn.commit()
+
+    def put(self, doi, result_dict):
+        """写入（或覆盖）一篇论文的结果"""
+        meta = result_dict.get("_meta") or {}
+        materials = result_dict.get("materials") or []
+        devices = result_dict.get("devices") or []
+        with self.conn:
+            self.conn.execute("DELETE FROM materials WHERE doi = ?", (doi,))
+            self.conn.execute("DELETE FROM devices WHERE doi = ?", (doi,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doi, meta.get("prompt_version"), meta.get("model"), meta.get("extracted_at"),
+                 result_dict.get("duplicate_of"), len(materials), len(devices),
+                 json.dumps(result_dict, ensure_ascii=False)),
+            )
+            self.conn.executemany(
+                f"INSERT INTO materials VALUES ({', '.join('?' * (len(_MATERIAL_COLUMNS) + 3))})",
+                [[doi, i, *_material_row(m), json.dumps(m, ensure_ascii=False)] for i, m in enumerate(materials)],
+            )
+            self.conn.executemany(
+                f"INSERT INTO devices VALUES ({', '.join('?' * (len(_DEVICE_COLUMNS) + 3))})",
+                [[doi, i, *_device_row(d), json.dumps(d, ensure_ascii=False)] for i, d in enumerate(devices)],
+            )
+
+    def get(self, doi):
+        """读取一篇论文的完整结果，不存在时返回None"""
+        row = self.conn.execute("SELECT result_json FROM papers WHERE doi = ?", (doi,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __contains__(self, doi):
+        return self.conn.execute("SELECT 1 FROM papers WHERE doi = ?", (doi,)).fetchone() is not None
+
+    def dois(self):
+        return [row[0] for row in self.conn.execute("SELECT doi FROM papers")]
+
+    def read_table(self, table, columns=None, where=None, params=()):
+        """把 papers/materials/devices 整表读成 DataFrame"""
+        import pandas as pd
+        if table not in ("papers", "materials", "devices"):
+            raise ValueError(f"Unknown table: {table}")
+        cols = ", ".join(columns) if columns else "*"
+        query = f"SELECT {cols} FROM {table}" + (f" WHERE {where}" if where else "")
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def export_json(self, doi, path):
+        """导出与 extract_info/<doi>/<doi>.json 相同格式的单篇结果"""
+        result_dict = self.get(doi)
+        if result_dict is None:
+            raise KeyError(f"DOI not in result store: {doi}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result_dict, f, indent=2, ensure_ascii=False)
+
+    def export_parquet(self, output_dir):
+        """导出 papers/materials/devices 三张 Parquet 表，供 pandas/pyarrow 按列读取"""
+        os.makedirs(output_dir, exist_ok=True)
+        for table in ("papers", "materials", "devices"):
+            self.read_table(table).to_parquet(os.path.join(output_dir, f"{table}.parquet"), index=False)
+
+    def close(self):
+        self.conn.close()
+
+
+def import_json_tree(store, extract_dir):
+    """把已有的 extract_info 下单DOI JSON（平铺或分片布局）导入汇总库，返回导入数量"""
+    count = 0
+    for doi, dir_path, name in iter_doi_dirs(extract_dir):
+        json_path = os.path.join(dir_path, f"{name}.json")
+        if not os.path.exists(json_path):
+            continue
+        with open(json_path, "r", encoding="utf-8") as f:
+            store.put(doi, json.load(f))
+        count += 1
+    return count
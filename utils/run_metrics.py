@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from .utils import EXTRACT_INFO_DIR
+
+# 批量抽取运行的事件日志（每次运行一个 JSONL）和快照
+RUN_METRICS_DIR = os.path.join(os.path.dirname(EXTRACT_INFO_DIR), "run_metrics")
+LATENCY_BINS = [0, 2, 5, 10, 20, 30, 60, 120, 300, float("inf")]
+# 超过这个时间仍未结束的请求视为所在进程已退出，不计入并发
+STALE_REQUEST_SECONDS = 900
+
+
+def key_id(api_key):
+    """API密钥的短指纹，日志中不出现密钥本身"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else "default"
+
+
+def classify_error(exc):
+    """把异常归类为 rate_limited/timeout/connection/server_error/invalid_json/validation/not_found/error"""
+    # LLMCaller 重试用尽后抛出的异常以最后一次的错误为 __cause__
+    while exc.__cause__ is not None:
+        exc = exc.__cause__
+    name = type(exc).__name__
+    status = getattr(exc, "status_code", None)
+    if name == "RateLimitError" or status == 429:
+        return "rate_limited"
+    if "Timeout" in name:
+        return "timeout"
+    if name == "APIConnectionError":
+        return "connection"
+    if status is not None and status >= 500:
+        return "server_error"
+    if name == "JSONDecodeError":
+        return "invalid_json"
+    if name == "ValidationError" or "still invalid" in str(exc):
+        return "validation"
+    if name == "FileNotFoundError":
+        return "not_found"
+    return "error"
+
+
+class RunMetrics:
+    """
+    一次批量运行的事件记录器，每个进程一个实例，追加写同一个 JSONL 文件
+
+    事件：run_start、request_start/request_end（每次LLM请求，含重试）、paper_end。
+    单行远小于 PIPE_BUF，O_APPEND 写入在多进程间不会交错。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+
+    def emit(self, event_type, **fields):
+        line = json.dumps({"t": time.time(), "type": event_type, "pid": os.getpid(), **fields},
+                          ensure_ascii=False) + "\n"
+        with self._lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+
+    def run_started(self, total, **config):
+        self.emit("run_start", total=total, config=config)
+
+    def for_key(self, api_key):
+        return KeyMetrics(self, key_id(api_key))
+
+    def paper_finished(self, doi, success, latency, error=None, tokens=0):
+        self.emit("paper_end", doi=doi, success=success, latency=round(latency, 3),
+                  error_class=error, tokens=tokens)
+
+
+class KeyMetrics:
+    """绑定到一个API密钥的请求记录器，传给 LLMCaller(metrics=...)"""
+
+    def __init__(self, run_metrics, key):
+        self.run_metrics = run_metrics
+        self.key = key
+
+    def request_started(self):
+        request_id = uuid.uuid4().hex[:12]
+        self.run_metrics.emit("request_start", key=self.key, req=request_id)
+        return request_id
+
+    def request_finished(self, request_id, latency, usage=None, error=None):
+        usage = usage or {}
+        self.run_metrics.emit(
+            "request_end", key=self.key, req=request_id, latency=round(latency, 3),
+            status=classify_error(error) if error is not None else "ok",
+            prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+
+def summarize_run(path, window=300):
+    """
+    从事件日志计算运行快照
+
+    window: 速率类指标（篇/分钟、tokens/分钟、429比例、延迟分位数）只看最近 window 秒
+
+    Returns:
+        dict，包括进度与ETA、各密钥并发数、429比例、延迟直方图、tokens/分钟、失败分类，
+        以及 bound（"quota" 表示被限流，"latency" 表示受请求延迟限制）
+    """
+    import numpy as np
+    import pandas as pd
+
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # 正在写入的最后一行
+    events = pd.DataFrame(records)
+    now = time.time()
+    snapshot = {"path": path, "updated_at": now, "events": len(events)}
+    if events.empty:
+        return snapshot
+    for column in ("key", "req", "status", "latency", "success", "error_class", "total",
+                   "prompt_tokens", "completion_tokens"):
+        if column not in events:
+            events[column] = None
+
+    starts = events[events["type"] == "run_start"]
+    run_start = starts["t"].max() if not starts.empty else events["t"].min()
+    events = events[events["t"] >= run_start]
+    total = int(starts.loc[starts["t"] == run_start, "total"].iloc[0]) if not starts.empty else None
+    recent = events[events["t"] >= now - window]
+    span = min(window, max(now - run_start, 1))
+
+    papers = events[events["type"] == "paper_end"]
+    recent_papers = recent[recent["type"] == "paper_end"]
+    done = len(papers)
+    rate = len(recent_papers) / span * 60
+    snapshot.update({
+        "run_started_at": float(run_start),
+        "elapsed": now - run_start,
+        "total": total,
+        "done": done,
+        "succeeded": int(papers["success"].fillna(False).astype(bool).sum()),
+        "failed": int((~papers["success"].fillna(False).astype(bool)).sum()),
+        "papers_per_min": round(rate, 2),
+        "eta_seconds": round((total - done) / rate * 60) if total and rate else None,
+        "failure_classes": papers.loc[~papers["success"].fillna(False).astype(bool), "error_class"]
+                                 .fillna("error").value_counts().to_dict(),
+    })
+
+    request_starts = events[events["type"] == "request_start"]
+    request_ends = events[events["type"] == "request_end"]
+    open_requests = request_starts[~request_starts["req"].isin(request_ends["req"])
+                                   & (request_starts["t"] >= now - STALE_REQUEST_SECONDS)]
+    recent_ends = recent[recent["type"] == "request_end"]
+    snapshot["in_flight"] = open_requests.groupby("key").size().to_dict()
+    snapshot["requests"] = len(request_ends)
+    snapshot["rate_limited_ratio"] = round(float((recent_ends["status"] == "rate_limited").mean()), 4) \
+        if not recent_ends.empty else 0.0
+    snapshot["per_key"] = {
+        key: {
+            "requests": len(group),
+            "rate_limited_ratio": round(float((group["status"] == "rate_limited").mean()), 4),
+            "latency_p50": round(float(group.loc[group["status"] == "ok", "latency"].median()), 3)
+            if (group["status"] == "ok").any() else None,
+        }
+        for key, group in recent_ends.groupby("key")
+    }
+    snapshot["request_status"] = recent_ends["status"].value_counts().to_dict()
+
+    ok_latency = recent_ends.loc[recent_ends["status"] == "ok", "latency"].astype(float)
+    counts, _ = np.histogram(ok_latency, bins=LATENCY_BINS)
+    labels = [f"{lo:g}-{hi:g}s" if hi != float("inf") else f">{lo:g}s"
+              for lo, hi in zip(LATENCY_BINS[:-1], LATENCY_BINS[1:])]
+    snapshot["latency_histogram"] = dict(zip(labels, counts.tolist()))
+    snapshot["latency_p50"] = round(float(ok_latency.quantile(0.5)), 3) if not ok_latency.empty else None
+    snapshot["latency_p95"] = round(float(ok_latency.quantile(0.95)), 3) if not ok_latency.empty else None
+    snapshot["tokens_per_min"] = {
+        "prompt": round(float(recent_ends["prompt_tokens"].fillna(0).sum()) / span * 60),
+        "completion": round(float(recent_ends["completion_tokens"].fillna(0).sum()) / span * 60),
+    }
+    # 限流比例高说明配额是瓶颈，加密钥或降并发；否则吞吐由单请求延迟决定，加并发
+    snapshot["bound"] = "quota" if snapshot["rate_limited_ratio"] > 0.05 else "latency"
+    return snapshot
+
+
+def write_snapshot(path, window=300):
+    """把快照写到 <path>.snapshot.json，供其他工具读取"""
+    snapshot = summarize_run(path, window)
+    tmp_path = f"{path}.snapshot.json.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, f"{path}.snapshot.json")
+    return snapshot
+
+
+def list_runs(metrics_dir=RUN_METRICS_DIR):
+    """按时间从新到旧列出运行日志"""
+    if not os.path.isdir(metrics_dir):
+        return []
+    runs = [os.path.join(metrics_dir, name) for name in os.listdir(metrics_dir) if name.endswith(".jsonl")]
+    return sorted(runs, key=os.path.getmtime, reverse=True)
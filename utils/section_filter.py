@@ -0,0 +1,116 @@
+import re
+
+# 整节丢弃：参考文献、致谢、作者信息等与器件指标无关的章节
+DROP_HEADING = re.compile(
+    r"^(references?( and notes)?|bibliography|notes and references|acknowledge?ments?|"
+    r"author contributions?|authors? information|conflicts? of interest|competing (financial )?interests?|"
+    r"declaration of competing interest|data availability( statement)?|funding( sources)?|"
+    r"abbreviations|keywords|orcid|associated content|supporting information|"
+    r"electronic supplementary information|additional information)\b",
+    re.I,
+)
+# 始终保留：摘要、结果讨论、器件相关章节
+KEEP_HEADING = re.compile(
+    r"(abstract|results?|discussion|conclusions?|device|oled|electroluminescen|photophysic|"
+    r"performance|efficien)",
+    re.I,
+)
+# 与器件指标相关的关键词
+KEYWORD = re.compile(
+    r"EQE|external quantum|efficienc|luminance|brightness|cd\s*/?\s*A|lm\s*/?\s*W|cd\s*m|turn-on|"
+    r"V_?\{?on|electroluminescen|\bEL\b|OLED|device|emitter|dopant|\bhost|HOMO|LUMO|PLQY|TADF|"
+    r"wt\s*%|ITO|HAT-?CN|TPBi|LiF|\bnm\b|CIE|lifetime|LT\d+",
+    re.I,
+)
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+SENTENCE = re.compile(r"(?<=[.;!?])\s+")
+
+
+def estimate_tokens(text):
+    """粗略估计token数（英文约4字符/token）"""
+    return len(text) // 4
+
+
+def _normalize_heading(heading):
+    # 去掉编号，如 "2.", "II.", "S1"
+    return re.sub(r"^([0-9ivxIVX]+|S\d+)[.\s)]+", "", heading.strip()).strip()
+
+
+def _split_sections(md_content):
+    """按markdown标题切分章节，返回 [(heading, body_lines)]，首段标题为None"""
+    sections = [(None, [])]
+    for line in md_content.splitlines():
+        match = HEADING.match(line)
+        if match:
+            sections.append((match.group(1).strip(), []))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _density(text):
+    words = len(text.split())
+    if words == 0:
+        return 0.0
+    return (len(KEYWORD.findall(text)) + 0.5 * len(NUMBER.findall(text))) / words
+
+
+def _keep_informative_sentences(body):
+    """低分章节只保留含关键词的句子和表格"""
+    kept = []
+    for line in body.splitlines():
+        if "<table" in line or line.lstrip().startswith("|"):
+            kept.append(line)
+            continue
+        sentences = [s for s in SENTENCE.split(line) if KEYWORD.search(s)]
+        if sentences:
+            kept.append(" ".join(sentences))
+    return "\n".join(kept)
+
+
+def filter_md_sections(md_content, min_density=0.15):
+    """
+    在构造提示词之前去掉不含器件信息的章节
+
+    - 参考文献、致谢、作者贡献等章节整节丢弃
+    - 摘要、结果讨论、器件相关章节原样保留
+    - 其余章节（作者列表、实验方法等）按关键词/数字密度打分，
+      低于 min_density 的只保留含关键词的句子
+
+    Returns:
+        (filtered_text, stats)，stats 中包含 tokens_before/tokens_after/tokens_saved
+        以及被丢弃(dropped)和压缩(trimmed)的章节标题
+    """
+    dropped, trimmed, parts = [], [], []
+    for i, (heading, lines) in enumerate(_split_sections(md_content)):
+        body = "\n".join(lines).strip()
+        name = _normalize_heading(heading) if heading else ""
+        # 标题下方通常是作者列表和单位
+        front_matter = i <= 1 and not name.lower().startswith("abstract")
+
+        if heading and DROP_HEADING.match(name):
+            dropped.append(heading)
+            continue
+
+        if front_matter or not KEEP_HEADING.search(name):
+            if body and "<table" not in body and _density(body) < min_density:
+                body = _keep_informative_sentences(body)
+                trimmed.append(heading or "<front matter>")
+
+        if heading:
+            parts.append(f"# {heading}")
+        if body:
+            parts.append(body)
+
+    filtered = "\n\n".join(parts)
+    tokens_before = estimate_tokens(md_content)
+    tokens_after = estimate_tokens(filtered)
+    stats = {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "dropped": dropped,
+        "trimmed": trimmed,
+    }
+    return filtered, stats
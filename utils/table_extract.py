@@ -0,0 +1,183 @@
+import re
+from html.parser import HTMLParser
+
+# 表头 -> 器件指标字段，表头先经过 _normalize_header 去掉 LaTeX 标记
+METRIC_COLUMNS = [
+    ("maximum_EQE", re.compile(r"EQE|etaext|external quantum", re.I)),
+    ("current_efficiency", re.compile(r"\bCE|etac\b|etaCE|current eff|cd/?A", re.I)),
+    ("power_efficiency", re.compile(r"\bPE|etap\b|etaPE|power eff|lm/?W", re.I)),
+    ("turn_on_voltage", re.compile(r"Von|turn-?on", re.I)),
+    ("device_emission_wavelength", re.compile(r"(lambda|λ)(EL|max,?EL)|EL ?peak|ELmax", re.I)),
+    ("device_brightness", re.compile(r"Lmax|luminance|brightness|cd/?m", re.I)),
+]
+LABEL_COLUMN = re.compile(r"device|emitter|dopant|EML|compound|molecule", re.I)
+DEFAULT_UNITS = {
+    "maximum_EQE": "%",
+    "current_efficiency": "cd/A",
+    "power_efficiency": "lm/W",
+    "turn_on_voltage": "V",
+    "device_emission_wavelength": "nm",
+    "device_brightness": "cd/m²",
+}
+# 单元格只有一个数（可带科学计数法指数、百分号）时才读取，其余情况返回 None 交给 LLM
+NUMBER = re.compile(r"^[~<>≈]?\s*(-?\d+(?:\.\d+)?)(?:[eE]([-+]?\d+))?\s*%?$")
+POWER_OF_TEN = re.compile(r"^[~<>≈]?\s*(?:(-?\d+(?:\.\d+)?)\s*[×xX*·]\s*)?10\s*\^\s*\(?([-+]?\d+)\)?$")
+# 千位分隔只认整数部分："12 450"、"12,450.5"；"0.5,100" 是两个数，不合并
+THOUSANDS = re.compile(r"(?<![\d.])\d{1,3}(?:[ \u2009\u202f,]\d{3})+(?![\d,])")
+SEPARATOR = re.compile(r"[ \u2009\u202f,]")
+FOOTNOTE_MARK = re.compile(r"(?<=\d)\s*\^?\s*[a-z*†‡§]$")
+DATA_CELL = re.compile(r"^[-−~<>≈]?\s*\d")
+UNIT = re.compile(r"[(\[]\s*([^()\[\]]+?)\s*[)\]]\s*$")
+
+
+class _TableParser(HTMLParser):
+    """把 HTML 表格解析成二维文本列表，展开 colspan/rowspan"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._cell = None
+        self._span = (1, 1)
+        self._pending = {}  # 列号 -> (剩余行数, 文本)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "sup" and self._cell is not None:
+            # 1.5×10<sup>4</sup> -> 1.5×10^4，否则指数会和底数连成 104
+            self._cell.append("^")
+        elif tag == "tr":
+            self.rows.append([])
+        elif tag in ("td", "th"):
+            self._cell = []
+            self._span = (int(attrs.get("colspan") or 1), int(attrs.get("rowspan") or 1))
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            if not self.rows:
+                self.rows.append([])
+            row = self.rows[-1]
+            self._fill_pending(row)
+            text = " ".join("".join(self._cell).split())
+            colspan, rowspan = self._span
+            for _ in range(colspan):
+                if rowspan > 1:
+                    self._pending[len(row)] = (rowspan - 1, text)
+                row.append(text)
+                self._fill_pending(row)
+            self._cell = None
+        elif tag == "tr" and self.rows:
+            self._fill_pending(self.rows[-1])
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _fill_pending(self, row):
+        # 上方单元格 rowspan 覆盖到本行的位置
+        while len(row) in self._pending:
+            remaining, text = self._pending.pop(len(row))
+            if remaining > 1:
+                self._pending[len(row)] = (remaining - 1, text)
+            row.append(text)
+
+
+def parse_html_table(html):
+    parser = _TableParser()
+    parser.feed(html)
+    return [row for row in parser.rows if any(cell for cell in row)]
+
+
+def iter_tables(json_content):
+    """遍历 MinerU JSON（content_list 或 middle json）中的表格，返回 (caption, html)"""
+    stack = [json_content]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            html = node.get("table_body") or (node.get("html") if node.get("type") == "table" else None)
+            if isinstance(html, str) and "<table" in html:
+                caption = node.get("table_caption") or ""
+                if isinstance(caption, list):
+                    caption = " ".join(caption)
+                yield caption, html
+            else:
+                stack.extend(reversed(list(node.values())))
+
+
+def _normalize_header(header):
+    header = header.replace("\\mathrm", "").replace("\\text", "").replace("\\lambda", "lambda").replace("\\eta", "eta")
+    header = re.sub(r"[${}_^\\~]", "", header)
+    return re.sub(r"\s+", " ", header).strip()
+
+
+def _parse_value(cell):
+    """
+    单元格 -> 数值；不是单个数时返回 None
+
+    "20.1/18.3/15.2" 取第一个（最大值），"20.1 ± 0.2"、"20.1 (18.3)" 取 20.1；
+    支持 1.2 × 10^4、1.5×10<sup>4</sup>、$1.2\\times10^{4}$、1.2e4 和 12 450 / 12,450 这样的千位分隔。
+    """
+    text = cell.replace("−", "-").replace("\\times", "×").replace("\\cdot", "·").replace("\\pm", "±")
+    text = re.sub(r"\\(?:mathrm|text|rm)|[${}]", "", text)
+    text = re.split(r"/|±|\+/-|\s\(", text)[0].strip()
+    text = FOOTNOTE_MARK.sub("", THOUSANDS.sub(lambda m: SEPARATOR.sub("", m.group(0)), text))
+    match = NUMBER.match(text) or POWER_OF_TEN.match(text)
+    if not match:
+        return None
+    mantissa, exponent = match.groups()
+    value = float(mantissa) if mantissa is not None else 1.0
+    return value * 10 ** int(exponent) if exponent is not None else value
+
+
+def _map_columns(header):
+    columns, label_col = {}, None
+    for i, name in enumerate(header):
+        name = _normalize_header(name)
+        for field, pattern in METRIC_COLUMNS:
+            if field not in columns and pattern.search(name):
+                unit = UNIT.search(name)
+                columns[field] = (i, unit.group(1) if unit else DEFAULT_UNITS[field])
+                break
+        else:
+            if label_col is None and LABEL_COLUMN.search(name):
+                label_col = i
+    return columns, label_col
+
+
+def extract_device_tables(json_content):
+    """
+    从 MinerU JSON 的器件性能表中按规则读取 EQE/CE/PE/Von/λEL/Lmax
+
+    只识别同时含 EQE 或 CE 列且至少两个指标列的表格。
+
+    Returns:
+        [{"label": 行标签（器件/发光体名称）, "caption": 表题, "device": 器件指标字典}]
+    """
+    rows_out = []
+    for caption, html in iter_tables(json_content):
+        rows = parse_html_table(html)
+        if len(rows) < 2:
+            continue
+        columns, label_col = _map_columns(rows[0])
+        body = rows[1:]
+        # 两行表头：第二行不以数字开头时并入表头
+        if body and not any(DATA_CELL.match(cell) for cell in body[0][1:]):
+            merged = [f"{a} {b}".strip() if a != b else a for a, b in zip(rows[0], body[0])]
+            columns, label_col = _map_columns(merged)
+            body = body[1:]
+        if len(columns) < 2 or not ({"maximum_EQE", "current_efficiency"} & columns.keys()):
+            continue
+        if label_col is None:
+            label_col = 0
+
+        for row in body:
+            device = {}
+            for field, (index, unit) in columns.items():
+                value = _parse_value(row[index]) if index < len(row) else None
+                device[field] = {"value": value, "unit": unit if value is not None else None}
+            if all(metric["value"] is None for metric in device.values()):
+                continue
+            label = row[label_col] if label_col < len(row) else ""
+            rows_out.append({"label": label, "caption": caption, "device": device})
+    return rows_out
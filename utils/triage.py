@@ -0,0 +1,61 @@
+import re
+
+# 只认明确的综述措辞，"progress"、"review" 单独出现（如 "Rapid progress toward ..."）不算
+REVIEW_TITLE = re.compile(
+    r"^(?:a\s+)?(?:mini-?|critical\s+|comprehensive\s+)?review\b|"
+    r"\b(?:an?|mini-?|critical|comprehensive|brief)\s+review\b|\breview\s+(?:of|on)\b|"
+    r"\brecent\s+(?:progress|advances|developments)\s+(?:in|on|of|toward)\b|"
+    r"\b(?:an?\s+)?(?:overview|perspective|roadmap|tutorial)\s+(?:of|on|for)\b|"
+    r"[:：]\s*(?:a\s+)?(?:review|perspective|overview|roadmap|tutorial)\s*$",
+    re.I,
+)
+REVIEW_ABSTRACT = re.compile(r"\b(this review|we review|we summari[sz]e|is reviewed|are reviewed|this perspective)\b", re.I)
+DEVICE_EVIDENCE = re.compile(
+    r"EQE|external quantum efficienc|electroluminescen|\bOLEDs?\b|light-emitting diode|cd\s*/\s*A|lm\s*/\s*W|"
+    r"turn-on voltage|current efficiency|power efficiency",
+    re.I,
+)
+TABLE = re.compile(r"<table.*?</table>", re.S | re.I)
+HEADING = re.compile(r"^#{1,6}\s+(.*)$", re.M)
+
+
+def get_triage_snippet(md_content, max_chars=1500):
+    """从markdown中取出标题、摘要和第一个表格"""
+    headings = list(HEADING.finditer(md_content))
+    title = headings[0].group(1).strip() if headings else md_content.strip().split("\n", 1)[0][:200]
+
+    abstract = ""
+    for i, match in enumerate(headings):
+        if match.group(1).strip().lower().startswith("abstract"):
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(md_content)
+            abstract = md_content[match.end():end]
+            break
+    if not abstract:
+        # 没有摘要标题时取标题后的第一段较长文本
+        body = md_content[headings[0].end():] if headings else md_content
+        paragraphs = [p.strip() for p in body.split("\n\n") if len(p.strip()) > 300]
+        abstract = paragraphs[0] if paragraphs else body
+    abstract = abstract.strip()[:max_chars]
+
+    table_match = TABLE.search(md_content)
+    table = table_match.group(0)[:max_chars] if table_match else ""
+    return {"title": title, "abstract": abstract, "table": table}
+
+
+def keyword_triage(snippet):
+    """
+    本地关键词分类：综述直接跳过，标题/摘要/表格中有器件指标才做完整抽取
+
+    摘要明确写了综述措辞时按综述跳过；只有标题像综述、摘要里却有器件指标时仍然抽取。
+
+    Returns:
+        {"extract": bool, "method": "keyword", "reason": str, "score": int}
+    """
+    if REVIEW_ABSTRACT.search(snippet["abstract"]) or (
+            REVIEW_TITLE.search(snippet["title"]) and not DEVICE_EVIDENCE.search(snippet["abstract"])):
+        return {"extract": False, "method": "keyword", "reason": "review", "score": 0}
+    text = " ".join([snippet["title"], snippet["abstract"], snippet["table"]])
+    score = len(DEVICE_EVIDENCE.findall(text))
+    if score == 0:
+        return {"extract": False, "method": "keyword", "reason": "no device evidence", "score": 0}
+    return {"extract": True, "method": "keyword", "reason": "device evidence", "score": score}
@@ -1,14 +1,44 @@
 import os
 import json
+from .paths import doi_encode, doi_decode, locate_doi_dir
+from .md_pack import MdPack
 
-def doi_encode(doi):
-    return doi.replace('/', '%2F')
-def doi_decode(doi):
-    return doi.replace('%2F', '/')
+# 数据目录
+PDF_SPLIT_DIR = "/home/qianzhang/MyProject/deepseek/000-final/pdf_split"
+EXTRACT_INFO_DIR = "/home/qianzhang/MyProject/deepseek/000-final/extract_info"
+# pdf_split/ 下markdown的打包语料（pack_md_corpus.py 生成），存在时 read_md 优先从中读取
+MD_PACK_PATH = os.path.join(os.path.dirname(PDF_SPLIT_DIR), "pdf_split.mdpack")
 
-def read_md(doi, pdf_split_dir="/home/qianzhang/MyProject/deepseek/000-final/pdf_split"):
-    encoded_doi = doi_encode(doi)
-    md_path = os.path.join(pdf_split_dir, encoded_doi, "output", f"{encoded_doi}.md")
+_md_pack = None
+
+def get_md_pack():
+    """默认打包语料，未打包时返回None"""
+    global _md_pack
+    if _md_pack is None and os.path.exists(f"{MD_PACK_PATH}.idx"):
+        _md_pack = MdPack(MD_PACK_PATH)
+    return _md_pack
+
+def read_md(doi, pdf_split_dir=PDF_SPLIT_DIR, pack=None):
+    """
+    读取DOI的markdown：先查打包语料（默认目录下自动使用 MD_PACK_PATH），再读散文件
+
+    散文件在打包之后被修改过（mtime 比包中记录的新，如重新解析）时读散文件。
+    """
+    if pack is None and pdf_split_dir == PDF_SPLIT_DIR:
+        pack = get_md_pack()
+
+    doi_dir, name = locate_doi_dir(pdf_split_dir, doi)
+    md_path = os.path.join(doi_dir, "output", f"{name}.md") if doi_dir is not None else None
+    if pack is not None and doi in pack:
+        try:
+            stale = md_path is not None and os.stat(md_path).st_mtime > pack.mtime(doi)
+        except OSError:
+            stale = False
+        if not stale:
+            return pack.get(doi)
+
+    if doi_dir is None:
+        raise FileNotFoundError(f"DOI directory not found in {pdf_split_dir}: {doi}")
     
     if not os.path.exists(md_path):
         raise FileNotFoundError(f"MD file not found: {md_path}")
@@ -17,44 +47,42 @@ def read_md(doi, pdf_split_dir="/home/qianzhang/MyProject/deepseek/000-final/pdf
         md_content = f.read()
     return md_content
 
+def find_pdf(doi, pdf_split_dir=PDF_SPLIT_DIR):
+    """原始PDF路径，不存在时返回None"""
+    doi_dir, name = locate_doi_dir(pdf_split_dir, doi)
+    if doi_dir is None:
+        return None
+    pdf_path = os.path.join(doi_dir, f"{name}.pdf")
+    return pdf_path if os.path.exists(pdf_path) else None
+
+def read_mineru_json(doi, pdf_split_dir=PDF_SPLIT_DIR):
+    """读取MinerU解析得到的JSON（优先content_list），不存在时返回None"""
+    doi_dir, name = locate_doi_dir(pdf_split_dir, doi)
+    if doi_dir is None:
+        return None
+    output_dir = os.path.join(doi_dir, "output")
+    candidates = [os.path.join(output_dir, f"{name}_content_list.json"),
+                  os.path.join(output_dir, f"{name}.json")]
+    for json_path in candidates:
+        if os.path.exists(json_path):
+            with open(json_path, 'r') as f:
+                return json.load(f)
+    return None
+
 def adjust_if_have_materils(doi):
-    encoded_doi = doi_encode(doi)
-    extract_json = os.path.join("/home/qianzhang/MyProject/deepseek/000-final/extract_info", encoded_doi, f"{encoded_doi}.json")
+    """单篇检查是否有有效发光体名称和EQE数值（{"value": null} 不算）；批量筛选请用质量索引 (utils.quality_index.valid_mask)"""
+    from .quality_index import quality_flags
+    doi_dir, name = locate_doi_dir(EXTRACT_INFO_DIR, doi)
     
     # 检查文件是否存在
-    if not os.path.exists(extract_json):
-        print(f"extract_json not found: {extract_json}")
+    if doi_dir is None or not os.path.exists(os.path.join(doi_dir, f"{name}.json")):
+        print(f"extract_json not found: {doi}")
         return False
+    extract_json = os.path.join(doi_dir, f"{name}.json")
         
     # 读取JSON文件
     with open(extract_json, 'r') as f:
         extract_dict = json.load(f)
     
-    # 检查是否存在materials键且不为空，并且至少有一个有效材料名称
-    has_valid_materials = False
-    if 'materials' in extract_dict and extract_dict['materials']:
-        for material in extract_dict['materials']:
-            if (material.get('emitter_name_full') is not None or 
-                material.get('emitter_name_abbreviation') is not None):
-                has_valid_materials = True
-                break
-    
-    if not has_valid_materials:
-        return False
-        
-    # 检查devices相关信息
-    has_valid_devices = False
-    if 'devices' in extract_dict and extract_dict['devices']:
-        for device in extract_dict['devices']:
-            if device.get('maximum_EQE') is not None:
-                has_valid_devices = True
-                break
-    
-    if not has_valid_devices:
-        return False
-    
-    return True
-    
-
-
-
+    flags = quality_flags(extract_dict)
+    return flags["has_emitter_name"] and flags["has_EQE"]
@@ -0,0 +1,179 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+DEFAULT_LEASE_SECONDS = 600
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    多台机器共享的DOI任务队列（SQLite，放在共享文件系统上）
+
+    worker 用 claim 领取DOI并获得租约，处理期间定时 heartbeat 续租，完成后 complete/fail。
+    进程崩溃或机器掉线时租约过期，其他 worker 的下一次 claim 会自动重新领取。
+    共享文件系统上 WAL 不可用，这里使用默认的回滚日志，写操作都在 BEGIN IMMEDIATE 事务中。
+    """
+
+    def __init__(self, db_path, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (doi TEXT PRIMARY KEY, priority INTEGER DEFAULT 0, "
+            "status TEXT DEFAULT 'pending', worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, "
+            "error TEXT, updated_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, priority)")
+
+    def _write(self, sql, params_list):
+        """在一个 BEGIN IMMEDIATE 事务中执行 executemany，返回影响的行数"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rowcount = self.conn.executemany(sql, params_list).rowcount
+            self.conn.execute("COMMIT")
+            return rowcount
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, dois, priorities=None):
+        """加入DOI（已在队列中的忽略），priorities 与 dois 一一对应，返回新加入的数量"""
+        priorities = priorities if priorities is not None else [0] * len(dois)
+        now = time.time()
+        return self._write("INSERT OR IGNORE INTO tasks (doi, priority, updated_at) VALUES (?, ?, ?)",
+                           [(doi, priority, now) for doi, priority in zip(dois, priorities)])
+
+    def claim(self, worker_id, n=1):
+        """
+        领取最多n个待处理或租约已过期的DOI，按 priority 从高到低
+
+        租约过期且已领取 max_attempts 次的DOI（反复让 worker 崩溃的论文）在同一事务中标记为 failed，不再领取。
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_until = NULL, "
+                "error = COALESCE(error, 'lease expired after ' || attempts || ' attempts'), updated_at = ? "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT doi FROM tasks WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                "ORDER BY priority DESC, rowid LIMIT ?",
+                (now, n),
+            ).fetchall()
+            dois = [row[0] for row in rows]
+            self.conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE doi = ?",
+                [(worker_id, now + self.lease_seconds, now, doi) for doi in dois],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return dois
+
+    def heartbeat(self, worker_id, dois):
+        """为仍由该 worker 持有的DOI续租，返回续租成功的数量（租约已被他人接管的不算）"""
+        now = time.time()
+        return self._write(
+            "UPDATE tasks SET lease_until = ?, updated_at = ? WHERE doi = ? AND worker = ? AND status = 'leased'",
+            [(now + self.lease_seconds, now, doi, worker_id) for doi in dois],
+        )
+
+    def complete(self, doi, worker_id):
+        self._write(
+            "UPDATE tasks SET status = 'done', lease_until = NULL, error = NULL, updated_at = ? "
+            "WHERE doi = ? AND worker = ?",
+            [(time.time(), doi, worker_id)],
+        )
+
+    def fail(self, doi, worker_id, error):
+        """处理失败：未超过 max_attempts 时放回队列，否则标记为 failed"""
+        self._write(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_until = NULL, error = ?, updated_at = ? WHERE doi = ? AND worker = ?",
+            [(self.max_attempts, str(error), time.time(), doi, worker_id)],
+        )
+
+    def reset_failed(self):
+        """把 failed 的DOI放回队列并清零重试次数"""
+        return self._write("UPDATE tasks SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'",
+                           [(time.time(),)])
+
+    def stats(self):
+        """各状态的数量，过期未续租的租约单独计为 expired"""
+        counts = {"pending": 0, "leased": 0, "expired": 0, "done": 0, "failed": 0}
+        rows = self.conn.execute(
+            "SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'expired' ELSE status END, COUNT(*) "
+            "FROM tasks GROUP BY 1",
+            (time.time(),),
+        )
+        counts.update(dict(rows.fetchall()))
+        return counts
+
+    def failed(self):
+        return self.conn.execute("SELECT doi, error FROM tasks WHERE status = 'failed'").fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+class LeaseHeartbeat:
+    """
+    后台线程定时为当前持有的DOI续租
+
+    with LeaseHeartbeat(db_path, worker_id, lease_seconds) as hb:
+        hb.hold(doi)
+        ...
+        hb.release(doi)
+    """
+
+    def __init__(self, db_path, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS, interval=None):
+        self.db_path = db_path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = interval or lease_seconds / 3
+        self.held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def hold(self, doi):
+        with self._lock:
+            self.held.add(doi)
+
+    def release(self, doi):
+        with self._lock:
+            self.held.discard(doi)
+
+    def _run(self):
+        # sqlite 连接不能跨线程使用，心跳线程单独连接
+        queue = WorkQueue(self.db_path, lease_seconds=self.lease_seconds)
+        try:
+            while not self._stop.wait(self.interval):
+                with self._lock:
+                    dois = list(self.held)
+                if dois:
+                    try:
+                        queue.heartbeat(self.worker_id, dois)
+                    except sqlite3.OperationalError as e:
+                        print(f"续租失败 {self.worker_id}: {e}")
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()